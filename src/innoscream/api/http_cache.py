@@ -0,0 +1,187 @@
+"""Conditional-request cache for finished-day API responses."""
+import hashlib
+import json
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterator,
+                    Optional, Set, Tuple)
+
+from fastapi import Request, Response
+
+from ..core.config import get_settings
+from ..db import scream_repo as repo
+
+
+class CachedResponse:
+    """Serialized body plus its validators."""
+
+    __slots__ = ("body", "etag", "last_modified", "span")
+
+    def __init__(self, body: bytes, span: Tuple[str, str]) -> None:
+        """Fingerprint ``body``; ``span`` is its (first, last) day."""
+        self.body = body
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.etag = f'"{digest}"'
+        self.last_modified = int(time.time())
+        self.span = span
+
+
+class ResponseCache:
+    """LRU of serialized responses bounded by total body size.
+
+    Entries cover a span of finished days and are dropped when any of
+    those days changes (admin delete, late reaction); an index from day
+    to keys finds them without a scan. Per-day generation counters keep
+    responses built while one of their days changed out of the cache.
+    Changes to the running day are ignored: no entry can cover it.
+    """
+
+    def __init__(self, max_bytes: int = 4 * 1024 * 1024) -> None:
+        """Create an empty cache holding at most ``max_bytes`` of bodies."""
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._generations: Dict[str, int] = defaultdict(int)
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = \
+            OrderedDict()
+        self._by_day: Dict[str, Set[Hashable]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters, entry count and stored bytes."""
+        return {"hits": self.hits, "misses": self.misses,
+                "entries": len(self._entries), "bytes": self.size}
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return the entry for ``key`` or ``None``."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def generation(self, span: Tuple[str, str]) -> int:
+        """Return a token that changes whenever a day of ``span`` does."""
+        return sum(self._generations.get(day, 0) for day in _days(span))
+
+    def put(self, key: Hashable, entry: CachedResponse,
+            generation: int) -> None:
+        """Store ``entry`` unless a day changed since ``generation``."""
+        if generation != self.generation(entry.span) \
+                or len(entry.body) > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = entry
+        self.size += len(entry.body)
+        for day in _days(entry.span):
+            self._by_day.setdefault(day, set()).add(key)
+        while self.size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+
+    def invalidate_day(self, day: str) -> None:
+        """Drop every entry whose span includes ``day``."""
+        if day >= datetime.now(timezone.utc).date().isoformat():
+            return  # only finished days are cached
+        self._generations[day] += 1
+        for key in list(self._by_day.get(day, ())):
+            self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= len(entry.body)
+        for day in _days(entry.span):
+            keys = self._by_day.get(day)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_day[day]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+        self._by_day.clear()
+        self.size = 0
+
+
+def _days(span: Tuple[str, str]) -> Iterator[str]:
+    """Yield every ISO day from ``span[0]`` to ``span[1]`` inclusive."""
+    day, last = date.fromisoformat(span[0]), date.fromisoformat(span[1])
+    while day <= last:
+        yield day.isoformat()
+        day += timedelta(days=1)
+
+
+_cache: ResponseCache | None = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the shared response cache, create on first call."""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache(get_settings().api_cache_bytes)
+        repo.on_day_invalidated(_cache.invalidate_day)
+    return _cache
+
+
+def _not_modified(request: Request, entry: CachedResponse,
+                  final: bool) -> bool:
+    etags = request.headers.get("if-none-match")
+    if etags is not None:
+        return entry.etag in {t.strip() for t in etags.split(",")} \
+            or etags.strip() == "*"
+    since = request.headers.get("if-modified-since")
+    if since is None or not final:
+        return False
+    try:
+        return parsedate_to_datetime(since).timestamp() >= entry.last_modified
+    except (TypeError, ValueError):
+        return False
+
+
+def is_final(day: date) -> bool:
+    """Whether ``day`` is over in UTC, so its results are settled."""
+    return day < datetime.now(timezone.utc).date()
+
+
+async def cached_json(
+    request: Request,
+    span: Tuple[date, date],
+    build: Callable[[], Awaitable[Any]],
+) -> Response:
+    """Serve ``build()`` as JSON with validators and caching headers.
+
+    Responses covering only finished days are kept in the shared cache
+    and may be stored by clients and proxies, which must revalidate
+    them so a deleted post disappears; others are built every time but
+    still answer conditional requests. ``build`` may raise
+    ``HTTPException``, which is never cached.
+    """
+    cache = get_response_cache()
+    final = is_final(span[1])
+    key = (request.url.path, str(request.query_params))
+    days = (span[0].isoformat(), span[1].isoformat())
+    entry = cache.get(key) if final else None
+    if entry is None:
+        generation = cache.generation(days)
+        body = json.dumps(await build(), ensure_ascii=False,
+                          separators=(",", ":")).encode()
+        entry = CachedResponse(body, days)
+        if final:
+            cache.put(key, entry, generation)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if final:
+        headers["Cache-Control"] = "public, no-cache"
+        headers["Last-Modified"] = formatdate(entry.last_modified,
+                                              usegmt=True)
+    if _not_modified(request, entry, final):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json",
+                    headers=headers)
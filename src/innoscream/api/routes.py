@@ -1,16 +1,51 @@
 """API routes."""
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from datetime import date
+from typing import Optional
 from ..db import scream_repo as repo
+from .http_cache import cached_json
 
 router = APIRouter(prefix="/api/v1", tags=["screams"])
 
+MAX_RANGE_DAYS = 92
+MAX_PAGE = 200
+
 
 @router.get("/top/{day}")
-async def top(day: date):
+async def top(day: date, request: Request):
     """Top post of the day endpoint."""
-    item = await repo.top_daily(day)
-    if not item:
-        raise HTTPException(404, "no screams that day")
-    return item
+    async def build():
+        item = await repo.top_daily(day)
+        if not item:
+            raise HTTPException(404, "no screams that day")
+        return item
+
+    return await cached_json(request, (day, day), build)
+
+
+@router.get("/top")
+async def top_range(
+    request: Request,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Top ``limit`` posts for each day from ``from`` to ``to``."""
+    if end < start:
+        raise HTTPException(422, "'to' is before 'from'")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise HTTPException(422, f"range is limited to {MAX_RANGE_DAYS} days")
+    return await cached_json(
+        request, (start, end), lambda: repo.top_range(start, end, limit)
+    )
+
+
+@router.get("/posts")
+async def posts(
+    before: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=MAX_PAGE),
+):
+    """Live posts, newest first; pass ``next`` back as ``before``."""
+    items, cursor = await repo.list_posts(before, limit)
+    return {"items": items, "next": cursor}
@@ -0,0 +1,119 @@
+"""Debounced, coalesced inline-keyboard updates."""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Set, Tuple
+
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Edit = Callable[[Any], Awaitable[Any]]
+
+
+class KeyboardCoalescer:
+    """Flush at most one keyboard edit per message every ``interval`` s.
+
+    The first update for a quiet message is flushed straight away by a
+    background task, so the submitting handler never waits for the Bot
+    API or the rate limiter. Updates arriving within the interval only
+    replace the pending state; a single trailing flush then sends the
+    newest one. Failed flushes (429s, network errors) are retried with
+    whatever state is newest by then.
+    """
+
+    def __init__(self, interval: float = 1.0, max_retries: int = 5) -> None:
+        """Create an idle coalescer."""
+        self.interval = interval
+        self.max_retries = max_retries
+        self._pending: Dict[Hashable, Tuple[Edit, Any]] = {}
+        self._last: Dict[Hashable, float] = {}
+        self._failures: Dict[Hashable, int] = {}
+        self._busy: Set[Hashable] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self.flushed = 0
+        self.coalesced = 0
+
+    async def submit(self, key: Hashable, edit: Edit, markup: Any) -> None:
+        """Queue ``edit(markup)`` for message ``key``, replacing older state.
+
+        Args:
+            key: identifies the message, e.g. ``(chat_id, message_id)``
+            edit: coroutine function that applies a markup to the message
+            markup: the newest keyboard for that message
+        """
+        if key in self._pending:
+            self.coalesced += 1
+        self._pending[key] = (edit, markup)
+        if key in self._busy:
+            return  # the running flusher picks up the newest state
+
+        self._busy.add(key)
+        wait = self._last.get(key, float("-inf")) + self.interval
+        self._spawn(key, max(wait - time.monotonic(), 0.0))
+        self._prune()
+
+    def _spawn(self, key: Hashable, delay: float) -> None:
+        task = asyncio.create_task(self._trail(key, delay))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _trail(self, key: Hashable, delay: float) -> None:
+        try:
+            while key in self._pending:
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                delay = await self._flush(key)
+        finally:
+            self._busy.discard(key)
+
+    async def _flush(self, key: Hashable) -> float:
+        """Send the newest state; return the delay before the next flush."""
+        edit, markup = self._pending.pop(key)
+        delay = self.interval
+        try:
+            await edit(markup)
+            self._failures.pop(key, None)
+            self.flushed += 1
+        except TelegramRetryAfter as e:
+            delay = max(e.retry_after, self.interval)
+            self._retry(key, edit, markup, e)
+        except TelegramBadRequest as e:
+            if "not modified" not in str(e):
+                logger.warning(f"Keyboard update for {key} rejected: {e}")
+        except Exception as e:
+            self._retry(key, edit, markup, e)
+        finally:
+            self._last[key] = time.monotonic()
+        return delay
+
+    def _retry(self, key, edit, markup, error) -> None:
+        failures = self._failures.get(key, 0) + 1
+        if failures > self.max_retries:
+            logger.error(f"Giving up keyboard update for {key}: {error}")
+            self._failures.pop(key, None)
+            return
+        self._failures[key] = failures
+        self._pending.setdefault(key, (edit, markup))  # newer state wins
+
+    def _prune(self) -> None:
+        if len(self._last) < 10_000:
+            return
+        horizon = time.monotonic() - self.interval
+        for key in [k for k, t in self._last.items() if t < horizon]:
+            del self._last[key]
+
+
+_coalescer: KeyboardCoalescer | None = None
+
+
+def get_keyboard_coalescer() -> KeyboardCoalescer:
+    """Return the shared coalescer, create on first call."""
+    global _coalescer
+    if _coalescer is None:
+        _coalescer = KeyboardCoalescer(
+            interval=get_settings().keyboard_update_interval
+        )
+    return _coalescer
@@ -7,6 +7,8 @@ This module contains all message handlers for the bot including:
 - Admin-specific commands
 """
 
+import asyncio
+
 from aiogram import Router, F, types
 from aiogram.filters import Command
 from aiogram.types import InlineKeyboardButton, KeyboardButton, \
@@ -17,13 +19,23 @@ from typing import Dict, Tuple, List, Optional
 
 from ..services import scream, analytics
 from ..core.config import get_settings
-from ..db.scream_repo import user_total_reactions_received
 from ..services import meme
+from .coalescer import get_keyboard_coalescer
+from .outbound import Priority, get_outbound
+from .update_scheduler import get_update_scheduler
 from aiogram.utils.markdown import text, bold
 
 router = Router()
 
 
+async def _reply(msg: types.Message, method, *args, **kwargs):
+    """Answer ``msg`` through the outbound dispatcher's reply lane."""
+    chat_id = getattr(getattr(msg, "chat", None), "id", None)
+    return await get_outbound().send(
+        Priority.REPLY, chat_id, method, *args, **kwargs
+    )
+
+
 def get_main_keyboard() -> ReplyKeyboardMarkup:
     """Create the main reply keyboard markup.
     
@@ -68,7 +80,9 @@ async def handle_start(msg: types.Message) -> None:
         "- See top posts with /top",
         sep="\n"
     )
-    await msg.answer(welcome_msg, reply_markup=get_main_keyboard())
+    await _reply(
+        msg, msg.answer, welcome_msg, reply_markup=get_main_keyboard()
+    )
 
 
 @router.message(Command("top"))
@@ -95,7 +109,8 @@ async def handle_top(msg: types.Message) -> None:
             sep="\n"
         )
 
-    await msg.answer(
+    await _reply(
+        msg, msg.answer,
         response,
         reply_markup=get_main_keyboard(),
         parse_mode="MarkdownV2"
@@ -124,7 +139,9 @@ async def handle_help(msg: types.Message) -> None:
         "\nAll posts are completely anonymous!",
         sep="\n"
     )
-    await msg.answer(help_msg, reply_markup=get_main_keyboard())
+    await _reply(
+        msg, msg.answer, help_msg, reply_markup=get_main_keyboard()
+    )
 
 
 @router.message(F.text == "📢 Scream")
@@ -134,7 +151,8 @@ async def handle_scream_button(msg: types.Message) -> None:
     Args:
         msg: The incoming Message object from aiogram
     """
-    await msg.answer(
+    await _reply(
+        msg, msg.answer,
         "Type your message after /scream:",
         reply_markup=ReplyKeyboardRemove()
     )
@@ -183,49 +201,63 @@ async def handle_scream(msg: types.Message) -> None:
     try:
         text_content = msg.text.split(maxsplit=1)[1]
     except IndexError:
-        await msg.answer(
-            "Please provide text after /scream\nExample: /scream Why 9AM lectures?",
+        await _reply(
+            msg, msg.answer,
+            "Please provide text after /scream\n"
+            "Example: /scream Why 9AM lectures?",
             reply_markup=get_main_keyboard()
         )
         return
 
     formatted_text = text_content
 
-    # Build initial reaction keyboard with temporary post_id
+    # Reserve the post_id up front so the message goes out with its
+    # final reaction keyboard in a single API call
+    post_id = await scream.reserve_post_id()
     builder = InlineKeyboardBuilder()
     for emoji in scream.EMOJI_TO_COLUMN:
         builder.add(InlineKeyboardButton(
             text=f"{emoji} 0",
-            callback_data=f"react_{emoji}_tmp"
+            callback_data=f"react_{emoji}_{post_id}"
         ))
 
-    # Send to channel
-    sent = await msg.bot.send_message(
-        chat_id=get_settings().channel_id,
-        text=formatted_text,
-        reply_markup=builder.as_markup()
+    # The channel budget can keep the post queued for a while; publish
+    # it in the background so this update releases its slot right away
+    get_outbound().spawn(
+        _publish_scream(msg, post_id, formatted_text, builder.as_markup())
     )
 
-    # Save to DB to get permanent post_id
-    post_id = await scream.save_scream(
-        user_id=msg.from_user.id,
-        text=text_content,
-        message_id=sent.message_id,
-        chat_id=get_settings().channel_id,
+    await _reply(
+        msg, msg.answer,
+        "✅ Your scream is on its way to the channel, anonymously!",
+        reply_markup=get_main_keyboard()
     )
 
-    # Update keyboard with real post_id
-    builder = InlineKeyboardBuilder()
-    for emoji in scream.EMOJI_TO_COLUMN:
-        builder.add(InlineKeyboardButton(
-            text=f"{emoji} 0",
-            callback_data=f"react_{emoji}_{post_id}"
-        ))
 
-    await sent.edit_reply_markup(reply_markup=builder.as_markup())
-    await msg.answer(
-        "✅ Your scream has been posted anonymously!",
-        reply_markup=get_main_keyboard()
+async def _publish_scream(msg: types.Message, post_id: int, text_content,
+                          markup) -> None:
+    """Post a scream to the channel, then record it."""
+    channel_id = get_settings().channel_id
+    try:
+        sent = await get_outbound().send(
+            Priority.CHANNEL, channel_id, msg.bot.send_message,
+            chat_id=channel_id,
+            text=text_content,
+            reply_markup=markup
+        )
+    except Exception:
+        await _reply(
+            msg, msg.answer,
+            "❌ Your scream could not be posted, please try again later."
+        )
+        raise
+
+    await scream.save_scream(
+        user_id=msg.from_user.id,
+        text=text_content,
+        message_id=sent.message_id,
+        chat_id=channel_id,
+        post_id=post_id,
     )
 
 
@@ -247,6 +279,9 @@ async def handle_reaction(cb: types.CallbackQuery) -> None:
     except RuntimeError:
         await cb.answer("You already picked that one!", show_alert=True)
         return
+    except LookupError:
+        await cb.answer("⏳ This scream is still being posted, try again")
+        return
 
     builder = InlineKeyboardBuilder()
     for e, c in zip(["💀", "🔥", "🤡"], counts):
@@ -257,8 +292,18 @@ async def handle_reaction(cb: types.CallbackQuery) -> None:
             )
         )
 
-    await cb.message.edit_reply_markup(reply_markup=builder.as_markup())
     await cb.answer()
+    if cb.message is None:
+        return
+    chat_id = cb.message.chat.id
+    await get_keyboard_coalescer().submit(
+        (chat_id, cb.message.message_id),
+        lambda markup: get_outbound().send(
+            Priority.EDIT, chat_id, cb.message.edit_reply_markup,
+            reply_markup=markup
+        ),
+        builder.as_markup(),
+    )
 
 
 @router.message(Command("delete"))
@@ -273,17 +318,17 @@ async def handle_delete(msg: types.Message) -> None:
         IndexError: If no post_id is provided
     """
     if msg.from_user.id not in get_settings().admin_ids:
-        await msg.answer("⛔️ Unauthorized")
+        await _reply(msg, msg.answer, "⛔️ Unauthorized")
         return
         
     try:
         message_id = int(msg.text.split(maxsplit=1)[1])
     except (IndexError, ValueError):
-        await msg.answer("Usage: /delete <post_id>")
+        await _reply(msg, msg.answer, "Usage: /delete <post_id>")
         return
 
     await scream.delete_post(message_id, msg)
-    await msg.answer(f"✅ Post {message_id} deleted")
+    await _reply(msg, msg.answer, f"✅ Post {message_id} deleted")
 
 
 @router.message(Command("stats"))
@@ -293,21 +338,23 @@ async def handle_stats(msg: types.Message) -> None:
     Args:
         msg: The incoming Message object from aiogram
     """
-    user_id = msg.from_user.id
-    count = await scream.get_user_stats(user_id)
-
-    # Generate weekly graph data
+    # Personal numbers and weekly graph data are independent queries
     monday = (msg.date - timedelta(days=msg.date.weekday())).date()
-    labels, data = await scream.weekly_labels_counts(monday)
-    chart = await analytics.chart_url(labels, data)
-
-    total_reactions_received = await user_total_reactions_received(user_id)
+    snapshot, (labels, data) = await asyncio.gather(
+        scream.get_user_snapshot(msg.from_user.id),
+        scream.weekly_labels_counts(monday),
+    )
+    async with get_update_scheduler().limit("chart"):
+        chart = await analytics.chart_photo(labels, data)
 
     stats_text = (
-        f"📊 You’ve posted **{count}** screams so far.\n\n"
-        f"🔥 Total reactions received: **{total_reactions_received}**."
+        f"📊 You’ve posted **{snapshot.post_count}** screams so far.\n\n"
+        f"🔥 Total reactions received: **{snapshot.reactions_received}**."
+    )
+    await _reply(
+        msg, msg.answer_photo, chart,
+        caption=stats_text, parse_mode="Markdown"
     )
-    await msg.answer_photo(chart, caption=stats_text, parse_mode="Markdown")
 
 
 @router.message(Command("meme"))
@@ -321,23 +368,27 @@ async def handle_meme(msg: types.Message) -> None:
         IndexError: If no meme text is provided
     """
     if msg.from_user.id not in get_settings().admin_ids:
-        await msg.answer("⛔️ Unauthorized")
+        await _reply(msg, msg.answer, "⛔️ Unauthorized")
         return
 
     try:
         text_content = msg.text.split(maxsplit=1)[1]
     except IndexError:
-        await msg.answer("Usage: /meme <text>")
+        await _reply(msg, msg.answer, "Usage: /meme <text>")
         return
 
-    meme_url = await meme.generate_meme(text_content)
+    async with get_update_scheduler().limit("meme"):
+        meme_url = await meme.generate_meme(text_content)
     if not meme_url:
-        await msg.answer("⚠️ Meme generation failed (check server logs)")
+        await _reply(
+            msg, msg.answer, "⚠️ Meme generation failed (check server logs)"
+        )
         return
         
-    await msg.bot.send_photo(
+    await get_outbound().send(
+        Priority.CHANNEL, get_settings().channel_id, msg.bot.send_photo,
         chat_id=get_settings().channel_id,
         photo=meme_url,
         caption=text_content
     )
-    await msg.answer("✅ Meme posted to channel!")
\ No newline at end of file
+    await _reply(msg, msg.answer, "✅ Meme posted to channel!")
\ No newline at end of file
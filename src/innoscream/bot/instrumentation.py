@@ -0,0 +1,61 @@
+"""aiogram middlewares feeding :mod:`innoscream.core.metrics`."""
+import time
+from typing import Any, Dict
+
+from aiogram import BaseMiddleware
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.types import TelegramObject
+
+from ..core import metrics
+
+_telegram_seconds = metrics.UPSTREAM_SECONDS.labels("telegram")
+
+
+class HandlerTimer(BaseMiddleware):
+    """Inner middleware timing each handler call by callback name.
+
+    Registered on the dispatcher's event observers, it wraps the matched
+    handler only, so the time updates spend queued is not included.
+    """
+
+    async def __call__(self, handler, event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        """Run ``handler`` and record its duration."""
+        callback = data.get("handler")
+        name = getattr(getattr(callback, "callback", None), "__name__", "?")
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            metrics.HANDLER_SECONDS.labels(name).observe(
+                time.perf_counter() - started
+            )
+
+
+class ApiCallMeter(BaseRequestMiddleware):
+    """Bot session middleware counting Bot API calls by outcome.
+
+    The status is ``ok`` or the aiogram exception class, e.g.
+    ``TelegramRetryAfter`` or ``TelegramNetworkError``.
+    """
+
+    async def __call__(self, make_request, bot, method):
+        """Make the request and record its latency and status."""
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            return await make_request(bot, method)
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            _telegram_seconds.observe(time.perf_counter() - started)
+            metrics.UPSTREAM_REQUESTS.labels("telegram", status).inc()
+
+
+def time_handlers(dispatcher) -> None:
+    """Attach one :class:`HandlerTimer` to every event observer."""
+    timer = HandlerTimer()
+    for name, observer in dispatcher.observers.items():
+        if name not in ("update", "error"):
+            observer.middleware(timer)
@@ -0,0 +1,351 @@
+"""Rate-limited outbound Telegram dispatcher with priority lanes."""
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from aiogram.exceptions import TelegramRetryAfter
+
+from ..core import metrics
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Dispatch lanes, most urgent first."""
+
+    REPLY = 0    # answers to the user who is waiting
+    CHANNEL = 1  # posts / deletes in the channel
+    EDIT = 2     # reaction keyboard refreshes
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens/s, bursts up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        """Create a full bucket."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self, now: Optional[float] = None) -> float:
+        """Seconds until a token is available (0 if one is ready)."""
+        now = time.monotonic() if now is None else now
+        self._refill(now)
+        wait = 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+        return max(wait, self.paused_until - now)
+
+    def take(self) -> None:
+        """Consume one token; call only after ``delay() == 0``."""
+        self.tokens -= 1
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket is full again, i.e. as good as a new one."""
+        self._refill(now)
+        return self.tokens >= self.capacity and self.paused_until <= now
+
+    def pause(self, seconds: float) -> None:
+        """Block the bucket, e.g. for a 429's ``retry_after``."""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class _Job:
+    __slots__ = ("priority", "chat_id", "call", "future", "attempts")
+
+    def __init__(self, priority, chat_id, call, future) -> None:
+        self.priority = priority
+        self.chat_id = chat_id
+        self.call = call
+        self.future = future
+        self.attempts = 0
+
+
+class OutboundDispatcher:
+    """Central queue for Bot API calls.
+
+    Calls wait in a lane per :class:`Priority` and are released when both
+    the global bucket and their chat's bucket have a token. Private chats
+    and groups/channels (negative ids) get different per-chat rates;
+    keyboard edits have a separate per-chat budget of ``edit_rate`` so
+    reaction bursts never spend the channel's posting allowance. Groups
+    may burst ``group_burst`` calls before their rate applies. Buckets
+    that have refilled completely are forgotten, so one per chat the
+    bot ever talked to is not kept forever. A
+    ``TelegramRetryAfter`` pauses the affected bucket and requeues the
+    call. When the dispatcher is not running, calls go out directly.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        chat_rate: float = 1.0,
+        group_rate: float = 20 / 60,
+        group_burst: float = 3.0,
+        edit_rate: float = 1.0,
+        max_attempts: int = 3,
+    ) -> None:
+        """Create a stopped dispatcher."""
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.group_burst = group_burst
+        self.edit_rate = edit_rate
+        self.max_attempts = max_attempts
+        self._lanes: Dict[Priority, Deque[_Job]] = {
+            p: deque() for p in Priority
+        }
+        self._chats: Dict[Any, TokenBucket] = {}
+        self._prune_at = 1024
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight: set = set()
+        self._spawned: set = set()
+        self._seq = itertools.count()
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the dispatch loop is active."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def depth(self) -> Dict[str, int]:
+        """Queued calls per lane."""
+        return {p.name.lower(): len(q) for p, q in self._lanes.items()}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counters plus per-lane queue depth."""
+        return {"sent": self.sent, "retried": self.retried,
+                "failed": self.failed, **self.depth}
+
+    def start(self) -> None:
+        """Spawn the dispatch loop on the running event loop."""
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def spawn(self, coro: Awaitable[Any]) -> asyncio.Task:
+        """Run ``coro``, typically awaiting :meth:`send`, in the background.
+
+        Lets a handler hand off a send that may wait a long time for its
+        chat's budget instead of holding its update slot. :meth:`stop`
+        waits for spawned work like for queued calls; errors are logged.
+        """
+        task = asyncio.ensure_future(coro)
+        self._spawned.add(task)
+        task.add_done_callback(self._spawn_done)
+        return task
+
+    def _spawn_done(self, task: asyncio.Task) -> None:
+        self._spawned.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Background send failed: {task.exception()!r}")
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Give queued calls ``timeout`` seconds to drain, then stop.
+
+        Calls still running get what is left of ``timeout`` and are then
+        cancelled; every call that did not complete, including ones a
+        late 429 requeued, fails with ``RuntimeError``.
+        """
+        if not self.running:
+            return
+        deadline = time.monotonic() + timeout
+        while (any(self._lanes.values()) or self._spawned) \
+                and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        self._task.cancel()
+        self._task = None
+        if self._inflight:
+            _, pending = await asyncio.wait(
+                set(self._inflight),
+                timeout=max(deadline - time.monotonic(), 0),
+            )
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+        for lane in self._lanes.values():
+            while lane:
+                job = lane.popleft()
+                if not job.future.done():
+                    job.future.set_exception(
+                        RuntimeError("outbound dispatcher stopped")
+                    )
+
+    async def send(
+        self,
+        priority: Priority,
+        chat_id: Any,
+        method: Callable[..., Awaitable[Any]],
+        /,
+        *args,
+        **kwargs,
+    ) -> Any:
+        """Run ``method(*args, **kwargs)`` within the rate limits.
+
+        Args:
+            priority: lane to queue in
+            chat_id: target chat for per-chat limiting (None: global only)
+            method: bound Bot/Message method, e.g. ``msg.answer``
+        """
+        def call():
+            return method(*args, **kwargs)
+
+        if not self.running:
+            return await self._direct(call)
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[priority].append(_Job(priority, chat_id, call, future))
+        self._wakeup.set()
+        return await future
+
+    async def _direct(self, call) -> Any:
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = await call()
+            except TelegramRetryAfter as e:
+                if attempt == self.max_attempts:
+                    self.failed += 1
+                    raise
+                self.retried += 1
+                await asyncio.sleep(e.retry_after)
+            else:
+                self.sent += 1
+                return result
+
+    def _bucket(self, chat_id: Any,
+                priority: Priority = Priority.REPLY) -> Optional[TokenBucket]:
+        if chat_id is None:
+            return None
+        is_edit = priority == Priority.EDIT
+        key = (chat_id, Priority.EDIT) if is_edit else chat_id
+        bucket = self._chats.get(key)
+        if bucket is None:
+            burst = 1.0
+            if is_edit:
+                rate = self.edit_rate
+            elif isinstance(chat_id, int) and chat_id < 0:
+                rate, burst = self.group_rate, self.group_burst
+            else:
+                rate = self.chat_rate
+            bucket = self._chats[key] = TokenBucket(rate, max(burst, rate))
+        return bucket
+
+    def _prune(self, now: float) -> None:
+        """Drop full buckets once the table has doubled since last time."""
+        if len(self._chats) < self._prune_at:
+            return
+        for key in [k for k, b in self._chats.items() if b.idle(now)]:
+            del self._chats[key]
+        self._prune_at = max(1024, 2 * len(self._chats))
+
+    def _next_job(self):
+        """Pop the most urgent job that may go now, else the wait time."""
+        now = time.monotonic()
+        wait = self.global_bucket.delay(now)
+        if wait > 0:
+            return None, wait
+        wait = float("inf")
+        for lane in self._lanes.values():
+            for job in lane:
+                bucket = self._bucket(job.chat_id, job.priority)
+                delay = bucket.delay(now) if bucket else 0.0
+                if delay <= 0:
+                    lane.remove(job)
+                    self.global_bucket.take()
+                    if bucket:
+                        bucket.take()
+                    self._prune(now)
+                    return job, 0.0
+                wait = min(wait, delay)
+        return None, wait
+
+    async def _run(self) -> None:
+        while True:
+            job, wait = self._next_job()
+            if job is not None:
+                task = asyncio.create_task(self._execute(job))
+                self._inflight.add(task)
+                task.add_done_callback(self._inflight.discard)
+                continue
+            self._wakeup.clear()
+            timeout = None if wait == float("inf") else wait
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job: _Job) -> None:
+        job.attempts += 1
+        try:
+            result = await job.call()
+        except asyncio.CancelledError:
+            if not job.future.done():
+                job.future.set_exception(
+                    RuntimeError("outbound dispatcher stopped")
+                )
+            raise
+        except TelegramRetryAfter as e:
+            if job.attempts >= self.max_attempts:
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+            self.retried += 1
+            bucket = (self._bucket(job.chat_id, job.priority)
+                      or self.global_bucket)
+            bucket.pause(e.retry_after)
+            self._lanes[job.priority].appendleft(job)
+            self._wakeup.set()
+        except Exception as e:
+            self.failed += 1
+            if not job.future.done():
+                job.future.set_exception(e)
+        else:
+            self.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+
+
+_outbound: OutboundDispatcher | None = None
+
+
+def _queue_depth():
+    if _outbound is None:
+        return {}
+    return {(lane,): n for lane, n in _outbound.depth.items()}
+
+
+metrics.Gauge("innoscream_outbound_queue_depth",
+              "Queued Bot API calls per lane.", _queue_depth, ["lane"])
+
+
+def get_outbound() -> OutboundDispatcher:
+    """Return the shared outbound dispatcher, create on first call."""
+    global _outbound
+    if _outbound is None:
+        settings = get_settings()
+        _outbound = OutboundDispatcher(
+            global_rate=settings.outbound_global_rate,
+            chat_rate=settings.outbound_chat_rate,
+            group_rate=settings.outbound_group_rate_per_min / 60,
+            group_burst=settings.outbound_group_burst,
+            edit_rate=settings.outbound_edit_rate,
+        )
+    return _outbound
@@ -1,7 +1,11 @@
 """Bot runner."""
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 from .handlers import router
+from .instrumentation import ApiCallMeter, time_handlers
+from .update_scheduler import get_update_scheduler
 from ..core.config import get_settings
 
 _bot: Bot | None = None
@@ -9,17 +13,62 @@ _dp: Dispatcher | None = None
 
 
 def get_bot() -> Bot:
-    """Return singleton Bot, create on first call."""
+    """Return singleton Bot, create on first call.
+
+    ``BOT_API_URL`` points the bot at another Bot API server (a local
+    ``telegram-bot-api`` or a test fake) instead of api.telegram.org.
+    """
     global _bot, _dp
     if _bot is None:
         settings = get_settings()
-        _bot = Bot(token=settings.bot_token)
+        session = None
+        if settings.bot_api_url:
+            session = AiohttpSession(
+                api=TelegramAPIServer.from_base(settings.bot_api_url)
+            )
+        _bot = Bot(token=settings.bot_token, session=session)
+        _bot.session.middleware(ApiCallMeter())
+    if _dp is None:
         _dp = Dispatcher()
+        _dp.update.outer_middleware(get_update_scheduler())
         _dp.include_router(router)
+        time_handlers(_dp)
     return _bot
 
 
+def get_dispatcher() -> Dispatcher:
+    """Return the singleton Dispatcher bound to :func:`get_bot`."""
+    get_bot()
+    return _dp
+
+
 async def start_bot() -> None:
     """Launch polling loop once."""
     bot = get_bot()
-    await _dp.start_polling(bot)
+    # getUpdates is refused while a webhook from an earlier run is set
+    await bot.delete_webhook()
+    # the update scheduler runs handlers as tasks and applies backpressure
+    await _dp.start_polling(bot, handle_as_tasks=False)
+
+
+async def setup_webhook() -> None:
+    """Register the webhook URL with Telegram (webhook mode)."""
+    settings = get_settings()
+    if not settings.webhook_url:
+        raise RuntimeError("WEBHOOK_URL is required when BOT_MODE=webhook")
+    if not settings.webhook_secret:
+        # without it anyone who finds the URL can post forged updates
+        raise RuntimeError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
+    bot = get_bot()
+    url = settings.webhook_url.rstrip("/") + settings.webhook_path
+    await bot.set_webhook(
+        url,
+        secret_token=settings.webhook_secret,
+        allowed_updates=_dp.resolve_used_update_types(),
+    )
+
+
+async def stop_bot() -> None:
+    """Close the bot's HTTP session."""
+    if _bot is not None:
+        await _bot.session.close()
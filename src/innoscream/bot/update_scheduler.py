@@ -0,0 +1,105 @@
+"""Concurrent update processing with per-user ordering."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]
+
+
+class UpdateScheduler(BaseMiddleware):
+    """Outer ``dp.update`` middleware that runs updates as tasks.
+
+    Updates from different users run in parallel; updates from the same
+    user run one after another in arrival order. At most ``max_inflight``
+    updates are accepted at once: beyond that the middleware waits for a
+    slot. That backpressure reaches Telegram only in polling mode, where
+    it stalls ``getUpdates``; in webhook mode the HTTP response is sent
+    before a slot is taken, so the endpoint caps its own backlog (see
+    :mod:`.webhook`). Named limits cap expensive steps inside handlers,
+    e.g. ``async with scheduler.limit("chart"): ...``.
+
+    An accepted update is reported to aiogram as handled (``None``);
+    failures inside the task are counted and logged here instead.
+    """
+
+    def __init__(self, max_inflight: int = 64,
+                 limits: Dict[str, int] | None = None) -> None:
+        """Create a scheduler with ``max_inflight`` slots."""
+        self.max_inflight = max_inflight
+        self._slots = asyncio.Semaphore(max_inflight)
+        self._limits = {name: asyncio.Semaphore(n)
+                        for name, n in (limits or {}).items()}
+        self._tails: Dict[Hashable, asyncio.Task] = {}
+        self._tasks: set = set()
+        self.processed = 0
+        self.failed = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Counters plus accepted-but-unfinished updates."""
+        return {"inflight": len(self._tasks), "processed": self.processed,
+                "failed": self.failed}
+
+    def limit(self, name: str) -> asyncio.Semaphore:
+        """Return the semaphore capping concurrent ``name`` operations."""
+        if name not in self._limits:
+            self._limits[name] = asyncio.Semaphore(self.max_inflight)
+        return self._limits[name]
+
+    async def __call__(self, handler: Handler, event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        """Accept the update once a slot is free and run it in a task."""
+        user = data.get("event_from_user")
+        key = user.id if user is not None else None
+        await self._slots.acquire()
+        prev = self._tails.get(key) if key is not None else None
+        task = asyncio.create_task(self._run(prev, handler, event, data))
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._done(key, t))
+        if key is not None:
+            self._tails[key] = task
+        return None
+
+    async def _run(self, prev, handler, event, data) -> None:
+        if prev is not None:
+            await asyncio.wait([prev])  # keep per-user order
+        try:
+            await handler(event, data)
+            self.processed += 1
+        except Exception:
+            self.failed += 1
+            logger.exception("Update handling failed")
+
+    def _done(self, key: Hashable, task: asyncio.Task) -> None:
+        self._slots.release()
+        self._tasks.discard(task)
+        if self._tails.get(key) is task:
+            del self._tails[key]
+
+    async def drain(self, timeout: float = 5.0) -> None:
+        """Wait up to ``timeout`` seconds for accepted updates to finish."""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+
+_scheduler: UpdateScheduler | None = None
+
+
+def get_update_scheduler() -> UpdateScheduler:
+    """Return the shared update scheduler, create on first call."""
+    global _scheduler
+    if _scheduler is None:
+        settings = get_settings()
+        _scheduler = UpdateScheduler(
+            max_inflight=settings.update_max_inflight,
+            limits={"chart": settings.chart_concurrency,
+                    "meme": settings.meme_concurrency},
+        )
+    return _scheduler
@@ -0,0 +1,64 @@
+"""Telegram webhook endpoint for the FastAPI app."""
+import asyncio
+import hmac
+import logging
+from typing import Set
+
+from aiogram.types import Update
+from fastapi import APIRouter, HTTPException, Request
+
+from ..core.config import get_settings
+from .runner import get_bot, get_dispatcher
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"  # nosec B105
+
+_tasks: Set[asyncio.Task] = set()
+
+
+def _log_failure(task: asyncio.Task) -> None:
+    _tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Update handling failed: {task.exception()!r}")
+
+
+async def telegram_webhook(request: Request) -> dict:
+    """Accept one update and process it in the background.
+
+    Telegram only needs a quick 200; the update is fed to the dispatcher
+    in a task so slow handlers never hold the HTTP response. Requests
+    without the configured secret are refused, and so is everything
+    when no secret is configured. While ``UPDATE_MAX_INFLIGHT`` updates
+    are already waiting for the dispatcher, new ones get a 503 and
+    Telegram redelivers them later.
+    """
+    settings = get_settings()
+    given = request.headers.get(SECRET_HEADER, "")
+    if not settings.webhook_secret \
+            or not hmac.compare_digest(given, settings.webhook_secret):
+        raise HTTPException(403, "bad secret token")
+    if len(_tasks) >= settings.update_max_inflight:
+        raise HTTPException(503, "too many updates in flight")
+
+    bot = get_bot()
+    update = Update.model_validate(await request.json(),
+                                   context={"bot": bot})
+    task = asyncio.create_task(get_dispatcher().feed_update(bot, update))
+    _tasks.add(task)
+    task.add_done_callback(_log_failure)
+    return {"ok": True}
+
+
+def build_router(path: str) -> APIRouter:
+    """Return a router serving the webhook at ``path``."""
+    router = APIRouter(tags=["telegram"])
+    router.add_api_route(path, telegram_webhook, methods=["POST"],
+                         include_in_schema=False)
+    return router
+
+
+async def drain(timeout: float = 5.0) -> None:
+    """Wait up to ``timeout`` seconds for in-flight updates."""
+    if _tasks:
+        await asyncio.wait(set(_tasks), timeout=timeout)
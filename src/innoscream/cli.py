@@ -0,0 +1,284 @@
+"""``innoscream`` command line: bulk export/import of the core tables.
+
+Exports stream rows straight from a cursor, so memory stays flat no
+matter how large the table is. Imports insert with ``executemany`` in
+large transactions while secondary indexes and triggers are dropped,
+then rebuild them, ``user_stats``, the daily leaderboard and the hourly
+rollup in one pass each. The per-post reaction counters are recounted
+from ``reactions`` only when reactions were imported (or on request),
+so a posts-only load keeps the counts it carries.
+"""
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import IO, Collection, Dict, Iterable, Iterator, List, Set
+
+from .db.schema import (REBUILD_DAILY_TOP, REBUILD_ROLLUP,
+                        REBUILD_USER_STATS, RECOMPUTE_COUNTERS)
+
+COLUMNS: Dict[str, List[str]] = {
+    "posts": ["post_id", "user_hash", "text", "skull", "fire", "clown",
+              "message_id", "chat_id", "created_at", "is_deleted"],
+    "reactions": ["post_id", "user_hash", "emoji"],
+    "user_stats": ["user_hash", "post_count"],
+}
+# Columns that may be NULL; every other column must be present in a record.
+NULLABLE: Dict[str, Set[str]] = {
+    "posts": {"post_id", "created_at"},
+    "reactions": set(),
+    "user_stats": set(),
+}
+FORMATS = ("ndjson", "csv")
+_CONFLICT = {"abort": "INSERT", "ignore": "INSERT OR IGNORE",
+             "replace": "INSERT OR REPLACE"}
+
+
+def _default_db() -> str:
+    from .core.config import Settings
+    return os.environ.get("DB_PATH", Settings.model_fields["db_path"].default)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open ``path`` after applying pending schema migrations."""
+    import aiosqlite
+    from .db.migrations import migrate
+
+    async def _migrate():
+        async with aiosqlite.connect(path) as db:
+            await migrate(db)
+
+    asyncio.run(_migrate())
+    db = sqlite3.connect(path, isolation_level=None)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA temp_store=MEMORY")
+    db.execute("PRAGMA cache_size=-200000")
+    return db
+
+
+# ------------------------------------------------------------ export -----
+def export_rows(db: sqlite3.Connection, table: str) -> Iterator[tuple]:
+    """Yield every row of ``table`` in primary-key order."""
+    cols = COLUMNS[table]
+    cur = db.execute(
+        f"SELECT {', '.join(cols)} FROM {table} ORDER BY 1"  # nosec B608
+    )
+    cur.arraysize = 1000
+    while True:
+        rows = cur.fetchmany()
+        if not rows:
+            return
+        yield from rows
+
+
+def write_rows(rows: Iterable[tuple], cols: List[str], fmt: str,
+               out: IO[str]) -> int:
+    """Serialize ``rows`` to ``out``; return how many were written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(cols)
+        for count, row in enumerate(rows, 1):
+            writer.writerow(row)
+        return count
+    for count, row in enumerate(rows, 1):
+        out.write(json.dumps(dict(zip(cols, row)), ensure_ascii=False))
+        out.write("\n")
+    return count
+
+
+# ------------------------------------------------------------ import -----
+def read_rows(src: IO[str], cols: List[str], fmt: str,
+              nullable: Collection[str] = ()) -> Iterator[tuple]:
+    """Parse NDJSON or CSV records into tuples ordered like ``cols``.
+
+    Empty CSV cells of ``nullable`` columns become NULL. A record lacking
+    any other column raises ``ValueError`` naming its line, before the
+    row reaches a batch.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(src)
+        records: Iterable = ((reader.line_num, {
+            c: None if v == "" and c in nullable else v
+            for c, v in record.items()
+        }) for record in reader)
+    else:
+        records = ((n, json.loads(line))
+                   for n, line in enumerate(src, 1) if line.strip())
+    for line, record in records:
+        row = tuple(record.get(c) for c in cols)
+        missing = [c for c, v in zip(cols, row)
+                   if v is None and c not in nullable]
+        if missing:
+            raise ValueError(f"line {line}: missing {', '.join(missing)}")
+        yield row
+
+
+@contextmanager
+def deferred_indexes(db: sqlite3.Connection, tables: Iterable[str],
+                     recount: bool = False):
+    """Drop secondary indexes and triggers of ``tables``, restore on exit.
+
+    Derived tables (``user_stats``, leaderboard, rollup) are rebuilt
+    afterwards even if the load failed half-way, so the database stays
+    consistent with whatever rows made it in. With ``recount`` the post
+    reaction counters are first recomputed from ``reactions``.
+    """
+    tables = tuple(tables)
+    saved = db.execute(
+        "SELECT type, name, sql FROM sqlite_master "
+        "WHERE type IN ('index', 'trigger') AND sql IS NOT NULL "
+        f"AND tbl_name IN ({','.join('?' * len(tables))})",  # nosec B608
+        tables,
+    ).fetchall()
+    for kind, name, _ in saved:
+        db.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+    try:
+        yield
+    finally:
+        restore = ";\n".join(sql for _, _, sql in saved)
+        counters = RECOMPUTE_COUNTERS if recount else ""
+        db.executescript(
+            f"BEGIN;\n{counters}{REBUILD_USER_STATS}{REBUILD_DAILY_TOP}"
+            f"{REBUILD_ROLLUP}{restore};\nCOMMIT;"
+        )
+
+
+def import_rows(db: sqlite3.Connection, table: str, rows: Iterable[tuple],
+                batch: int = 50_000, on_conflict: str = "abort") -> int:
+    """Insert ``rows`` into ``table`` in transactions of ``batch`` rows."""
+    cols = COLUMNS[table]
+    sql = (f"{_CONFLICT[on_conflict]} INTO {table} ({', '.join(cols)}) "
+           f"VALUES ({', '.join('?' * len(cols))})")  # nosec B608
+    db.execute("PRAGMA synchronous=OFF")
+    total = 0
+    rows = iter(rows)
+    while chunk := list(itertools.islice(rows, batch)):
+        db.execute("BEGIN")
+        try:
+            db.executemany(sql, chunk)
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        total += len(chunk)
+    db.execute("PRAGMA synchronous=NORMAL")
+    return total
+
+
+# --------------------------------------------------------------- CLI -----
+def _detect_format(path: str, fmt: str | None) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.endswith(".csv") else "ndjson"
+
+
+def _open(path: str, mode: str):
+    if path == "-":
+        return nullcontext(sys.stdout if "w" in mode else sys.stdin)
+    return open(path, mode, encoding="utf-8", newline="")
+
+
+def cmd_export(args) -> None:
+    """Stream one table to a file or stdout."""
+    db = connect(args.db)
+    fmt = _detect_format(args.output, args.format)
+    with _open(args.output, "w") as out:
+        count = write_rows(export_rows(db, args.table), COLUMNS[args.table],
+                           fmt, out)
+    print(f"exported {count} {args.table} rows", file=sys.stderr)
+
+
+def cmd_import(args) -> None:
+    """Bulk-load files into their tables, then rebuild derived data."""
+    db = connect(args.db)
+    started = time.perf_counter()
+    tables = {spec.partition("=")[0] for spec in args.files}
+    recount = args.recount or "reactions" in tables
+    with deferred_indexes(db, ["posts", "reactions", "user_stats"],
+                          recount):
+        for spec in args.files:
+            table, _, path = spec.partition("=")
+            fmt = _detect_format(path, args.format)
+            with _open(path, "r") as src:
+                rows = read_rows(src, COLUMNS[table], fmt, NULLABLE[table])
+                try:
+                    count = import_rows(db, table, rows, args.batch,
+                                        args.on_conflict)
+                except ValueError as e:
+                    raise SystemExit(f"{path}: {e}") from e
+            print(f"imported {count} {table} rows", file=sys.stderr)
+    print(f"done in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+
+
+def cmd_recompute(args) -> None:
+    """Rebuild counters, user_stats, leaderboard and rollup."""
+    db = connect(args.db)
+    with deferred_indexes(db, ["posts"], recount=True):
+        pass
+    print("recomputed derived tables", file=sys.stderr)
+
+
+def _table_file(value: str) -> str:
+    table, sep, path = value.partition("=")
+    if not sep or table not in COLUMNS or not path:
+        raise argparse.ArgumentTypeError(
+            f"expected TABLE=FILE with TABLE in {', '.join(COLUMNS)}"
+        )
+    return value
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Return the argument parser for ``innoscream``."""
+    parser = argparse.ArgumentParser(prog="innoscream",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("--db", default=None,
+                        help="database file (default: $DB_PATH)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    export = sub.add_parser("export", help="stream a table out")
+    export.add_argument("table", choices=list(COLUMNS))
+    export.add_argument("-o", "--output", default="-")
+    export.add_argument("--format", choices=FORMATS)
+    export.set_defaults(func=cmd_export)
+
+    load = sub.add_parser(
+        "import", help="bulk-load tables",
+        description="Bulk-load tables, then rebuild user_stats, the daily "
+                    "leaderboard and the hourly rollup. Post reaction "
+                    "counters are recounted from the reactions table only "
+                    "when reactions are imported or --recount is given; "
+                    "otherwise the imported counts are kept.",
+    )
+    load.add_argument("files", nargs="+", type=_table_file,
+                      metavar="TABLE=FILE")
+    load.add_argument("--format", choices=FORMATS)
+    load.add_argument("--batch", type=int, default=50_000)
+    load.add_argument("--on-conflict", choices=list(_CONFLICT),
+                      default="abort")
+    load.add_argument("--recount", action="store_true",
+                      help="recount post reactions from the reactions "
+                           "table even when none are imported")
+    load.set_defaults(func=cmd_import)
+
+    recompute = sub.add_parser("recompute",
+                               help="rebuild counters and derived tables")
+    recompute.set_defaults(func=cmd_recompute)
+    return parser
+
+
+def main(argv: List[str] | None = None) -> None:
+    """Entry point of the ``innoscream`` script."""
+    args = build_parser().parse_args(argv)
+    args.db = args.db or _default_db()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
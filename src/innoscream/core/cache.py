@@ -0,0 +1,111 @@
+"""Small in-process caches shared by the repo and service layers."""
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used mapping with optional time-to-live.
+
+    Not thread-safe; meant to be used from the event loop only.
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = None):
+        """Create an empty cache holding at most ``maxsize`` entries."""
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of stored entries (expired ones included)."""
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Whether ``key`` holds a live entry; does not count as a lookup."""
+        item = self._data.get(key)
+        return item is not None and not self._expired(item)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def _expired(self, item: tuple) -> bool:
+        return item[1] is not None and item[1] <= time.monotonic()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value or ``default``."""
+        item = self._data.get(key, _MISSING)
+        if item is _MISSING or self._expired(item):
+            if item is not _MISSING:
+                del self._data[key]
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return item[0]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store ``value``; ``ttl`` overrides the cache-wide default."""
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def keys(self) -> list:
+        """Return a snapshot of the stored keys, oldest first."""
+        return list(self._data)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove ``key`` and return its value (expired or not)."""
+        item = self._data.pop(key, _MISSING)
+        return default if item is _MISSING else item[0]
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._data.clear()
+
+
+class ReadGuard:
+    """Detect writes to a key that land while it is being read.
+
+    Callers take a token with :meth:`begin` before querying and pass it
+    to :meth:`end` afterwards; ``end`` is false if :meth:`bump` was
+    called for the key in between, so the result must not be cached.
+    Only keys with a read in flight are tracked, so the table never
+    outgrows the number of concurrent reads.
+    """
+
+    def __init__(self) -> None:
+        """Start with no reads in flight."""
+        self._keys: Dict[Hashable, list] = {}  # key -> [writes, readers]
+
+    def __len__(self) -> int:
+        """Return the number of keys being read."""
+        return len(self._keys)
+
+    def begin(self, key: Hashable) -> int:
+        """Register a read of ``key`` and return its token."""
+        entry = self._keys.setdefault(key, [0, 0])
+        entry[1] += 1
+        return entry[0]
+
+    def end(self, key: Hashable, token: int) -> bool:
+        """Finish a read; return whether ``key`` was left untouched."""
+        entry = self._keys[key]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._keys[key]
+        return entry[0] == token
+
+    def bump(self, key: Hashable) -> None:
+        """Record a write to ``key``; a no-op if nobody is reading it."""
+        entry = self._keys.get(key)
+        if entry is not None:
+            entry[0] += 1
@@ -1,5 +1,7 @@
 """InnoScream Bot config module."""
 
+from typing import Literal
+
 from pydantic import Field, ConfigDict
 from pydantic_settings import BaseSettings
 from functools import lru_cache
@@ -16,6 +18,20 @@ class Settings(BaseSettings):
     # Telegram / Bot
     bot_token: str = Field(..., validation_alias="BOT_TOKEN")
     admins: str | None = Field(None, validation_alias="ADMINS")
+    # "polling", "webhook" (served by the FastAPI app) or "off" (API only)
+    bot_mode: Literal["polling", "webhook", "off"] = Field(
+        "polling",
+        validation_alias="BOT_MODE"
+    )
+    webhook_url: str | None = Field(None, validation_alias="WEBHOOK_URL")
+    webhook_path: str = Field(
+        "/telegram/webhook",
+        validation_alias="WEBHOOK_PATH"
+    )
+    webhook_secret: str | None = Field(None, validation_alias="WEBHOOK_SECRET")
+    # Alternative Bot API server, e.g. a local fake for load tests
+    bot_api_url: str | None = Field(None, validation_alias="BOT_API_URL")
+    scheduler_enabled: bool = Field(True, validation_alias="SCHEDULER_ENABLED")
 
     # Security / Hash salt
     hash_salt: str = Field("dev-salt", validation_alias="HASH_SALT")
@@ -30,6 +46,96 @@ class Settings(BaseSettings):
         default=None,
         validation_alias="IMGFLIP_PASS"
     )
+    imgflip_api_url: str = Field(
+        "https://api.imgflip.com/caption_image",
+        validation_alias="IMGFLIP_API_URL"
+    )
+    quickchart_url: str = Field(
+        "https://quickchart.io/chart/create",
+        validation_alias="QUICKCHART_URL"
+    )
+    imgflip_timeout: float = Field(10.0, validation_alias="IMGFLIP_TIMEOUT")
+    quickchart_timeout: float = Field(
+        5.0,
+        validation_alias="QUICKCHART_TIMEOUT"
+    )
+
+    # Meme cache
+    meme_cache_size: int = Field(256, validation_alias="MEME_CACHE_SIZE")
+    meme_cache_ttl: float = Field(86400.0, validation_alias="MEME_CACHE_TTL")
+
+    # Charts: "quickchart" (remote) or "local" (matplotlib, falls back)
+    chart_backend: Literal["quickchart", "local"] = Field(
+        "quickchart",
+        validation_alias="CHART_BACKEND"
+    )
+    # Chart cache
+    chart_cache_size: int = Field(256, validation_alias="CHART_CACHE_SIZE")
+    chart_cache_ttl: float = Field(86400.0, validation_alias="CHART_CACHE_TTL")
+    chart_cache_persist: bool = Field(
+        True,
+        validation_alias="CHART_CACHE_PERSIST"
+    )
+
+    # Outbound Telegram rate limits
+    outbound_global_rate: float = Field(
+        30.0,
+        validation_alias="OUTBOUND_GLOBAL_RATE"
+    )
+    outbound_chat_rate: float = Field(
+        1.0,
+        validation_alias="OUTBOUND_CHAT_RATE"
+    )
+    outbound_group_rate_per_min: float = Field(
+        20.0,
+        validation_alias="OUTBOUND_GROUP_RATE_PER_MIN"
+    )
+    outbound_group_burst: float = Field(
+        3.0,
+        validation_alias="OUTBOUND_GROUP_BURST"
+    )
+    outbound_edit_rate: float = Field(
+        1.0,
+        validation_alias="OUTBOUND_EDIT_RATE"
+    )
+
+    # Update processing: accepted updates and per-operation caps
+    update_max_inflight: int = Field(
+        64,
+        validation_alias="UPDATE_MAX_INFLIGHT"
+    )
+    chart_concurrency: int = Field(2, validation_alias="CHART_CONCURRENCY")
+    meme_concurrency: int = Field(4, validation_alias="MEME_CONCURRENCY")
+
+    # Reaction keyboards: min seconds between edits of one message
+    keyboard_update_interval: float = Field(
+        1.0,
+        validation_alias="KEYBOARD_UPDATE_INTERVAL"
+    )
+
+    # HTTP API response cache for finished days
+    api_cache_bytes: int = Field(
+        4 * 1024 * 1024,
+        validation_alias="API_CACHE_BYTES"
+    )
+
+    # Database
+    db_path: str = Field("data/screams.db", validation_alias="DB_PATH")
+    db_pool_size: int = Field(4, validation_alias="DB_POOL_SIZE")
+    db_slow_query_ms: float = Field(
+        100.0,
+        validation_alias="DB_SLOW_QUERY_MS"
+    )
+    write_batch_size: int = Field(64, validation_alias="WRITE_BATCH_SIZE")
+    write_batch_latency_ms: float = Field(
+        5.0,
+        validation_alias="WRITE_BATCH_LATENCY_MS"
+    )
+    post_id_block_size: int = Field(32, validation_alias="POST_ID_BLOCK")
+    reaction_cache_posts: int = Field(
+        1024,
+        validation_alias="REACTION_CACHE_POSTS"
+    )
 
     @property
     def admin_ids(self) -> set[int]:
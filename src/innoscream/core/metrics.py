@@ -0,0 +1,271 @@
+"""Process-local Prometheus metrics in the text exposition format.
+
+Instruments are plain Python objects; recording a sample is a dict
+lookup (skipped entirely when the labelled child is bound up front),
+a ``bisect`` and a few integer additions, so they are cheap enough for
+every handler call and query. :func:`render` produces the
+``text/plain; version=0.0.4`` payload served at ``/metrics``.
+"""
+import functools
+import math
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; from a cached query up to a slow upstream call
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25,
+                   0.5, 1.0, 2.5, 5.0, 10.0)
+
+_registry: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return (value.replace("\\", r"\\").replace("\n", r"\n")
+            .replace('"', r"\""))
+
+
+def _labelset(names: Sequence[str], values: Sequence[str]) -> str:
+    return ",".join(f'{n}="{_escape(str(v))}"' for n, v in zip(names, values))
+
+
+def _number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """A registered metric family rendered by :func:`render`."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        _registry.append(self)
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Return the sample lines of the exposition format."""
+
+    def render(self) -> str:
+        """Return the HELP/TYPE header and every sample line."""
+        head = [f"# HELP {self.name} {_escape(self.documentation)}",
+                f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(head + self._samples())
+
+
+class _Recorded(_Metric):
+    """A metric recorded into one child per label set."""
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labels)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    @abstractmethod
+    def _new_child(self):
+        """Return an empty child for a new label set."""
+
+    def labels(self, *values: str):
+        """Return the child for ``values``, creating it on first use."""
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.label_names):
+                raise ValueError(f"{self.name} takes labels "
+                                 f"{self.label_names}, got {values}")
+            child = self._children[key] = self._new_child()
+        return child
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Counter(_Recorded):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        """Increment an unlabelled counter."""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            labels = _labelset(self.label_names, key)
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}{suffix} {_number(child.value)}")
+        return lines
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Recorded):
+    """Distribution of observations over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str,
+                 labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        """Create a histogram with upper bounds ``buckets``."""
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record ``value`` on an unlabelled histogram."""
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        bounds = [_number(b) for b in self.buckets] + ["+Inf"]
+        for key, child in list(self._children.items()):
+            labels = _labelset(self.label_names, key)
+            sep = "," if labels else ""
+            total = 0
+            for bound, count in zip(bounds, list(child.counts)):
+                total += count
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}}'
+                             f" {total}")
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_number(child.sum)}")
+            lines.append(f"{self.name}_count{suffix} {total}")
+        return lines
+
+
+GaugeValue = Union[float, Dict[Tuple[str, ...], float]]
+
+
+class Gauge(_Metric):
+    """Value read from ``collect()`` at scrape time.
+
+    ``collect`` returns a number, or a mapping of label values to numbers
+    for labelled gauges. Nothing is recorded on the hot path.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str,
+                 collect: Callable[[], GaugeValue],
+                 labels: Sequence[str] = ()) -> None:
+        """Create a gauge backed by ``collect``."""
+        super().__init__(name, documentation, labels)
+        self._collect = collect
+
+    def _samples(self) -> List[str]:
+        values = self._collect()
+        if not isinstance(values, dict):
+            values = {(): values}
+        lines = []
+        for key, value in values.items():
+            labels = _labelset(self.label_names, key)
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}{suffix} {_number(value)}")
+        return lines
+
+
+def timed(histogram: Histogram, label: str | None = None):
+    """Decorate a coroutine function to observe its duration.
+
+    The single label value defaults to the function's ``__name__``.
+    Failed calls are timed too.
+    """
+    def decorate(fn):
+        child = histogram.labels(label or fn.__name__)
+        clock = time.perf_counter
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                child.observe(clock() - started)
+        return wrapper
+    return decorate
+
+
+def render() -> str:
+    """Return every registered metric in the text exposition format."""
+    return "\n".join(m.render() for m in _registry) + "\n"
+
+
+# ------------------------------------------------------- instruments -----
+HANDLER_SECONDS = Histogram(
+    "innoscream_handler_duration_seconds",
+    "Time spent in aiogram handlers.", ["handler"],
+)
+REPO_SECONDS = Histogram(
+    "innoscream_repo_duration_seconds",
+    "Time spent in scream_repo functions.", ["function"],
+)
+UPSTREAM_REQUESTS = Counter(
+    "innoscream_upstream_requests_total",
+    "Calls to ImgFlip, QuickChart and the Telegram Bot API.",
+    ["upstream", "status"],
+)
+UPSTREAM_SECONDS = Histogram(
+    "innoscream_upstream_duration_seconds",
+    "Latency of upstream calls.", ["upstream"],
+)
+DB_CONNECTIONS_OPENED = Counter(
+    "innoscream_db_connections_opened_total",
+    "SQLite connections opened by the pool.",
+)
+DB_CONNECTIONS_CLOSED = Counter(
+    "innoscream_db_connections_closed_total",
+    "SQLite connections closed or discarded by the pool.",
+)
+DB_CHECKOUTS = Counter(
+    "innoscream_db_checkouts_total",
+    "Connections borrowed from the pool.",
+)
+DB_SLOW_QUERIES = Counter(
+    "innoscream_db_slow_queries_total",
+    "Statements slower than DB_SLOW_QUERY_MS.",
+)
+DB_TRANSACTIONS = Counter(
+    "innoscream_db_transactions_total",
+    "Group-commit write transactions by outcome.", ["outcome"],
+)
+DB_BATCH_SIZE = Histogram(
+    "innoscream_db_write_batch_size",
+    "Write operations per group-commit transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+JOB_SECONDS = Histogram(
+    "innoscream_job_duration_seconds",
+    "Duration of scheduled jobs.", ["job"],
+    buckets=DEFAULT_BUCKETS + (30.0, 60.0),
+)
@@ -0,0 +1,43 @@
+"""Per-phase timing of application startup."""
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+
+class StartupProfile:
+    """Wall-clock duration of each named startup phase, in order.
+
+    Phases include the imports they trigger, so a subsystem that pulls in
+    a heavy library is charged for it.
+    """
+
+    def __init__(self) -> None:
+        """Start with no phases recorded."""
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time the ``with`` block as phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - started
+
+    @property
+    def total(self) -> float:
+        """Sum of all phases in seconds."""
+        return sum(self.phases.values())
+
+    def summary(self) -> str:
+        """One line such as ``db 12.0 ms, bot 80.5 ms (total 92.5 ms)``."""
+        parts = ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                          for name, seconds in self.phases.items())
+        return f"{parts} (total {self.total * 1000:.1f} ms)"
+
+    def report(self) -> None:
+        """Log the summary."""
+        logger.info(f"Startup: {self.summary()}")
@@ -3,36 +3,114 @@ import aiosqlite
 import pathlib
 from contextlib import asynccontextmanager
 
-from .schema import SCHEMA_DDL
+from .pool import ConnectionPool
+from .tracing import QueryTracer
+from .writer import WriteOp, WriteQueue
+from .migrations import migrate
+from ..core import metrics
+from ..core.config import get_settings
 
-_DB_PATH = pathlib.Path("data") / "screams.db"
-_DB_PATH.parent.mkdir(exist_ok=True)
+_pool: ConnectionPool | None = None
+_tracer: QueryTracer | None = None
+_writer: WriteQueue | None = None
+_rollback_hooks: list = []
+
+
+def get_tracer() -> QueryTracer | None:
+    """Return the statement tracer, or None if DB_SLOW_QUERY_MS is 0."""
+    global _tracer
+    slow_ms = get_settings().db_slow_query_ms
+    if _tracer is None and slow_ms > 0:
+        _tracer = QueryTracer(slow_ms / 1000)
+    return _tracer
+
+
+def get_pool() -> ConnectionPool:
+    """Return the process-wide connection pool, create on first call."""
+    global _pool
+    if _pool is None:
+        settings = get_settings()
+        _pool = ConnectionPool(settings.db_path, size=settings.db_pool_size,
+                               tracer=get_tracer())
+    return _pool
+
+
+def _pool_connections():
+    if _pool is None:
+        return {}
+    return {("open",): _pool.opened, ("idle",): _pool.idle}
+
+
+metrics.Gauge("innoscream_db_pool_connections",
+              "Pooled SQLite connections by state.", _pool_connections,
+              ["state"])
+
+
+def on_rollback(hook) -> None:
+    """Register a callback run when a write batch fails to commit."""
+    _rollback_hooks.append(hook)
+
+
+def _run_rollback_hooks() -> None:
+    for hook in _rollback_hooks:
+        hook()
+
+
+def get_writer() -> WriteQueue:
+    """Return the process-wide write queue, create on first call."""
+    global _writer
+    if _writer is None:
+        settings = get_settings()
+        _writer = WriteQueue(
+            lambda: get_db(),
+            max_batch=settings.write_batch_size,
+            max_latency=settings.write_batch_latency_ms / 1000,
+            on_rollback=_run_rollback_hooks,
+        )
+    return _writer
+
+
+async def write(op: WriteOp):
+    """Run a write operation through the group-commit queue."""
+    return await get_writer().submit(op)
 
 
 async def init_db() -> None:
     """Initialize the database with required schema.
 
-    Creates the database file if it doesn't exist
-    and executes the DDL schema script.
+    Creates the database file if it doesn't exist,
+    applies pending schema migrations, warms up the connection pool
+    and starts the group-commit writer.
     """
-    async with aiosqlite.connect(_DB_PATH) as db:
-        await db.executescript(SCHEMA_DDL)
-        await db.commit()
+    path = pathlib.Path(get_settings().db_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    async with aiosqlite.connect(path) as db:
+        await migrate(db)
+    await get_pool().open()
+    get_writer().start()
+
+
+async def close_db() -> None:
+    """Flush pending writes and close the pool (FastAPI shutdown hook)."""
+    global _pool, _writer
+    if _writer is not None:
+        await _writer.stop()
+        _writer = None
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
 
 
 @asynccontextmanager
 async def get_db():
     """Async context manager for database connections.
 
-    Provides database connections with automatic cleanup,
-    and configures SQLite to use Write-Ahead Logging (WAL) mode.
+    Checks a connection out of the shared pool and returns it on exit.
+    Pooled connections are configured once with Write-Ahead Logging (WAL)
+    mode when they are opened.
 
     Yields:
         aiosqlite.Connection: active database connection
     """
-    db = await aiosqlite.connect(_DB_PATH)
-    await db.execute("PRAGMA journal_mode=WAL;")
-    try:
+    async with get_pool().connection() as db:
         yield db
-    finally:
-        await db.close()
@@ -0,0 +1,67 @@
+"""Versioned schema migrations."""
+import logging
+from typing import List, Optional, Tuple
+
+import aiosqlite
+
+from .schema import (
+    CREATE_CHART_CACHE,
+    CREATE_DAILY_TOP,
+    CREATE_DAILY_TOP_RESTORE,
+    CREATE_INDEXES,
+    CREATE_ROLLUP,
+    CREATE_SCHEMA_VERSION,
+    SCHEMA_DDL,
+)
+
+logger = logging.getLogger(__name__)
+
+# (version, name, DDL script) — append only, never edit an applied entry.
+# Scripts must be idempotent so a half-applied database can be re-run.
+MIGRATIONS: List[Tuple[int, str, str]] = [
+    (1, "initial schema", SCHEMA_DDL),
+    (2, "indexes for hot queries", CREATE_INDEXES),
+    (3, "materialized daily leaderboard", CREATE_DAILY_TOP),
+    (4, "daily/hourly post count rollup", CREATE_ROLLUP),
+    (5, "persistent chart cache", CREATE_CHART_CACHE),
+    (6, "restore trigger for the daily leaderboard", CREATE_DAILY_TOP_RESTORE),
+]
+
+
+async def current_version(db: aiosqlite.Connection) -> int:
+    """Return the highest applied migration version (0 for a fresh DB)."""
+    await db.executescript(CREATE_SCHEMA_VERSION)
+    rows = await db.execute_fetchall("SELECT MAX(version) FROM schema_version")
+    return rows[0][0] or 0
+
+
+async def migrate(db: aiosqlite.Connection,
+                  target: Optional[int] = None) -> int:
+    """Apply pending migrations in order, each in its own transaction.
+
+    Args:
+        db: connection to migrate
+        target: stop after this version (default: apply all)
+
+    Returns:
+        schema version after migrating
+    """
+    version = await current_version(db)
+    for number, name, script in MIGRATIONS:
+        if number <= version:
+            continue
+        if target is not None and number > target:
+            break
+        logger.info(f"Applying migration {number}: {name}")
+        try:
+            await db.executescript(f"BEGIN;\n{script}")
+            await db.execute(
+                "INSERT INTO schema_version (version, name) VALUES (?, ?)",
+                (number, name),
+            )
+            await db.commit()
+        except Exception:
+            await db.rollback()
+            raise
+        version = number
+    return version
@@ -0,0 +1,160 @@
+"""Pool of long-lived aiosqlite connections."""
+import asyncio
+import logging
+import pathlib
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import aiosqlite
+
+from ..core import metrics
+from .tracing import QueryTracer
+
+logger = logging.getLogger(__name__)
+
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+
+class ConnectionPool:
+    """Bounded set of warm SQLite connections with checkout/checkin.
+
+    Every connection is configured once when it is opened; afterwards
+    callers borrow it through :meth:`connection` and give it back on exit.
+    Idle connections are pinged before reuse and replaced when broken.
+    """
+
+    def __init__(
+        self,
+        path: pathlib.Path,
+        size: int = 4,
+        health_check_after: float = 30.0,
+        tracer: Optional[QueryTracer] = None,
+    ) -> None:
+        """Create an empty pool; connections are opened in :meth:`open`."""
+        if size < 1:
+            raise ValueError("pool size must be positive")
+        self._path = path
+        self._size = size
+        self._health_check_after = health_check_after
+        self._tracer = tracer
+        self._idle: asyncio.LifoQueue = asyncio.LifoQueue()
+        self._all: List[aiosqlite.Connection] = []
+        self._last_used: dict[int, float] = {}
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    @property
+    def size(self) -> int:
+        """Maximum number of connections."""
+        return self._size
+
+    @property
+    def opened(self) -> int:
+        """Number of connections currently open."""
+        return len(self._all)
+
+    @property
+    def idle(self) -> int:
+        """Number of connections waiting in the pool."""
+        return self._idle.qsize() - (1 if self._closed else 0)
+
+    async def _connect(self) -> aiosqlite.Connection:
+        db = await aiosqlite.connect(self._path)
+        for pragma in _PRAGMAS:
+            await db.execute(pragma)
+        if self._tracer is not None:
+            db = self._tracer.wrap(db)
+        self._all.append(db)
+        metrics.DB_CONNECTIONS_OPENED.inc()
+        return db
+
+    async def _discard(self, db: aiosqlite.Connection) -> None:
+        if db in self._all:
+            self._all.remove(db)
+        self._last_used.pop(id(db), None)
+        metrics.DB_CONNECTIONS_CLOSED.inc()
+        try:
+            await db.close()
+        except Exception as e:  # connection is already unusable
+            logger.warning(f"Failed to close pooled connection: {e}")
+
+    async def _healthy(self, db: aiosqlite.Connection) -> bool:
+        idle_for = time.monotonic() - self._last_used.get(id(db), 0.0)
+        if idle_for < self._health_check_after:
+            return True
+        try:
+            await db.execute("SELECT 1")
+        except Exception as e:
+            logger.warning(f"Dropping broken pooled connection: {e}")
+            return False
+        return True
+
+    async def open(self) -> None:
+        """Open all connections up front so the first requests are warm."""
+        if self._closed:  # drop the wake-up marker left by close()
+            self._idle = asyncio.LifoQueue()
+        self._closed = False
+        async with self._lock:
+            while len(self._all) < self._size:
+                db = await self._connect()
+                self._last_used[id(db)] = time.monotonic()
+                self._idle.put_nowait(db)
+
+    async def acquire(self) -> aiosqlite.Connection:
+        """Check out a connection, opening or waiting for one if needed."""
+        if self._closed:
+            raise RuntimeError("connection pool is closed")
+        metrics.DB_CHECKOUTS.inc()
+        while True:
+            if self._idle.empty():
+                async with self._lock:
+                    if len(self._all) < self._size:
+                        return await self._connect()
+            db = await self._idle.get()
+            if db is None:  # close() woke us; pass the marker on
+                self._idle.put_nowait(None)
+                raise RuntimeError("connection pool is closed")
+            if await self._healthy(db):
+                return db
+            await self._discard(db)
+
+    async def release(self, db: aiosqlite.Connection) -> None:
+        """Check a connection back in, rolling back anything left open."""
+        if self._closed:
+            await self._discard(db)
+            return
+        try:
+            if db.in_transaction:
+                await db.rollback()
+        except Exception as e:
+            logger.warning(f"Dropping pooled connection on release: {e}")
+            await self._discard(db)
+            return
+        self._last_used[id(db)] = time.monotonic()
+        self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a connection for the duration of the ``async with`` block."""
+        db = await self.acquire()
+        try:
+            yield db
+        finally:
+            await self.release(db)
+
+    async def close(self) -> None:
+        """Close every connection; borrowed ones are closed on release.
+
+        Callers still waiting in :meth:`acquire` get a ``RuntimeError``.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        while not self._idle.empty():
+            await self._discard(self._idle.get_nowait())
+        self._idle.put_nowait(None)
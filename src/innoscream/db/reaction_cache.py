@@ -0,0 +1,124 @@
+"""In-memory cache of reaction state for recently active posts."""
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+Counts = Tuple[int, int, int]
+
+
+class _PostEntry:
+    __slots__ = ("counts", "reactions", "complete")
+
+    def __init__(self, counts: Optional[Counts], complete: bool) -> None:
+        self.counts = counts
+        # user_hash -> emoji, or None when the user is known to have none
+        self.reactions: Dict[str, Optional[str]] = {}
+        # True when every reaction of the post is in ``reactions``
+        self.complete = complete
+
+
+class ReactionCache:
+    """Bounded LRU of per-post reaction state.
+
+    Maps ``(post_id, user_hash)`` to the user's current emoji and
+    ``post_id`` to its ``(skull, fire, clown)`` counts. Entries are grouped
+    by post, so evicting the least recently touched post drops all of its
+    reactions at once. Posts created while the cache is alive are tracked
+    as *complete*: a user missing from them has not reacted, so lookups
+    never need the database.
+
+    The cache must only be mutated from inside write operations, which the
+    writer runs one at a time.
+    """
+
+    def __init__(self, max_posts: int = 1024, max_reactions: int = 100_000):
+        """Create an empty cache with the given bounds."""
+        self._max_posts = max_posts
+        self._max_reactions = max_reactions
+        self._posts: "OrderedDict[int, _PostEntry]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """Return the number of cached posts."""
+        return len(self._posts)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "posts": len(self._posts),
+            "reactions": self._size,
+        }
+
+    def _entry(self, post_id: int, create: bool = False):
+        entry = self._posts.get(post_id)
+        if entry is not None:
+            self._posts.move_to_end(post_id)
+        elif create:
+            entry = self._posts[post_id] = _PostEntry(None, complete=False)
+            self._evict()
+        return entry
+
+    def _evict(self) -> None:
+        while len(self._posts) > 1 and (
+            len(self._posts) > self._max_posts
+            or self._size > self._max_reactions
+        ):
+            _, old = self._posts.popitem(last=False)
+            self._size -= len(old.reactions)
+
+    def track_new_post(self, post_id: int) -> None:
+        """Register a freshly inserted post with no reactions."""
+        self._posts[post_id] = _PostEntry((0, 0, 0), complete=True)
+        self._posts.move_to_end(post_id)
+        self._evict()
+
+    def get_reaction(self, post_id: int, user_hash: str):
+        """Return ``(found, emoji)``; emoji is None when there is none."""
+        entry = self._entry(post_id)
+        if entry is not None:
+            if user_hash in entry.reactions:
+                self.hits += 1
+                return True, entry.reactions[user_hash]
+            if entry.complete:
+                self.hits += 1
+                return True, None
+        self.misses += 1
+        return False, None
+
+    def set_reaction(
+        self, post_id: int, user_hash: str, emoji: Optional[str]
+    ) -> None:
+        """Record the user's current emoji (None after a toggle-off)."""
+        entry = self._entry(post_id, create=True)
+        if user_hash not in entry.reactions:
+            self._size += 1
+        entry.reactions[user_hash] = emoji
+        self._evict()
+
+    def get_counts(self, post_id: int) -> Optional[Counts]:
+        """Return cached counts or None on a miss."""
+        entry = self._entry(post_id)
+        if entry is not None and entry.counts is not None:
+            self.hits += 1
+            return entry.counts
+        self.misses += 1
+        return None
+
+    def set_counts(self, post_id: int, counts: Counts) -> None:
+        """Store the post's current counts."""
+        self._entry(post_id, create=True).counts = tuple(counts)
+
+    def discard(self, post_id: int) -> None:
+        """Forget everything about a post."""
+        entry = self._posts.pop(post_id, None)
+        if entry is not None:
+            self._size -= len(entry.reactions)
+
+    def clear(self) -> None:
+        """Drop all entries (used when a write batch is rolled back)."""
+        self._posts.clear()
+        self._size = 0
@@ -31,3 +31,169 @@ CREATE TABLE IF NOT EXISTS reactions (
 """
 
 SCHEMA_DDL = CREATE_POSTS + CREATE_STATS + CREATE_REACTIONS
+
+CREATE_SCHEMA_VERSION = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version     INTEGER PRIMARY KEY,
+    name        TEXT    NOT NULL,
+    applied_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Covering indexes for the hot read paths:
+#   created_at → top_daily / weekly_counts day-range filters
+#   message_id → soft_delete lookup
+#   user_hash  → user_total_reactions_received
+CREATE_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_posts_created_at
+    ON posts (created_at, is_deleted);
+CREATE INDEX IF NOT EXISTS idx_posts_message_id
+    ON posts (message_id, user_hash);
+CREATE INDEX IF NOT EXISTS idx_posts_user_hash
+    ON posts (user_hash, is_deleted, skull, fire, clown);
+"""
+
+# Materialized leaderboard: one row per live post, kept in sync by triggers
+# so top_daily is an index range read of N rows.
+CREATE_DAILY_TOP = """
+CREATE TABLE IF NOT EXISTS daily_top (
+    post_id  INTEGER PRIMARY KEY,
+    day      TEXT    NOT NULL,
+    votes    INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_daily_top_rank
+    ON daily_top (day, votes DESC, post_id);
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_top_insert
+AFTER INSERT ON posts WHEN NEW.is_deleted = 0
+BEGIN
+    INSERT OR REPLACE INTO daily_top (post_id, day, votes)
+    VALUES (NEW.post_id, date(NEW.created_at),
+            NEW.skull + NEW.fire + NEW.clown);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_top_votes
+AFTER UPDATE OF skull, fire, clown ON posts WHEN NEW.is_deleted = 0
+BEGIN
+    UPDATE daily_top SET votes = NEW.skull + NEW.fire + NEW.clown
+    WHERE post_id = NEW.post_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_top_soft_delete
+AFTER UPDATE OF is_deleted ON posts WHEN NEW.is_deleted = 1
+BEGIN
+    DELETE FROM daily_top WHERE post_id = NEW.post_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_daily_top_delete
+AFTER DELETE ON posts
+BEGIN
+    DELETE FROM daily_top WHERE post_id = OLD.post_id;
+END;
+
+INSERT OR IGNORE INTO daily_top (post_id, day, votes)
+SELECT post_id, date(created_at), skull + fire + clown
+FROM posts WHERE is_deleted = 0;
+"""
+
+REBUILD_DAILY_TOP = """
+DELETE FROM daily_top;
+INSERT INTO daily_top (post_id, day, votes)
+SELECT post_id, date(created_at), skull + fire + clown
+FROM posts WHERE is_deleted = 0;
+"""
+
+# Restoring a soft-deleted post puts it back on the leaderboard, like
+# trg_rollup_restore does for the rollup; the rebuild repairs posts
+# restored before the trigger existed.
+CREATE_DAILY_TOP_RESTORE = """
+CREATE TRIGGER IF NOT EXISTS trg_daily_top_restore
+AFTER UPDATE OF is_deleted ON posts
+WHEN OLD.is_deleted = 1 AND NEW.is_deleted = 0
+BEGIN
+    INSERT OR REPLACE INTO daily_top (post_id, day, votes)
+    VALUES (NEW.post_id, date(NEW.created_at),
+            NEW.skull + NEW.fire + NEW.clown);
+END;
+""" + REBUILD_DAILY_TOP
+
+# Derived counters, recomputed after bulk loads (see ``innoscream.cli``).
+# Counting reactions zeroes posts whose reactions were not loaded, so it
+# only runs when reactions are.
+RECOMPUTE_COUNTERS = """
+UPDATE posts SET (skull, fire, clown) = (
+    SELECT COALESCE(SUM(emoji = '💀'), 0),
+           COALESCE(SUM(emoji = '🔥'), 0),
+           COALESCE(SUM(emoji = '🤡'), 0)
+    FROM reactions WHERE reactions.post_id = posts.post_id
+);
+"""
+
+REBUILD_USER_STATS = """
+DELETE FROM user_stats;
+INSERT INTO user_stats (user_hash, post_count)
+SELECT user_hash, COUNT(*) FROM posts WHERE is_deleted = 0
+GROUP BY user_hash;
+"""
+
+# Live-post counts per (UTC day, hour), kept in sync by triggers.
+REBUILD_ROLLUP = """
+DELETE FROM post_counts_rollup;
+INSERT INTO post_counts_rollup (day, hour, count)
+SELECT date(created_at), CAST(strftime('%H', created_at) AS INTEGER), COUNT(*)
+FROM posts WHERE is_deleted = 0
+GROUP BY 1, 2;
+"""
+
+CREATE_ROLLUP = """
+CREATE TABLE IF NOT EXISTS post_counts_rollup (
+    day    TEXT    NOT NULL,
+    hour   INTEGER NOT NULL,
+    count  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, hour)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_insert
+AFTER INSERT ON posts WHEN NEW.is_deleted = 0
+BEGIN
+    INSERT INTO post_counts_rollup (day, hour, count)
+    VALUES (date(NEW.created_at),
+            CAST(strftime('%H', NEW.created_at) AS INTEGER), 1)
+    ON CONFLICT (day, hour) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_soft_delete
+AFTER UPDATE OF is_deleted ON posts
+WHEN OLD.is_deleted = 0 AND NEW.is_deleted = 1
+BEGIN
+    UPDATE post_counts_rollup SET count = count - 1
+    WHERE day = date(OLD.created_at)
+      AND hour = CAST(strftime('%H', OLD.created_at) AS INTEGER);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_restore
+AFTER UPDATE OF is_deleted ON posts
+WHEN OLD.is_deleted = 1 AND NEW.is_deleted = 0
+BEGIN
+    INSERT INTO post_counts_rollup (day, hour, count)
+    VALUES (date(NEW.created_at),
+            CAST(strftime('%H', NEW.created_at) AS INTEGER), 1)
+    ON CONFLICT (day, hour) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_rollup_delete
+AFTER DELETE ON posts WHEN OLD.is_deleted = 0
+BEGIN
+    UPDATE post_counts_rollup SET count = count - 1
+    WHERE day = date(OLD.created_at)
+      AND hour = CAST(strftime('%H', OLD.created_at) AS INTEGER);
+END;
+""" + REBUILD_ROLLUP
+
+CREATE_CHART_CACHE = """
+CREATE TABLE IF NOT EXISTS chart_cache (
+    key         TEXT PRIMARY KEY,
+    value       BLOB NOT NULL,
+    expires_at  REAL NOT NULL
+) WITHOUT ROWID;
+"""
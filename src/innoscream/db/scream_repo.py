@@ -1,42 +1,212 @@
 """Scream repo module."""
-from datetime import date, timedelta
-from typing import Tuple, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Callable, List, NamedTuple, Tuple, Optional
 from ..db import dao
+from ..db.reaction_cache import ReactionCache
+from ..db.sequence import PostIdAllocator
+from ..db.tracing import register
+from ..core import metrics
+from ..core.cache import LRUCache, ReadGuard
 from ..services.security import hash_user_id
 from ..services.analytics import weekly_counts
 from ..core.config import get_settings
 
 EMOJI_TO_COLUMN = {"💀": "skull", "🔥": "fire", "🤡": "clown"}
+_COLUMNS = ("skull", "fire", "clown")
+
+# Every statement is registered so it shows up by name in slow-query
+# logs and is covered by the query-plan test.
+_INSERT_POST = register("create_post", """
+    INSERT INTO posts (post_id, user_hash, text, message_id, chat_id)
+    VALUES (?, ?, ?, ?, ?)""")
+_BUMP_USER_STATS = register("create_post.user_stats", """
+    INSERT INTO user_stats(user_hash,post_count)
+    VALUES(?,1)
+    ON CONFLICT(user_hash) DO UPDATE SET post_count=post_count+1""")
+_GET_REACTION = register(
+    "switch_reaction.get",
+    "SELECT emoji FROM reactions WHERE post_id=? AND user_hash=?",
+)
+_ADD_REACTION = register(
+    "switch_reaction.add",
+    "INSERT INTO reactions(post_id,user_hash,emoji) VALUES (?,?,?)",
+)
+_REMOVE_REACTION = register(
+    "switch_reaction.remove",
+    "DELETE FROM reactions WHERE post_id=? AND user_hash=?",
+)
+_CHANGE_REACTION = register(
+    "switch_reaction.change",
+    "UPDATE reactions SET emoji=? WHERE post_id=? AND user_hash=?",
+)
+_APPLY_DELTA = register("switch_reaction.counts", """
+    UPDATE posts
+    SET skull=skull+?, fire=fire+?, clown=clown+?
+    WHERE post_id=?
+    RETURNING date(created_at), user_hash""")
+_GET_COUNTS = register(
+    "switch_reaction.read_counts",
+    "SELECT skull,fire,clown FROM posts WHERE post_id=?",
+)
+_FIND_LIVE_POST = register("soft_delete", """
+    SELECT user_hash, post_id, date(created_at) FROM posts
+    WHERE message_id=? AND is_deleted=0""")
+_DROP_USER_POST = register(
+    "soft_delete.user_stats",
+    "UPDATE user_stats SET post_count = post_count - 1 WHERE user_hash=?",
+)
+_MARK_DELETED = register(
+    "soft_delete.mark",
+    "UPDATE posts SET is_deleted = 1 WHERE message_id=?",
+)
+_USER_POST_COUNT = register(
+    "user_post_count",
+    "SELECT post_count FROM user_stats WHERE user_hash=?",
+)
+_TOP_DAILY = register("top_daily_n", """
+    SELECT p.message_id, p.text, d.votes
+    FROM daily_top AS d
+    JOIN posts AS p ON p.post_id = d.post_id
+    WHERE d.day = ?
+    ORDER BY d.votes DESC, d.post_id
+    LIMIT ?""")
+_TOP_RANGE = register("top_range", """
+    SELECT r.day, p.message_id, p.text, r.votes
+    FROM (
+        SELECT day, post_id, votes,
+               ROW_NUMBER() OVER (
+                   PARTITION BY day ORDER BY votes DESC, post_id
+               ) AS rank
+        FROM daily_top
+        WHERE day BETWEEN ? AND ?
+    ) AS r
+    JOIN posts AS p ON p.post_id = r.post_id
+    WHERE r.rank <= ?
+    ORDER BY r.day, r.rank""")
+_LIST_POSTS = register("list_posts", """
+    SELECT post_id, message_id, text, created_at, skull, fire, clown
+    FROM posts
+    WHERE is_deleted = 0 AND post_id < ?
+    ORDER BY post_id DESC
+    LIMIT ?""")
+_REACTIONS_RECEIVED = register("user_total_reactions_received", """
+    SELECT SUM(skull + fire + clown)
+    FROM posts
+    WHERE user_hash = ? AND is_deleted = 0""")
+_STATS_SNAPSHOT = register("user_stats_snapshot", """
+    SELECT
+      COALESCE((SELECT post_count FROM user_stats
+                WHERE user_hash = :h), 0),
+      COALESCE((SELECT SUM(skull + fire + clown) FROM posts
+                WHERE user_hash = :h AND is_deleted = 0), 0)""")
+
+_timed = metrics.timed(metrics.REPO_SECONDS)
+
+_reaction_cache: ReactionCache | None = None
+_post_ids: PostIdAllocator | None = None
+
+
+def get_reaction_cache() -> ReactionCache:
+    """Return the shared reaction state cache, create on first call."""
+    global _reaction_cache
+    if _reaction_cache is None:
+        _reaction_cache = ReactionCache(
+            max_posts=get_settings().reaction_cache_posts
+        )
+    return _reaction_cache
+
+
+def _drop_reaction_cache() -> None:
+    if _reaction_cache is not None:
+        _reaction_cache.clear()
+
+
+dao.on_rollback(_drop_reaction_cache)
+
+# Finished days are cached forever; day -> {limit: list of top posts},
+# so a late reaction or delete drops one entry instead of scanning all.
+# Reads of the day in flight during the change are not stored.
+_top_cache = LRUCache(maxsize=512)
+_top_reads = ReadGuard()
+
+
+_day_hooks: List[Callable[[str], None]] = []
+
+
+def on_day_invalidated(hook: Callable[[str], None]) -> None:
+    """Call ``hook(day)`` whenever a day's leaderboard may have changed."""
+    _day_hooks.append(hook)
+
+
+def _invalidate_top(day: Optional[str]) -> None:
+    if day is None:
+        return
+    _top_reads.bump(day)
+    _top_cache.pop(day)
+    for hook in _day_hooks:
+        hook(day)
+
+
+class UserStatsSnapshot(NamedTuple):
+    """What /stats shows about one user."""
+
+    post_count: int
+    reactions_received: int
+
+
+# user_hash -> UserStatsSnapshot; dropped when the user posts, gets a
+# reaction or loses a post. Reads of that user started before a drop are
+# not stored; other users' reads are unaffected.
+_stats_cache = LRUCache(maxsize=4096)
+_stats_reads = ReadGuard()
+
+
+def _invalidate_stats(user_hash: Optional[str]) -> None:
+    if user_hash is None:
+        return
+    _stats_reads.bump(user_hash)
+    _stats_cache.pop(user_hash)
 
 
 # ------------------------------------------------------------------ CRUD -----
+@_timed
+async def reserve_post_id() -> int:
+    """Reserve a post_id to put in callback data before the post is sent."""
+    global _post_ids
+    if _post_ids is None:
+        _post_ids = PostIdAllocator(get_settings().post_id_block_size)
+    return await _post_ids.reserve()
+
+
+@_timed
 async def create_post(
     user_id: int,
     text: str,
     message_id: int,
-    chat_id: int
+    chat_id: int,
+    post_id: Optional[int] = None,
 ) -> int:
-    """Insert a scream, update user_stats, return post_id."""
-    async with dao.get_db() as db:
-        h = hash_user_id(user_id)
-        query = (
-            "INSERT INTO posts (user_hash, text, message_id, chat_id) "
-            "VALUES (?, ?, ?, ?)"
-        )
+    """Insert a scream, update user_stats, return post_id.
+
+    ``post_id`` may be one obtained from :func:`reserve_post_id`.
+    """
+    h = hash_user_id(user_id)
+
+    async def op(db):
         cur = await db.execute(
-            query,
-            (h, text, message_id, chat_id),
+            _INSERT_POST,
+            (post_id, h, text, message_id, chat_id),
         )
-        await db.execute(
-            """INSERT INTO user_stats(user_hash,post_count)
-               VALUES(?,1)
-               ON CONFLICT(user_hash) DO UPDATE SET post_count=post_count+1""",
-            (h,),
-        )
-        await db.commit()
+        await db.execute(_BUMP_USER_STATS, (h,))
+        get_reaction_cache().track_new_post(cur.lastrowid)
         return cur.lastrowid
 
+    post_id = await dao.write(op)
+    _invalidate_stats(h)
+    return post_id
+
 
+@_timed
 async def switch_reaction(
     post_id: int, user_id: int, emoji: str
 ) -> Tuple[int, int, int]:
@@ -46,6 +216,7 @@ async def switch_reaction(
     • click same emoji → remove reaction (‑1)
     • click other      → switch: ‑1 old, +1 new
     Returns fresh counts (skull, fire, clown).
+    Raises LookupError (and changes nothing) if the post does not exist.
     """
     if emoji not in EMOJI_TO_COLUMN:
         raise ValueError("bad emoji")
@@ -53,142 +224,211 @@ async def switch_reaction(
     new_col = EMOJI_TO_COLUMN[emoji]
     h = hash_user_id(user_id)
 
-    async with dao.get_db() as db:
-        cur = await db.execute(
-            "SELECT emoji FROM reactions WHERE post_id=? AND user_hash=?",
-            (post_id, h),
-        )
-        row = await cur.fetchone()
+    async def op(db):
+        cache = get_reaction_cache()
+        known, old_emoji = cache.get_reaction(post_id, h)
+        if not known:
+            cur = await db.execute(_GET_REACTION, (post_id, h))
+            row = await cur.fetchone()
+            old_emoji = row[0] if row else None
 
-        if row is None:  # --- first time -----------------------------------
-            await db.execute(
-                (
-                    "INSERT INTO reactions(post_id,user_hash,emoji) "
-                    "VALUES (?,?,?)"
-                ),
-                (post_id, h, emoji),
-            )
-            await db.execute(
-                f"UPDATE posts SET {new_col}={new_col}+1 WHERE post_id=?",
-                (post_id,),
-            )
-
-        else:            # --- already reacted ------------------------------
-            old_emoji = row[0]
-            old_col = EMOJI_TO_COLUMN[old_emoji]
-
-            if old_emoji == emoji:
-                # toggle off  → remove row & decrement
-                await db.execute(
-                    "DELETE FROM reactions WHERE post_id=? AND user_hash=?",
-                    (post_id, h),
-                )
-                await db.execute(
-                    f"UPDATE posts SET {old_col}={old_col}-1 WHERE post_id=?",
-                    (post_id,),
-                )
-            else:
-                # switch to a new emoji
-                await db.execute(
-                    (
-                        "UPDATE reactions SET emoji=? WHERE "
-                        "post_id=? AND user_hash=?"
-                    ),
-                    (emoji, post_id, h),
-                )
-                await db.execute(
-                    f"""UPDATE posts
-                        SET {old_col}={old_col}-1,
-                            {new_col}={new_col}+1
-                        WHERE post_id=?""",
-                    (post_id,),
-                )
-
-        await db.commit()
+        delta = dict.fromkeys(_COLUMNS, 0)
+        if old_emoji is None:  # --- first time ------------------------------
+            await db.execute(_ADD_REACTION, (post_id, h, emoji))
+            delta[new_col] += 1
+            current = emoji
 
-        cur = await db.execute(
-            "SELECT skull,fire,clown FROM posts WHERE post_id=?", (post_id,)
-        )
-        return await cur.fetchone()
+        elif old_emoji == emoji:
+            # toggle off  → remove row & decrement
+            await db.execute(_REMOVE_REACTION, (post_id, h))
+            delta[EMOJI_TO_COLUMN[old_emoji]] -= 1
+            current = None
+
+        else:
+            # switch to a new emoji
+            await db.execute(_CHANGE_REACTION, (emoji, post_id, h))
+            delta[EMOJI_TO_COLUMN[old_emoji]] -= 1
+            delta[new_col] += 1
+            current = emoji
+
+        cur = await db.execute(_APPLY_DELTA, (*delta.values(), post_id))
+        day_row = await cur.fetchone()
+        if day_row is None:  # reserved id whose row is not written yet
+            raise LookupError(f"post {post_id} does not exist")
 
+        counts = cache.get_counts(post_id)
+        if counts is None:
+            cur = await db.execute(_GET_COUNTS, (post_id,))
+            counts = await cur.fetchone()
+        else:
+            counts = tuple(n + delta[c] for n, c in zip(counts, _COLUMNS))
 
+        if counts is not None:
+            cache.set_reaction(post_id, h, current)
+            cache.set_counts(post_id, counts)
+        return counts, day_row
+
+    counts, (day, author) = await dao.write(op)
+    _invalidate_top(day)
+    _invalidate_stats(author)
+    return counts
+
+
+@_timed
 async def soft_delete(message_id: int, ctx):
-    """Soft‑delete a post and fix counters."""
-    await ctx.bot.delete_message(
-        chat_id=get_settings().channel_id,
-        message_id=message_id,
-    )
+    """Soft‑delete a post and fix counters.
 
-    async with dao.get_db() as db:
-        cur = await db.execute(
-            "SELECT user_hash FROM posts WHERE message_id=?",
-            (message_id,),
-        )
+    The channel message is deleted through the outbound dispatcher, so
+    it counts against the same channel budget as posts.
+    """
+    from ..bot.outbound import Priority, get_outbound  # keeps aiogram lazy
+
+    channel_id = get_settings().channel_id
+    await get_outbound().send(Priority.CHANNEL, channel_id,
+                              ctx.bot.delete_message,
+                              chat_id=channel_id, message_id=message_id)
+
+    async def op(db):
+        cur = await db.execute(_FIND_LIVE_POST, (message_id,))
         row = await cur.fetchone()
         if not row:
-            return
+            return None
 
-        user_hash = row[0]
+        user_hash, post_id, day = row[0], row[1], row[2]
 
-        await db.execute(
-            (
-                "UPDATE user_stats SET post_count = post_count - 1 "
-                "WHERE user_hash=?"
-            ),
-            (user_hash,),
-        )
-        await db.execute(
-            "UPDATE posts SET is_deleted = 1 WHERE message_id=?",
-            (message_id,),
-        )
-        await db.commit()
+        await db.execute(_DROP_USER_POST, (user_hash,))
+        await db.execute(_MARK_DELETED, (message_id,))
+        get_reaction_cache().discard(post_id)
+        return day, user_hash
+
+    day, user_hash = await dao.write(op) or (None, None)
+    _invalidate_top(day)
+    _invalidate_stats(user_hash)
 
 
 # --------------------------- reporting helpers ---
+@_timed
 async def user_post_count(user_id: int) -> int:
     """Get user post count."""
     async with dao.get_db() as db:
-        cur = await db.execute(
-            "SELECT post_count FROM user_stats WHERE user_hash=?",
-            (hash_user_id(user_id),),
-        )
+        cur = await db.execute(_USER_POST_COUNT, (hash_user_id(user_id),))
         row = await cur.fetchone()
 
     return row[0] if row else 0
 
 
+async def _query_top(day: str, limit: int) -> List[dict]:
+    async with dao.get_db() as db:
+        rows = await db.execute_fetchall(_TOP_DAILY, (day, limit))
+    return [{"id": r[0], "text": r[1], "votes": r[2]} for r in rows or ()]
+
+
+@_timed
+async def top_daily_n(day: date, limit: int = 10) -> List[dict]:
+    """Obtain the ``limit`` most reacted posts of the day, best first."""
+    key = day.isoformat()
+    cacheable = day < datetime.now(timezone.utc).date()
+    entry = _top_cache.get(key) if cacheable else None
+    if entry is not None and limit in entry:
+        return entry[limit]
+
+    if not cacheable:
+        return await _query_top(key, limit)
+    token = _top_reads.begin(key)
+    try:
+        items = await _query_top(key, limit)
+    finally:
+        unchanged = _top_reads.end(key, token)
+
+    if unchanged:
+        entry = {} if entry is None else entry
+        entry[limit] = items
+        _top_cache.set(key, entry)
+    return items
+
+
 async def top_daily(day: date) -> Optional[dict]:
-    """Obtain top post of the day."""
+    """Obtain top post of the day (timed as ``top_daily_n``)."""
+    items = await top_daily_n(day, 1)
+    return items[0] if items else None
+
+
+@_timed
+async def top_range(start: date, end: date, limit: int = 10) -> dict:
+    """Leaderboards for every day in ``[start, end]`` in one query.
+
+    Returns ``{"YYYY-MM-DD": [{"id", "text", "votes"}, ...]}`` holding
+    only days that have posts.
+    """
     async with dao.get_db() as db:
-        cur = await db.execute(
-            """
-            SELECT message_id,text,skull+fire+clown AS votes
-            FROM posts
-            WHERE is_deleted=0 AND date(created_at)=?
-            ORDER BY votes DESC LIMIT 1
-            """,
-            (day.isoformat(),),
+        rows = await db.execute_fetchall(
+            _TOP_RANGE, (start.isoformat(), end.isoformat(), limit)
         )
-        row = await cur.fetchone()
-    return {"id": row[0], "text": row[1], "votes": row[2]} if row else None
+    days: dict = {}
+    for day, message_id, text, votes in rows or ():
+        days.setdefault(day, []).append(
+            {"id": message_id, "text": text, "votes": votes}
+        )
+    return days
+
+
+@_timed
+async def list_posts(
+    before: Optional[int] = None, limit: int = 50
+) -> Tuple[List[dict], Optional[int]]:
+    """Page through live posts, newest first.
+
+    ``before`` is the cursor returned by the previous page (a post_id);
+    the next cursor is ``None`` on the last page.
+    """
+    async with dao.get_db() as db:
+        rows = await db.execute_fetchall(
+            _LIST_POSTS,
+            (before if before is not None else 2**63 - 1, limit + 1),
+        )
+    rows = list(rows or ())
+    items = [
+        {"post_id": r[0], "id": r[1], "text": r[2], "created_at": r[3],
+         "reactions": [r[4], r[5], r[6]]}
+        for r in rows[:limit]
+    ]
+    cursor = items[-1]["post_id"] if len(rows) > limit else None
+    return items, cursor
 
 
+@_timed
 async def user_total_reactions_received(user_id: int) -> int:
     """Get total reactions received by a user on all their posts."""
     h = hash_user_id(user_id)
     async with dao.get_db() as db:
-        cur = await db.execute(
-            """
-            SELECT SUM(skull + fire + clown)
-            FROM posts
-            WHERE user_hash = ? AND is_deleted = 0
-            """,
-            (h,)
-        )
+        cur = await db.execute(_REACTIONS_RECEIVED, (h,))
         row = await cur.fetchone()
     return row[0] if row and row[0] is not None else 0
 
 
+@_timed
+async def user_stats_snapshot(user_id: int) -> UserStatsSnapshot:
+    """Post count and reactions received, in one cached query."""
+    h = hash_user_id(user_id)
+    cached = _stats_cache.get(h)
+    if cached is not None:
+        return cached
+
+    token = _stats_reads.begin(h)
+    try:
+        async with dao.get_db() as db:
+            cur = await db.execute(_STATS_SNAPSHOT, {"h": h})
+            row = await cur.fetchone()
+    finally:
+        unchanged = _stats_reads.end(h, token)
+    snapshot = UserStatsSnapshot(*row) if row else UserStatsSnapshot(0, 0)
+
+    if unchanged:
+        _stats_cache.set(h, snapshot)
+    return snapshot
+
+
+@_timed
 async def weekly_labels_counts(week_start: date):
     """Get weekly stats."""
     counts = await weekly_counts(week_start)
@@ -0,0 +1,51 @@
+"""Post id reservation ahead of insertion."""
+import asyncio
+
+from . import dao
+
+
+class PostIdAllocator:
+    """Hands out post ids before their rows exist.
+
+    Ids are taken from ``posts``' AUTOINCREMENT counter in blocks: one
+    write bumps ``sqlite_sequence`` by ``block_size``, so ordinary inserts
+    never reuse a reserved id, and the next ``block_size`` reservations are
+    served from memory. Ids left unused at shutdown are simply skipped.
+    """
+
+    def __init__(self, block_size: int = 32) -> None:
+        """Create an allocator with an empty block."""
+        if block_size < 1:
+            raise ValueError("block size must be positive")
+        self.block_size = block_size
+        self._next = 0
+        self._end = 0
+        self._lock = asyncio.Lock()
+
+    async def reserve(self) -> int:
+        """Return a post id no other insert will use."""
+        if self._next >= self._end:
+            async with self._lock:
+                if self._next >= self._end:
+                    self._next, self._end = await dao.write(self._claim_block)
+        post_id = self._next
+        self._next += 1
+        return post_id
+
+    async def _claim_block(self, db):
+        rows = await db.execute_fetchall(
+            "SELECT seq FROM sqlite_sequence WHERE name = 'posts'"
+        )
+        start = (rows[0][0] if rows else 0) + 1
+        end = start + self.block_size
+        if rows:
+            await db.execute(
+                "UPDATE sqlite_sequence SET seq = ? WHERE name = 'posts'",
+                (end - 1,),
+            )
+        else:
+            await db.execute(
+                "INSERT INTO sqlite_sequence (name, seq) VALUES ('posts', ?)",
+                (end - 1,),
+            )
+        return start, end
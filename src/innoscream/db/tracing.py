@@ -0,0 +1,171 @@
+"""Statement timing and query-plan checks for the DAO.
+
+Pooled connections are wrapped in :class:`TracedConnection`, which
+times every ``execute``/``execute_fetchall`` and hands the statement,
+the *shape* of its parameters (types only, never values) and the
+duration to a :class:`QueryTracer`. Statements registered with
+:func:`register` are reported under their name; everything slower than
+the threshold is logged.
+"""
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional
+
+import aiosqlite
+
+from ..core import metrics
+
+logger = logging.getLogger(__name__)
+
+# name -> SQL of every statement the repository layer runs
+QUERIES: Dict[str, str] = {}
+_names: Dict[str, str] = {}
+_MAX_KEYS = 1024
+
+_slow_queries = metrics.DB_SLOW_QUERIES
+
+
+def register(name: str, sql: str) -> str:
+    """Record ``sql`` under ``name`` for tracing and plan checks."""
+    QUERIES[name] = sql
+    _names[sql] = name
+    return sql
+
+
+def param_shape(params: Any) -> str:
+    """Describe bound parameters by type, e.g. ``(int, str)``."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        inner = ", ".join(f"{k}: {type(v).__name__}"
+                          for k, v in params.items())
+        return f"{{{inner}}}"
+    return f"({', '.join(type(v).__name__ for v in params)})"
+
+
+class QueryStats:
+    """Running totals for one statement."""
+
+    __slots__ = ("count", "total", "max", "shape")
+
+    def __init__(self) -> None:
+        """Start with no calls."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.shape = ""
+
+
+class QueryTracer:
+    """Aggregate statement timings and log the slow ones."""
+
+    def __init__(self, slow_after: float) -> None:
+        """Log statements taking at least ``slow_after`` seconds."""
+        self.slow_after = slow_after
+        self.stats: Dict[str, QueryStats] = {}
+        self._keys: Dict[str, str] = {}
+
+    def _key(self, sql: str) -> str:
+        key = self._keys.get(sql)
+        if key is None:
+            key = _names.get(sql) or " ".join(sql.split())
+            if len(self._keys) < _MAX_KEYS:
+                self._keys[sql] = key
+        return key
+
+    def record(self, sql: str, params: Any, seconds: float) -> None:
+        """Account one execution of ``sql``."""
+        key = self._key(sql)
+        stats = self.stats.get(key)
+        if stats is None:
+            if len(self.stats) >= _MAX_KEYS:
+                return
+            stats = self.stats[key] = QueryStats()
+        stats.count += 1
+        stats.total += seconds
+        if seconds > stats.max:
+            stats.max = seconds
+        if seconds >= self.slow_after:
+            stats.shape = param_shape(params)
+            _slow_queries.inc()
+            logger.warning(f"Slow query ({seconds * 1000:.1f} ms) {key} "
+                           f"params={stats.shape}")
+
+    def wrap(self, db: aiosqlite.Connection) -> "TracedConnection":
+        """Return ``db`` with its statements timed by this tracer."""
+        return TracedConnection(db, self)
+
+
+class TracedConnection:
+    """Proxy of an ``aiosqlite.Connection`` that times its statements.
+
+    ``execute`` is timed up to the first result row, which is where
+    SQLite does the work for the point lookups and writes of this app;
+    ``execute_fetchall`` covers the whole result.
+    """
+
+    def __init__(self, db: aiosqlite.Connection, tracer: QueryTracer):
+        """Wrap ``db``; unknown attributes are delegated to it."""
+        self._db = db
+        self._tracer = tracer
+
+    def __getattr__(self, name: str) -> Any:
+        """Delegate to the wrapped connection."""
+        return getattr(self._db, name)
+
+    async def execute(self, sql: str, parameters: Any = None):
+        """Run ``sql`` and record how long it took."""
+        started = time.perf_counter()
+        try:
+            return await self._db.execute(sql, parameters)
+        finally:
+            self._tracer.record(sql, parameters,
+                                time.perf_counter() - started)
+
+    async def execute_fetchall(self, sql: str, parameters: Any = None):
+        """Run ``sql``, fetch every row and record how long it took."""
+        started = time.perf_counter()
+        try:
+            return await self._db.execute_fetchall(sql, parameters)
+        finally:
+            self._tracer.record(sql, parameters,
+                                time.perf_counter() - started)
+
+
+# ------------------------------------------------------ plan checks -----
+def _aliases(sql: str, table: str) -> set:
+    found = re.findall(rf"\b{table}\s+AS\s+(\w+)", sql, re.IGNORECASE)
+    return {table, *found}
+
+
+async def explain(db: aiosqlite.Connection, sql: str) -> List[str]:
+    """Return the ``EXPLAIN QUERY PLAN`` details of ``sql``.
+
+    Parameters are bound as NULL; the plan does not depend on them.
+    """
+    params: Any = {n: None for n in re.findall(r":(\w+)", sql)}
+    if not params:
+        params = [None] * sql.count("?")
+    rows = await db.execute_fetchall(f"EXPLAIN QUERY PLAN {sql}", params)
+    return [row[-1] for row in rows]
+
+
+async def full_scans(db: aiosqlite.Connection, table: str = "posts",
+                     queries: Optional[Dict[str, str]] = None
+                     ) -> Dict[str, List[str]]:
+    """Map each registered query that scans ``table`` to its plan.
+
+    Any ``SCAN`` step over the table or one of its aliases counts, with
+    or without an index: both read every row.
+    """
+    offenders = {}
+    for name, sql in (QUERIES if queries is None else queries).items():
+        plan = await explain(db, sql)
+        names = _aliases(sql, table)
+        for step in plan:
+            words = step.replace("SCAN TABLE ", "SCAN ").split()
+            if len(words) > 1 and words[0] == "SCAN" and words[1] in names:
+                offenders[name] = plan
+                break
+    return offenders
@@ -0,0 +1,154 @@
+"""Group-commit write queue."""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import aiosqlite
+
+from ..core import metrics
+
+logger = logging.getLogger(__name__)
+
+WriteOp = Callable[[aiosqlite.Connection], Awaitable[Any]]
+_Item = Tuple[WriteOp, asyncio.Future]
+
+_committed = metrics.DB_TRANSACTIONS.labels("commit")
+_rolled_back = metrics.DB_TRANSACTIONS.labels("rollback")
+
+
+class WriteQueue:
+    """Single writer task that batches write operations into one transaction.
+
+    Each operation is an ``async def op(db)`` that runs its statements on
+    the shared connection and returns a value for its caller. Operations
+    submitted within ``max_latency`` seconds of each other (up to
+    ``max_batch`` of them) share a single ``BEGIN IMMEDIATE … COMMIT``.
+    Every operation runs inside its own savepoint, so one failing op is
+    rolled back and reported to its caller without spoiling the batch.
+
+    While the writer task is not running, :meth:`submit` executes the
+    operation inline in a transaction of its own.
+
+    ``on_rollback`` is called whenever a whole batch fails to commit, so
+    in-memory state updated by its operations can be thrown away.
+    """
+
+    def __init__(
+        self,
+        connection: Callable[[], Any],
+        max_batch: int = 64,
+        max_latency: float = 0.005,
+        on_rollback: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """Create a stopped queue; ``connection()`` must yield a DB conn."""
+        self._connection = connection
+        self._on_rollback = on_rollback
+        self._max_batch = max_batch
+        self._max_latency = max_latency
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background writer task is active."""
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        """Number of operations waiting for the next batch."""
+        return self._queue.qsize() if self._queue else 0
+
+    def start(self) -> None:
+        """Spawn the writer task on the running event loop."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Flush everything already queued, then stop the writer task."""
+        if not self.running:
+            return
+        task, self._task = self._task, None  # new submits now run inline
+        self._queue.put_nowait(None)
+        await task
+
+    async def submit(self, op: WriteOp) -> Any:
+        """Run ``op`` in the next batch and return its result."""
+        fut = asyncio.get_running_loop().create_future()
+        if self.running:
+            self._queue.put_nowait((op, fut))
+        else:
+            await self._flush([(op, fut)])
+        return await fut
+
+    async def _collect(self, first: _Item) -> Tuple[List[_Item], bool]:
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self._max_latency
+        while len(batch) < self._max_batch:
+            timeout = deadline - loop.time()
+            try:
+                if timeout > 0:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    item = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch, stopping = await self._collect(first)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Item]) -> None:
+        metrics.DB_BATCH_SIZE.observe(len(batch))
+        outcomes = []
+        try:
+            async with self._connection() as db:
+                await db.execute("BEGIN IMMEDIATE")
+                try:
+                    for op, fut in batch:
+                        outcomes.append((fut, *await self._apply(db, op)))
+                    await db.commit()
+                except BaseException:
+                    await db.rollback()
+                    raise
+        except Exception as e:
+            _rolled_back.inc()
+            logger.error(f"Write batch of {len(batch)} failed: {e}")
+            if self._on_rollback is not None:
+                self._on_rollback()
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(e)
+            return
+
+        _committed.inc()
+        for fut, result, error in outcomes:
+            if fut.done():
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+
+    @staticmethod
+    async def _apply(db: aiosqlite.Connection, op: WriteOp):
+        await db.execute("SAVEPOINT write_op")
+        try:
+            result = await op(db)
+        except Exception as e:
+            await db.execute("ROLLBACK TO write_op")
+            await db.execute("RELEASE write_op")
+            return None, e
+        await db.execute("RELEASE write_op")
+        return result, None
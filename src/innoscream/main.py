@@ -1,20 +1,96 @@
-"""Application entrypoint."""
+"""Application entrypoint.
+
+Importing this module loads FastAPI and the REST layer only. The bot
+(aiogram), the scheduler (apscheduler) and the upstream HTTP clients
+(httpx) are imported by the startup hook when ``BOT_MODE`` and
+``SCHEDULER_ENABLED`` ask for them, so API-only workers and tests do not
+pay for them. Each startup phase is timed and logged.
+"""
 
 import asyncio
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 
 from .api.routes import router as api_router
-from .bot.runner import start_bot
-from .db.dao import init_db
-from .tasks.scheduler import start_scheduler
+from .core import metrics
+from .core.config import get_settings
+from .core.startup import StartupProfile
+from .db.dao import init_db, close_db
 
 app = FastAPI(title="InnoScream")
 app.include_router(api_router)
 
+profile = StartupProfile()
+metrics.Gauge(
+    "innoscream_startup_phase_seconds", "Duration of each startup phase.",
+    lambda: {(name,): s for name, s in profile.phases.items()}, ["phase"],
+)
+_started: set = set()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint() -> Response:
+    """Prometheus scrape target."""
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+async def _start_bot(mode: str) -> None:
+    from .bot import webhook
+    from .bot.outbound import get_outbound
+    from .bot.runner import setup_webhook, start_bot
+
+    get_outbound().start()
+    if mode == "webhook":
+        app.include_router(webhook.build_router(get_settings().webhook_path))
+        await setup_webhook()
+    else:
+        asyncio.create_task(start_bot())
+
+
+async def _stop_bot() -> None:
+    from .bot import webhook
+    from .bot.outbound import get_outbound
+    from .bot.runner import stop_bot
+    from .bot.update_scheduler import get_update_scheduler
+
+    await webhook.drain()
+    await get_update_scheduler().drain()
+    await get_outbound().stop()
+    await stop_bot()
+
 
 @app.on_event("startup")
 async def startup_event():
     """Init on FastAPI startup."""
-    await init_db()
-    asyncio.create_task(start_bot())
-    start_scheduler()
+    settings = get_settings()
+    with profile.phase("db"):
+        await init_db()
+    if settings.bot_mode != "off" or settings.scheduler_enabled:
+        with profile.phase("http_clients"):
+            from .services.http_client import init_clients
+            await init_clients()
+            _started.add("http_clients")
+    if settings.bot_mode != "off":
+        with profile.phase("bot"):
+            await _start_bot(settings.bot_mode)
+            _started.add("bot")
+    if settings.scheduler_enabled:
+        with profile.phase("scheduler"):
+            from .tasks.scheduler import start_scheduler
+            start_scheduler()
+            _started.add("scheduler")
+    profile.report()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release resources on FastAPI shutdown."""
+    if "bot" in _started:
+        await _stop_bot()
+    if "scheduler" in _started:
+        from .tasks.scheduler import scheduler
+        scheduler.shutdown(wait=False)
+    if "http_clients" in _started:
+        from .services.http_client import close_clients
+        await close_clients()
+    _started.clear()
+    await close_db()
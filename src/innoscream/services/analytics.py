@@ -1,34 +1,117 @@
-"""QuickChart graph generator + helpers to pull weekly counts."""
-import httpx
+"""Chart generation (QuickChart or local) + helpers to pull weekly counts."""
+import asyncio
 import logging
 import datetime as dt
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional, Union
 from ..db import dao
+from ..db.schema import REBUILD_ROLLUP
+from ..db.tracing import register
+from . import chart_render
+from .chart_cache import ChartCache
+from ..core.config import get_settings
+
+if TYPE_CHECKING:
+    from aiogram.types import BufferedInputFile
 
 logger = logging.getLogger(__name__)
-_QC_URL = "https://quickchart.io/chart/create"
+
+_chart_cache: ChartCache | None = None
+
+_WEEKLY_COUNTS = register("weekly_counts", """
+    SELECT strftime('%w', day) AS dow, SUM(count)
+    FROM post_counts_rollup
+    WHERE day >= ? AND day < ?
+    GROUP BY dow""")
+_RANGE_COUNTS = register("range_counts", """
+    SELECT day, SUM(count)
+    FROM post_counts_rollup
+    WHERE day >= ? AND day <= ?
+    GROUP BY day""")
 
 
 async def weekly_counts(start: dt.date) -> List[int]:
     """Return list[7] of scream counts Mon‑Sun starting at `start`."""
     async with dao.get_db() as db:
         rows = await db.execute_fetchall(
-            """
-            SELECT strftime('%w', created_at) AS dow, COUNT(*)
-            FROM posts
-            WHERE is_deleted = 0
-                AND date(created_at) BETWEEN ? AND ?
-            GROUP BY dow
-            """,
-            (start.isoformat(), (start + dt.timedelta(days=6)).isoformat()),
+            _WEEKLY_COUNTS,
+            (start.isoformat(), (start + dt.timedelta(days=7)).isoformat()),
         )
-    mapping = {int(dow): n for dow, n in rows}
+    mapping = {int(dow) or 7: n for dow, n in rows}  # strftime: Sun=0
     return [mapping.get(i, 0) for i in range(1, 8)]  # Mon=1…Sun=7
 
 
+async def range_counts(start: dt.date, end: dt.date) -> List[int]:
+    """Return per-day scream counts for every day in [start, end]."""
+    async with dao.get_db() as db:
+        rows = await db.execute_fetchall(
+            _RANGE_COUNTS, (start.isoformat(), end.isoformat())
+        )
+    mapping = dict(rows)
+    days = (end - start).days + 1
+    return [
+        mapping.get((start + dt.timedelta(days=d)).isoformat(), 0)
+        for d in range(max(days, 0))
+    ]
+
+
+async def monthly_counts(year: int, month: int) -> List[int]:
+    """Return per-day scream counts for the given calendar month."""
+    first = dt.date(year, month, 1)
+    last = dt.date(year + month // 12, month % 12 + 1, 1)
+    return await range_counts(first, last - dt.timedelta(days=1))
+
+
+async def rebuild_rollup() -> None:
+    """Recompute post_counts_rollup from posts in one batch pass."""
+    async def op(db):
+        for statement in REBUILD_ROLLUP.split(";"):
+            if statement.strip():
+                await db.execute(statement)
+
+    await dao.write(op)
+
+
+def get_chart_cache() -> ChartCache:
+    """Return the shared chart cache, create on first call."""
+    global _chart_cache
+    if _chart_cache is None:
+        settings = get_settings()
+        _chart_cache = ChartCache(
+            maxsize=settings.chart_cache_size,
+            ttl=settings.chart_cache_ttl,
+            persist=settings.chart_cache_persist,
+        )
+    return _chart_cache
+
+
+async def _quickchart(cfg: dict) -> Optional[str]:
+    from . import http_client  # imports httpx; only needed to render
+    c = http_client.get_client("quickchart")
+    r = await c.post(get_settings().quickchart_url, json={
+        "chart": cfg,
+        "backgroundColor": "white"
+    })
+    r.raise_for_status()
+    jd = r.json()
+    return jd["url"] if jd.get("success") else None
+
+
+def _line_chart_cfg(labels: List[str], data: List[int]) -> dict:
+    return {
+        "type": "line",
+        "data": {
+            "labels": labels,
+            "datasets": [{"label": "Screams", "data": data}]
+        },
+        "options": {"responsive": True},
+    }
+
+
 async def chart_url(labels: List[str], data: List[int]) -> Optional[str]:
     """Generate a chart URL from provided data using QuickChart service.
 
+    Identical charts are rendered once and then served from the chart cache.
+
     Args:
         labels: list of label strings for the X-axis
         data: list of integer values for the Y-axis dataset
@@ -39,19 +122,43 @@ async def chart_url(labels: List[str], data: List[int]) -> Optional[str]:
     Raises:
         httpx.HTTPStatusError: if the chart generation request fails
     """
-    cfg = {
-        "type": "line",
-        "data": {
-            "labels": labels,
-            "datasets": [{"label": "Screams", "data": data}]
-        },
-        "options": {"responsive": True},
-    }
-    async with httpx.AsyncClient() as c:
-        r = await c.post(_QC_URL, json={
-            "chart": cfg,
-            "backgroundColor": "white"
-        })
-        r.raise_for_status()
-    jd = r.json()
-    return jd["url"] if jd.get("success") else None
+    cfg = _line_chart_cfg(labels, data)
+    return await get_chart_cache().get_or_render(cfg, lambda: _quickchart(cfg))
+
+
+async def chart_png(labels: List[str], data: List[int]) -> Optional[bytes]:
+    """Render the chart locally in a worker thread; None if unavailable."""
+    if not chart_render.AVAILABLE:
+        logger.warning("CHART_BACKEND=local but matplotlib is not installed")
+        return None
+    cfg = {"backend": "local", **_line_chart_cfg(labels, data)}
+
+    async def render():
+        try:
+            return await asyncio.to_thread(
+                chart_render.render_line_png, labels, data
+            )
+        except Exception as e:
+            logger.error(f"Local chart rendering failed: {e}")
+            return None
+
+    return await get_chart_cache().get_or_render(cfg, render)
+
+
+async def chart_photo(
+    labels: List[str], data: List[int]
+) -> Optional[Union[str, "BufferedInputFile"]]:
+    """Return something ``send_photo``/``answer_photo`` accepts.
+
+    Uses the configured CHART_BACKEND; the local renderer falls back to
+    QuickChart when it is unavailable or fails.
+
+    Returns:
+        in-memory PNG upload, QuickChart URL, or None if both failed
+    """
+    if get_settings().chart_backend == "local":
+        png = await chart_png(labels, data)
+        if png is not None:
+            from aiogram.types import BufferedInputFile
+            return BufferedInputFile(png, filename="chart.png")
+    return await chart_url(labels, data)
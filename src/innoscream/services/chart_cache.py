@@ -0,0 +1,119 @@
+"""Content-addressed cache for rendered charts."""
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from ..core.cache import LRUCache
+from ..db import dao
+
+logger = logging.getLogger(__name__)
+
+Renderer = Callable[[], Awaitable[Optional[Any]]]
+
+
+def chart_key(cfg: dict) -> str:
+    """Return a stable SHA-256 digest of a chart config."""
+    blob = json.dumps(cfg, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+class ChartCache:
+    """TTL + LRU cache of chart results keyed by :func:`chart_key`.
+
+    Concurrent requests for the same chart share one upstream render
+    (single flight). With ``persist`` enabled, entries are also written to
+    the ``chart_cache`` table so they survive restarts; persistence errors
+    are logged and never fail the request.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 86400.0,
+                 persist: bool = True) -> None:
+        """Create an empty cache."""
+        self.ttl = ttl
+        self.persist = persist
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Memory hit/miss counters, size and renders in flight."""
+        return {**self._memory.stats, "inflight": len(self._inflight)}
+
+    async def get_or_render(self, cfg: dict, render: Renderer) -> Any:
+        """Return the cached chart for ``cfg`` or render it once.
+
+        ``None`` results (failed renders) are returned but not cached.
+        """
+        key = chart_key(cfg)
+        value = self._memory.get(key)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._inflight[key] = fut
+        try:
+            value, ttl = await self._load(key)
+            if value is None:
+                value, ttl = await render(), self.ttl
+                if value is not None:
+                    await self._store(key, value)
+            if value is not None:
+                self._memory.set(key, value, ttl=ttl)
+            fut.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _load(self, key: str):
+        """Return ``(value, remaining_ttl)`` from SQLite, or ``(None, 0)``."""
+        if not self.persist:
+            return None, 0
+        now = time.time()
+        try:
+            async with dao.get_db() as db:
+                rows = await db.execute_fetchall(
+                    "SELECT value, expires_at FROM chart_cache "
+                    "WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                )
+        except Exception as e:
+            logger.warning(f"Chart cache lookup failed: {e}")
+            return None, 0
+        return (rows[0][0], rows[0][1] - now) if rows else (None, 0)
+
+    async def _store(self, key: str, value: Any) -> None:
+        if not self.persist:
+            return
+
+        async def op(db):
+            now = time.time()
+            await db.execute("DELETE FROM chart_cache WHERE expires_at <= ?",
+                             (now,))
+            await db.execute(
+                "INSERT OR REPLACE INTO chart_cache (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, value, now + self.ttl),
+            )
+
+        try:
+            await dao.write(op)
+        except Exception as e:
+            logger.warning(f"Chart cache store failed: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-memory entries."""
+        self._memory.clear()
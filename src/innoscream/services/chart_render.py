@@ -0,0 +1,33 @@
+"""Local in-process PNG chart renderer (optional ``matplotlib`` backend)."""
+import importlib.util
+import io
+import threading
+from typing import List
+
+# matplotlib is an optional extra: ``pip install innoscream[charts]``
+AVAILABLE = importlib.util.find_spec("matplotlib") is not None
+
+# Figures are independent, but matplotlib makes no thread-safety promises.
+_lock = threading.Lock()
+
+
+def render_line_png(labels: List[str], data: List[int]) -> bytes:
+    """Render a simple line chart and return the PNG bytes.
+
+    Blocking and CPU bound: call it through ``asyncio.to_thread``.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    with _lock:
+        fig = Figure(figsize=(6, 3.5), dpi=100)
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.plot(labels, data, marker="o", label="Screams")
+        ax.set_ylim(bottom=0)
+        ax.grid(alpha=0.3)
+        ax.legend(loc="upper left")
+        fig.tight_layout()
+        buf = io.BytesIO()
+        fig.savefig(buf, format="png", facecolor="white")
+    return buf.getvalue()
@@ -0,0 +1,92 @@
+"""Shared, application-scoped HTTP clients for upstream services."""
+import importlib.util
+import time
+from typing import Dict
+
+import httpx
+
+from ..core import metrics
+from ..core.config import get_settings
+
+_LIMITS = httpx.Limits(
+    max_connections=20,
+    max_keepalive_connections=10,
+    keepalive_expiry=60.0,
+)
+# HTTP/2 needs the optional ``h2`` package (``httpx[http2]``).
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper counting requests by upstream and status.
+
+    The status is the HTTP status code, or the httpx exception class when
+    no response arrived (``ConnectTimeout``, ``ReadTimeout``, ...).
+    """
+
+    def __init__(self, upstream: str,
+                 inner: httpx.AsyncBaseTransport) -> None:
+        """Wrap ``inner``; samples are labelled with ``upstream``."""
+        self._upstream = upstream
+        self._inner = inner
+        self._seconds = metrics.UPSTREAM_SECONDS.labels(upstream)
+
+    async def handle_async_request(
+        self, request: httpx.Request
+    ) -> httpx.Response:
+        """Forward ``request`` and record its latency and status."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = await self._inner.handle_async_request(request)
+            status = str(response.status_code)
+            return response
+        except Exception as e:
+            status = type(e).__name__
+            raise
+        finally:
+            self._seconds.observe(time.perf_counter() - started)
+            metrics.UPSTREAM_REQUESTS.labels(self._upstream, status).inc()
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self._inner.aclose()
+
+
+def _timeouts() -> Dict[str, httpx.Timeout]:
+    settings = get_settings()
+    return {
+        "imgflip": httpx.Timeout(settings.imgflip_timeout, connect=3.0),
+        "quickchart": httpx.Timeout(settings.quickchart_timeout, connect=3.0),
+    }
+
+
+def get_client(upstream: str) -> httpx.AsyncClient:
+    """Return the keep-alive client for ``upstream``, create on first call.
+
+    Args:
+        upstream: one of ``"imgflip"`` or ``"quickchart"``
+    """
+    client = _clients.get(upstream)
+    if client is None or client.is_closed:
+        transport = httpx.AsyncHTTPTransport(limits=_LIMITS, http2=_HTTP2)
+        client = _clients[upstream] = httpx.AsyncClient(
+            timeout=_timeouts()[upstream],
+            transport=MeteredTransport(upstream, transport),
+        )
+    return client
+
+
+async def init_clients() -> None:
+    """Create every upstream client (FastAPI startup hook)."""
+    for upstream in _timeouts():
+        get_client(upstream)
+
+
+async def close_clients() -> None:
+    """Close every upstream client (FastAPI shutdown hook)."""
+    while _clients:
+        _, client = _clients.popitem()
+        await client.aclose()
@@ -4,10 +4,13 @@ import logging
 import httpx
 from typing import Optional, Tuple, Dict
 from ..core.config import get_settings
+from . import http_client
+from ..core.cache import LRUCache
 
 logger = logging.getLogger(__name__)
 
-IMGFLIP_API_URL = "https://api.imgflip.com/caption_image"
+# (template_id, text payload) -> ImgFlip image URL
+_meme_cache: LRUCache | None = None
 
 _TWO_TEXT_MEME_TEMPLATES = [
     "181913649",  # Drake Hotline Bling
@@ -47,10 +50,13 @@ def _prepare_for_single_box(text: str, template_id: str) -> Dict[str, str]:
 
 async def _choose_template(
     text: str,
-    template_id: Optional[str] = None
+    template_id: Optional[str] = None,
+    stable: bool = False
 ):
     words = text.split()
     use_single_text_template = len(words) < 4
+    # seeded by the text, the same caption keeps its template (cacheable)
+    rng = random.Random(text) if stable else random
 
     chosen_template_id: str
     text_payload_params: Dict[str, str]
@@ -75,27 +81,45 @@ async def _choose_template(
     elif use_single_text_template:
         if not _SINGLE_TEXT_MEME_TEMPLATES:
             return None
-        chosen_template_id = random.choice(_SINGLE_TEXT_MEME_TEMPLATES)
+        chosen_template_id = rng.choice(_SINGLE_TEXT_MEME_TEMPLATES)
         text_payload_params = _prepare_for_single_box(text, chosen_template_id)
     else:
         if not _TWO_TEXT_MEME_TEMPLATES:
             return None
-        chosen_template_id = random.choice(_TWO_TEXT_MEME_TEMPLATES)
+        chosen_template_id = rng.choice(_TWO_TEXT_MEME_TEMPLATES)
         top, bottom = _split_for_two_boxes(text)
         text_payload_params = {"text0": top, "text1": bottom}
 
     return chosen_template_id, text_payload_params
 
 
+def get_meme_cache() -> LRUCache:
+    """Return the shared meme result cache, create on first call."""
+    global _meme_cache
+    if _meme_cache is None:
+        settings = get_settings()
+        _meme_cache = LRUCache(
+            maxsize=settings.meme_cache_size,
+            ttl=settings.meme_cache_ttl,
+        )
+    return _meme_cache
+
+
 def _get_imgflip_credentials():
     return get_settings().imgflip_user, get_settings().imgflip_pass
 
 
 async def generate_meme(
     text: str,
-    template_id: Optional[str] = None
+    template_id: Optional[str] = None,
+    stable: bool = False
 ) -> Optional[str]:
-    """Generate IMGFLIP meme."""
+    """Generate IMGFLIP meme.
+
+    Without ``template_id`` a random template is picked per call; with
+    ``stable`` the pick depends only on the text, so repeated calls hit
+    the cache. Results are cached by (template, captions).
+    """
     _USERNAME, _PASSWORD = _get_imgflip_credentials()
 
     if not _USERNAME or not _PASSWORD:
@@ -103,12 +127,17 @@ async def generate_meme(
         return None  # Early return if no credentials
 
     try:
-        template_data = await _choose_template(text, template_id)
+        template_data = await _choose_template(text, template_id, stable)
         if not template_data:
             logger.error("No valid template selected")
             return None
             
         chosen_template_id, text_payload_params = template_data
+        cache_key = (chosen_template_id,
+                     tuple(sorted(text_payload_params.items())))
+        cached_url = get_meme_cache().get(cache_key)
+        if cached_url is not None:
+            return cached_url
 
         payload = {
             "template_id": chosen_template_id,
@@ -117,16 +146,19 @@ async def generate_meme(
             **text_payload_params
         }
 
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(IMGFLIP_API_URL, data=payload)
-            response.raise_for_status()
-            
-            data = response.json()
-            if not data.get("success"):
-                logger.error(f"ImgFlip API error: {data.get('error_message', 'Unknown error')}")
-                return None
-                
-            return data["data"]["url"]
+        client = http_client.get_client("imgflip")
+        response = await client.post(get_settings().imgflip_api_url,
+                                     data=payload)
+        response.raise_for_status()
+
+        data = response.json()
+        if not data.get("success"):
+            logger.error(f"ImgFlip API error: {data.get('error_message', 'Unknown error')}")
+            return None
+
+        url = data["data"]["url"]
+        get_meme_cache().set(cache_key, url)
+        return url
 
     except httpx.HTTPError as e:
         logger.error(f"HTTP error during meme generation: {str(e)}")
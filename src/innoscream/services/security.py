@@ -1,14 +1,35 @@
 """Security module."""
 
 import hashlib
+from functools import lru_cache
 from ..core.config import get_settings
 
+# Roughly the number of users active within a reaction storm.
+_HASH_CACHE_SIZE = 4096
 
+
+@lru_cache()
+def _salted_hasher():
+    """SHA-256 state pre-seeded with the salt, copied for every user."""
+    return hashlib.sha256(get_settings().hash_salt.encode())
+
+
+@lru_cache(maxsize=_HASH_CACHE_SIZE)
 def hash_user_id(user_id: int) -> str:
     """Hashes the user's ID using salt.
 
+    Equivalent to ``sha256(f"{salt}{user_id}")``; results for recently
+    seen users are memoized (see :func:`hash_cache_stats`).
+
     Returns:
         hashed ID
     """
-    salt = get_settings().hash_salt
-    return hashlib.sha256(f"{salt}{user_id}".encode()).hexdigest()
+    h = _salted_hasher().copy()
+    h.update(str(user_id).encode())
+    return h.hexdigest()
+
+
+def hash_cache_stats() -> dict:
+    """Hit/miss counters and size of the user-hash cache."""
+    info = hash_user_id.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
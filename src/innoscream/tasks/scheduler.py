@@ -3,10 +3,15 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from datetime import date, timedelta
 from ..services import scream, meme, analytics
+from ..core import metrics
 from ..core.config import get_settings
 from ..bot.runner import get_bot
+from ..bot.outbound import Priority, get_outbound
 
+_timed = metrics.timed(metrics.JOB_SECONDS)
 
+
+@_timed
 async def post_daily_top():
     """Daily top poster.
 
@@ -17,23 +22,40 @@ async def post_daily_top():
     top = await scream.get_top_daily(yesterday)
     if not top:
         return
-    meme_url = await meme.generate_meme(top["text"])
+    meme_url = await meme.generate_meme(top["text"], stable=True)
 
     caption = f"🏆 Top scream for {yesterday:%d %b} with {top['votes']} votes"
 
+    channel_id = get_settings().channel_id
     if meme_url:
-        await get_bot().send_photo(
-            get_settings().channel_id,
+        await get_outbound().send(
+            Priority.CHANNEL, channel_id, get_bot().send_photo,
+            channel_id,
             meme_url,
             caption=caption
         )
     else:
-        await get_bot().send_message(
-            get_settings().channel_id,
+        await get_outbound().send(
+            Priority.CHANNEL, channel_id, get_bot().send_message,
+            channel_id,
             f"{caption}\n\n{top['text']}"
         )
 
 
+@_timed
+async def prefetch_daily_top():
+    """Render today's leading scream as a meme ahead of the midnight post.
+
+    Runs every few minutes in the evening; an unchanged leader is a meme
+    cache hit, a new leader gets rendered, so ``post_daily_top`` finds the
+    image already cached; both pick the template from the text alone.
+    """
+    top = await scream.get_top_daily(date.today())
+    if top:
+        await meme.generate_meme(top["text"], stable=True)
+
+
+@_timed
 async def post_weekly_stress_graph():
     """Post the weekly stress graph to the main channel."""
     today = date.today()
@@ -42,9 +64,9 @@ async def post_weekly_stress_graph():
 
     labels, data = await scream.weekly_labels_counts(previous_monday)
 
-    chart_image_url = await analytics.chart_url(labels, data)
+    chart_image = await analytics.chart_photo(labels, data)
 
-    if chart_image_url:
+    if chart_image:
         screams_count = sum(data)
 
         avg_screams = screams_count / 7.0 if screams_count > 0 else 0.0
@@ -69,9 +91,10 @@ async def post_weekly_stress_graph():
 
         final_caption = "\n".join(caption_parts)
 
-        await get_bot().send_photo(
+        await get_outbound().send(
+            Priority.CHANNEL, get_settings().channel_id, get_bot().send_photo,
             chat_id=get_settings().channel_id,
-            photo=chart_image_url,
+            photo=chart_image,
             caption=final_caption
         )
 
@@ -89,6 +112,15 @@ def start_scheduler():
         minute=5,
         misfire_grace_time=3600
     )
+    # evenings, every 10 min: warm the meme cache for the daily top
+    scheduler.add_job(
+        prefetch_daily_top,
+        "cron",
+        hour="18-23",
+        minute="*/10",
+        misfire_grace_time=300,
+        coalesce=True
+    )
     scheduler.add_job(
         post_weekly_stress_graph,
         "cron",
@@ -0,0 +1 @@
+"""Repository benchmark suite."""
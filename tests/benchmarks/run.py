@@ -0,0 +1,232 @@
+"""Time the repository hot paths against a synthetic database.
+
+Usage (from the repository root, with ``src`` on ``PYTHONPATH``)::
+
+    python -m tests.benchmarks.run --posts 1000000 --out after.json \\
+        --baseline before.json
+
+Each operation runs ``--iterations`` times from ``--concurrency``
+workers through the real pool and group-commit writer. Per-call latency
+percentiles and overall throughput are written as JSON; ``--baseline``
+prints the change against an earlier report.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Awaitable, Callable, Dict, List
+
+# settings are read on first use; give standalone runs what they need
+os.environ.setdefault("BOT_TOKEN", "123456:benchmark")
+os.environ.setdefault("CHANNEL_ID", "-100")
+
+Op = Callable[[random.Random], Awaitable[object]]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(latencies: List[float], wall: float) -> Dict[str, float]:
+    """Latency percentiles in milliseconds plus throughput."""
+    values = sorted(latencies)
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "ops_per_s": round(len(values) / wall, 1),
+    }
+
+
+async def measure(op: Op, iterations: int, concurrency: int,
+                  seed: int) -> Dict[str, float]:
+    """Run ``op`` ``iterations`` times from ``concurrency`` workers."""
+    latencies: List[float] = []
+    remaining = iter(range(iterations))
+
+    async def worker(n: int) -> None:
+        rng = random.Random(seed * 1000 + n)
+        for _ in remaining:
+            started = time.perf_counter()
+            await op(rng)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def _shape(path: Path) -> SimpleNamespace:
+    """Bounds of the data set, read once before timing."""
+    db = sqlite3.connect(path)
+    max_id, first, last = db.execute(
+        "SELECT MAX(post_id), MIN(date(created_at)), MAX(date(created_at)) "
+        "FROM posts"
+    ).fetchone()
+    users = db.execute("SELECT COUNT(*) FROM user_stats").fetchone()[0]
+    live = [r[0] for r in db.execute(
+        "SELECT message_id FROM posts WHERE is_deleted = 0 "
+        "ORDER BY random() LIMIT 100000"
+    )]
+    db.close()
+    return SimpleNamespace(
+        max_id=max_id, users=max(users, 1), live=live,
+        first=date.fromisoformat(first), last=date.fromisoformat(last),
+    )
+
+
+def operations(shape: SimpleNamespace) -> Dict[str, Op]:
+    """Build the benchmarked calls; user ids follow the synth skew."""
+    from innoscream.db import scream_repo as repo
+    from innoscream.services.analytics import weekly_counts
+
+    span = (shape.last - shape.first).days
+    ctx = SimpleNamespace(bot=SimpleNamespace(delete_message=_noop))
+    live = list(shape.live)
+
+    def user(rng):
+        return 1 + int(shape.users * rng.random() ** 3)
+
+    def day(rng):
+        return shape.first + timedelta(days=rng.randint(0, span))
+
+    async def create_post(rng):
+        return await repo.create_post(user(rng), "benchmark scream",
+                                      rng.randint(1, 2**31), -100)
+
+    async def switch_reaction(rng):
+        # recent posts are the hot ones
+        post_id = shape.max_id - int(shape.max_id * rng.random() ** 4)
+        return await repo.switch_reaction(
+            max(post_id, 1), rng.randint(1, shape.users * 2),
+            rng.choice(list(repo.EMOJI_TO_COLUMN)),
+        )
+
+    async def soft_delete(rng):
+        if live:
+            await repo.soft_delete(live.pop(), ctx)
+
+    async def top_daily(rng):
+        repo._top_cache.clear()  # time the query, not the cache
+        return await repo.top_daily(day(rng))
+
+    async def weekly(rng):
+        d = day(rng)
+        return await weekly_counts(d - timedelta(days=d.weekday()))
+
+    async def reactions_received(rng):
+        return await repo.user_total_reactions_received(user(rng))
+
+    return {
+        "create_post": create_post,
+        "switch_reaction": switch_reaction,
+        "soft_delete": soft_delete,
+        "top_daily": top_daily,
+        "weekly_counts": weekly,
+        "user_total_reactions_received": reactions_received,
+    }
+
+
+async def _noop(**kwargs) -> None:
+    return None
+
+
+def _meta(args, path: Path) -> Dict[str, object]:
+    try:
+        commit = subprocess.run(  # nosec B603 B607
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=False,
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "posts": args.posts, "db": str(path), "iterations": args.iterations,
+        "concurrency": args.concurrency, "commit": commit,
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version, "machine": platform.machine(),
+    }
+
+
+async def run(args) -> Dict[str, object]:
+    """Build (or reuse) the database and time every selected operation."""
+    path = args.db or Path(
+        tempfile.gettempdir(), f"innoscream-bench-{args.posts}.db"
+    )
+    os.environ["DB_PATH"] = str(path)  # before anything reads settings
+    from innoscream.db import dao
+    from .synth import build
+
+    if not (args.reuse and path.exists()):
+        print(f"generating {path} ...", file=sys.stderr)
+        await build(path, args.posts, days=args.days, seed=args.seed)
+
+    shape = _shape(path)
+    ops = operations(shape)
+    selected = args.only or list(ops)
+    results = {}
+    await dao.init_db()
+    try:
+        for name in selected:
+            results[name] = await measure(ops[name], args.iterations,
+                                          args.concurrency, args.seed)
+            print(f"{name:32} {results[name]}", file=sys.stderr)
+    finally:
+        await dao.close_db()
+    return {"meta": _meta(args, path), "results": results}
+
+
+def compare(report: dict, baseline: dict) -> None:
+    """Print p50/p95/throughput ratios against ``baseline``."""
+    print(f"{'operation':32} {'p50':>8} {'p95':>8} {'ops/s':>8}")
+    for name, now in report["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if not before:
+            continue
+        ratios = [now[k] / before[k] if before[k] else float("nan")
+                  for k in ("p50_ms", "p95_ms", "ops_per_s")]
+        print(f"{name:32} " + " ".join(f"{r:7.2f}x" for r in ratios))
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--db", type=Path, help="database file to use")
+    parser.add_argument("--reuse", action="store_true",
+                        help="keep an existing --db instead of rebuilding")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="operations to run")
+    parser.add_argument("--out", type=Path, help="write JSON report here")
+    parser.add_argument("--baseline", type=Path,
+                        help="earlier JSON report to compare with")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.out:
+        args.out.write_text(text)
+    else:
+        print(text)
+    if args.baseline:
+        compare(report, json.loads(args.baseline.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Synthetic InnoScream databases for benchmarks.
+
+Posts arrive as a Poisson process over ``days``; a few users write most
+of them and reactions follow a heavy-tailed (Pareto) distribution, so a
+handful of posts collect hundreds of votes while most get none.
+Rows are bulk-inserted into the bare schema, then the remaining
+migrations build indexes, the leaderboard and the rollup in one pass,
+which is much faster than firing triggers row by row.
+"""
+import argparse
+import asyncio
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import List
+
+import aiosqlite
+
+from innoscream.db.migrations import migrate
+from innoscream.services.security import hash_user_id
+
+EMOJIS = ("💀", "🔥", "🤡")
+CHUNK = 50_000
+
+
+def user_hashes(users: int) -> List[str]:
+    """Hashes of user ids ``1..users`` as the app would store them."""
+    return [hash_user_id(uid) for uid in range(1, users + 1)]
+
+
+def _pick_user(rng: random.Random, users: int) -> int:
+    """Skewed user index: low indexes post far more often."""
+    return int(users * rng.random() ** 3)
+
+
+def _reaction_count(rng: random.Random, cap: int) -> int:
+    return min(int(rng.paretovariate(1.5)) - 1, cap)
+
+
+def _rows(rng, posts, days, users, hashes, channel_id):
+    """Yield ``(post, reactions)`` tuples in post_id order."""
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    mean_gap = days * 86400 / posts
+    t = 0.0
+    for post_id in range(1, posts + 1):
+        t += rng.expovariate(1 / mean_gap)
+        created = (start + timedelta(seconds=t)).strftime("%Y-%m-%d %H:%M:%S")
+        author = hashes[_pick_user(rng, users)]
+        voters = rng.sample(range(users), _reaction_count(rng, users // 2))
+        reactions = [(post_id, hashes[v], rng.choice(EMOJIS)) for v in voters]
+        counts = [sum(r[2] == e for r in reactions) for e in EMOJIS]
+        deleted = 1 if rng.random() < 0.01 else 0
+        post = (post_id, author, f"synthetic scream #{post_id}", *counts,
+                1000 + post_id, channel_id, created, deleted)
+        yield post, reactions
+
+
+def _bulk_insert(path: Path, posts: int, days: int, users: int,
+                 seed: int) -> None:
+    rng = random.Random(seed)
+    hashes = user_hashes(users)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=OFF")
+    db.execute("PRAGMA synchronous=OFF")
+    post_rows, reaction_rows = [], []
+    live_counts: dict = {}
+
+    def flush():
+        db.executemany(
+            "INSERT INTO posts (post_id, user_hash, text, skull, fire, clown, "
+            "message_id, chat_id, created_at, is_deleted) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            post_rows,
+        )
+        db.executemany(
+            "INSERT INTO reactions (post_id, user_hash, emoji) "
+            "VALUES (?, ?, ?)",
+            reaction_rows,
+        )
+        post_rows.clear()
+        reaction_rows.clear()
+
+    for post, reactions in _rows(rng, posts, days, users, hashes, -100):
+        post_rows.append(post)
+        reaction_rows.extend(reactions)
+        if not post[-1]:
+            live_counts[post[1]] = live_counts.get(post[1], 0) + 1
+        if len(post_rows) >= CHUNK:
+            flush()
+    flush()
+    db.executemany(
+        "INSERT INTO user_stats (user_hash, post_count) VALUES (?, ?)",
+        live_counts.items(),
+    )
+    db.commit()
+    db.close()
+
+
+async def build(path: Path, posts: int, days: int = 365,
+                users: int | None = None, seed: int = 1) -> Path:
+    """Create a fully migrated database at ``path`` with ``posts`` posts."""
+    users = users or max(1000, posts // 20)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    async with aiosqlite.connect(path) as db:
+        await migrate(db, target=1)
+    _bulk_insert(path, posts, days, users, seed)
+    async with aiosqlite.connect(path) as db:
+        await migrate(db)
+        await db.execute("ANALYZE")
+        await db.commit()
+    return path
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--posts", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    asyncio.run(build(args.path, args.posts, args.days, args.users,
+                      args.seed))
+    print(f"{args.path}: {args.posts} posts "
+          f"in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""Local stand-in for the Telegram Bot API, ImgFlip and QuickChart.
+
+Run it next to the app and point the app at it::
+
+    python -m tests.locust.fake_upstreams --port 8081 \\
+        --webhook http://localhost:8000/telegram/webhook --secret s3cret
+
+Bot API calls (``/bot<token>/<method>``) are answered with plausible
+results and recorded. Updates are injected with ``POST /_inject`` and
+either delivered to ``--webhook`` or served to ``getUpdates`` (polling).
+``GET /_wait?key=<chat id|cb:<callback id>>&after=<seq>`` blocks until
+the bot makes a call for that chat or callback, which is how the load
+test measures per-command latency.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from aiohttp import ClientSession, web
+
+logger = logging.getLogger(__name__)
+
+_REACTION_DATA = re.compile(r"^react_.+_(\d+)$")
+
+
+class FakeUpstreams:
+    """State and handlers of the fake server."""
+
+    def __init__(self, webhook: Optional[str] = None,
+                 secret: Optional[str] = None, bot_latency: float = 0.0,
+                 imgflip_latency: float = 0.0,
+                 quickchart_latency: float = 0.0) -> None:
+        """Create an empty fake."""
+        self.webhook = webhook
+        self.secret = secret
+        self.bot_latency = bot_latency
+        self.imgflip_latency = imgflip_latency
+        self.quickchart_latency = quickchart_latency
+        self.calls: Deque[Dict[str, Any]] = deque(maxlen=100_000)
+        self.updates: Deque[Dict[str, Any]] = deque(maxlen=100_000)
+        self.posts: Deque[List[int]] = deque(maxlen=1000)
+        self.counts: Dict[str, int] = {}
+        self._seq = 0
+        self._update_ids = itertools.count(1)
+        self._message_ids = itertools.count(1)
+        self._changed = asyncio.Condition()
+        self._session: Optional[ClientSession] = None
+        self._deliveries: set = set()
+
+    # ---------------------------------------------------------- Bot API --
+    async def bot_api(self, request: web.Request) -> web.Response:
+        """Answer one Bot API method call."""
+        method = request.match_info["method"]
+        params = dict(await request.post())
+        params.update(request.query)
+        if request.content_type == "application/json":
+            params.update(await request.json())
+        if method == "getUpdates":
+            return _ok(await self._get_updates(params))
+        if self.bot_latency:
+            await asyncio.sleep(self.bot_latency)
+        result = self._result(method, params)
+        await self._record(method, params, result)
+        return _ok(result)
+
+    def _result(self, method: str, params: Dict[str, Any]) -> Any:
+        if method == "getMe":
+            return {"id": 1, "is_bot": True, "first_name": "Fake",
+                    "username": "fake_bot"}
+        if method.startswith("send"):
+            chat_id = int(params.get("chat_id", 0))
+            return {
+                "message_id": next(self._message_ids),
+                "date": int(time.time()),
+                "chat": {"id": chat_id,
+                         "type": "private" if chat_id > 0 else "channel"},
+                "text": str(params.get("text") or params.get("caption", "")),
+            }
+        return True
+
+    async def _record(self, method, params, result) -> None:
+        markup = params.get("reply_markup")
+        if method == "sendMessage" and isinstance(markup, str):
+            post_id = _post_id(markup)
+            if post_id is not None:
+                self.posts.append([post_id, result["message_id"],
+                                   int(params["chat_id"])])
+        async with self._changed:
+            self._seq += 1
+            self.counts[method] = self.counts.get(method, 0) + 1
+            self.calls.append({
+                "seq": self._seq, "method": method, "at": time.time(),
+                "chat_id": str(params.get("chat_id", "")),
+                "callback_query_id": params.get("callback_query_id"),
+                "text": params.get("text"),
+            })
+            self._changed.notify_all()
+
+    async def _get_updates(self, params) -> List[Dict[str, Any]]:
+        offset = int(params.get("offset", 0) or 0)
+        timeout = min(float(params.get("timeout", 0) or 0), 30.0)
+        while self.updates and self.updates[0]["update_id"] < offset:
+            self.updates.popleft()
+        if not self.updates and timeout:
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(
+                        self._changed.wait_for(lambda: bool(self.updates)),
+                        timeout,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+        return list(itertools.islice(self.updates, 100))
+
+    # ---------------------------------------------------------- control --
+    async def inject(self, request: web.Request) -> web.Response:
+        """Queue or deliver an update; returns its id and the call seq."""
+        update = await request.json()
+        update["update_id"] = next(self._update_ids)
+        seq = self._seq
+        if self.webhook:
+            task = asyncio.create_task(self._deliver(update))
+            self._deliveries.add(task)
+            task.add_done_callback(self._deliveries.discard)
+        else:
+            async with self._changed:
+                self.updates.append(update)
+                self._changed.notify_all()
+        return web.json_response({"update_id": update["update_id"],
+                                  "seq": seq})
+
+    async def _deliver(self, update: Dict[str, Any]) -> None:
+        headers = {}
+        if self.secret:
+            headers["X-Telegram-Bot-Api-Secret-Token"] = self.secret
+        if self._session is None:
+            self._session = ClientSession()
+        try:
+            async with self._session.post(self.webhook, json=update,
+                                          headers=headers) as resp:
+                if resp.status != 200:
+                    logger.warning(f"Webhook answered {resp.status}")
+        except Exception as e:
+            logger.warning(f"Webhook delivery failed: {e}")
+
+    async def wait(self, request: web.Request) -> web.Response:
+        """Block until a call for ``key`` newer than ``after`` is made."""
+        key = request.query["key"]
+        after = int(request.query.get("after", 0))
+        timeout = float(request.query.get("timeout", 10))
+
+        def match():
+            for call in reversed(self.calls):
+                if call["seq"] <= after:
+                    return None
+                if key in (call["chat_id"], f"cb:{call['callback_query_id']}"):
+                    return call
+            return None
+
+        async with self._changed:
+            try:
+                call = await asyncio.wait_for(
+                    self._changed.wait_for(match), timeout
+                )
+            except asyncio.TimeoutError:
+                return web.json_response({"error": "timeout"}, status=504)
+        return web.json_response(call)
+
+    async def posts_list(self, request: web.Request) -> web.Response:
+        """Recently posted screams as ``[post_id, message_id, chat_id]``."""
+        return web.json_response(list(self.posts))
+
+    async def stats(self, request: web.Request) -> web.Response:
+        """Calls per Bot API method."""
+        return web.json_response({"calls": self.counts, "seq": self._seq,
+                                  "pending_updates": len(self.updates)})
+
+    async def reset(self, request: web.Request) -> web.Response:
+        """Forget recorded calls and queued updates."""
+        self.calls.clear()
+        self.updates.clear()
+        self.posts.clear()
+        self.counts.clear()
+        return web.json_response({"ok": True})
+
+    # -------------------------------------------------------- upstreams --
+    async def imgflip(self, request: web.Request) -> web.Response:
+        """Fake ``caption_image``."""
+        await asyncio.sleep(self.imgflip_latency)
+        form = await request.post()
+        url = f"https://i.imgflip.test/{form.get('template_id')}.jpg"
+        return web.json_response({"success": True,
+                                  "data": {"url": url, "page_url": url}})
+
+    async def quickchart(self, request: web.Request) -> web.Response:
+        """Fake ``chart/create``."""
+        await asyncio.sleep(self.quickchart_latency)
+        body = await request.read()
+        url = f"https://quickchart.test/chart/{abs(hash(body))}.png"
+        return web.json_response({"success": True, "url": url})
+
+    async def close(self, app: web.Application) -> None:
+        """Close the webhook client session."""
+        if self._session is not None:
+            await self._session.close()
+
+    def app(self) -> web.Application:
+        """Build the aiohttp application."""
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.bot_api)
+        app.router.add_post("/_inject", self.inject)
+        app.router.add_get("/_wait", self.wait)
+        app.router.add_get("/_posts", self.posts_list)
+        app.router.add_get("/_stats", self.stats)
+        app.router.add_post("/_reset", self.reset)
+        app.router.add_post("/imgflip/caption_image", self.imgflip)
+        app.router.add_post("/quickchart/chart/create", self.quickchart)
+        app.on_cleanup.append(self.close)
+        return app
+
+
+def _ok(result: Any) -> web.Response:
+    return web.json_response({"ok": True, "result": result})
+
+
+def _post_id(markup: str) -> Optional[int]:
+    try:
+        rows = json.loads(markup).get("inline_keyboard", [])
+    except (ValueError, AttributeError):
+        return None
+    for row in rows:
+        for button in row:
+            found = _REACTION_DATA.match(button.get("callback_data", ""))
+            if found:
+                return int(found.group(1))
+    return None
+
+
+def main() -> None:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--webhook", help="app webhook URL (else polling)")
+    parser.add_argument("--secret", help="WEBHOOK_SECRET of the app")
+    parser.add_argument("--bot-latency-ms", type=float, default=0)
+    parser.add_argument("--imgflip-latency-ms", type=float, default=300)
+    parser.add_argument("--quickchart-latency-ms", type=float, default=150)
+    args = parser.parse_args()
+
+    fake = FakeUpstreams(
+        webhook=args.webhook, secret=args.secret,
+        bot_latency=args.bot_latency_ms / 1000,
+        imgflip_latency=args.imgflip_latency_ms / 1000,
+        quickchart_latency=args.quickchart_latency_ms / 1000,
+    )
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(fake.app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
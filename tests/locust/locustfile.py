@@ -1,19 +1,151 @@
-"""Locust module."""
-from locust import HttpUser, task
-from src.innoscream.core.config import get_settings
+"""Locust module.
+
+Drives the real ``innoscream.main:app`` with a realistic mix of bot
+commands and REST reads. Bot updates are injected through the fake
+upstreams (``tests/locust/fake_upstreams.py``), which also tell us when
+the bot answered, so every command is reported with its end-to-end
+latency under the ``BOT`` request type.
+
+Environment:
+    FAKE_URL: base URL of the fake upstreams (default localhost:8081)
+    CHANNEL_ID: the app's channel id, used for reaction callbacks
+    LOAD_ADMIN_ID: an id listed in the app's ADMINS to include /meme
+"""
+import itertools
+import os
+import random
+import time
+from datetime import date, timedelta
+
+import requests
+from locust import HttpUser, between, events, task
+
+FAKE_URL = os.environ.get("FAKE_URL", "http://localhost:8081")
+CHANNEL_ID = int(os.environ.get("CHANNEL_ID", "-1001234567890"))
+ADMIN_ID = int(os.environ.get("LOAD_ADMIN_ID", "0"))
+REPLY_TIMEOUT = 10
+
+_user_ids = itertools.count(10_000_000 + random.randint(0, 10**6) * 100)
+_callback_ids = itertools.count(1)
 
 
 class ScreamBotUser(HttpUser):
-    """Scream Bot User class."""
-
-    def __init__(self, *args, **kwargs):
-        """Initialize ScreamBot user."""
-        super().__init__(*args, **kwargs)
-        self.bot_token = get_settings().bot_token
-        self.channel_id = get_settings().channel_id
-
-    @task
-    def get_updates(self):
-        """Simulate checking for new messages."""
-        endpoint = f"/bot{self.bot_token}/getUpdates"
-        self.client.get(endpoint)
+    """One Telegram user plus a dashboard reader hitting the API."""
+
+    wait_time = between(0.5, 2)
+
+    def on_start(self):
+        """Pick a private chat id and open a session to the fake."""
+        self.user_id = next(_user_ids)
+        self.fake = requests.Session()
+
+    def _user(self):
+        return {"id": self.user_id, "is_bot": False,
+                "first_name": f"load{self.user_id}"}
+
+    def _message(self, text):
+        return {"message": {
+            "message_id": random.randint(1, 2**31),
+            "date": int(time.time()),
+            "chat": {"id": self.user_id, "type": "private"},
+            "from": self._user(),
+            "text": text,
+        }}
+
+    def _command(self, name, update, key=None):
+        """Inject ``update`` and report the time until the bot answers."""
+        started = time.perf_counter()
+        exception = None
+        try:
+            sent = self.fake.post(f"{FAKE_URL}/_inject", json=update).json()
+            resp = self.fake.get(f"{FAKE_URL}/_wait", params={
+                "key": key or str(self.user_id), "after": sent["seq"],
+                "timeout": REPLY_TIMEOUT,
+            }, timeout=REPLY_TIMEOUT + 5)
+            if resp.status_code != 200:
+                exception = TimeoutError(f"no reply to {name}")
+        except requests.RequestException as e:
+            exception = e
+        events.request.fire(
+            request_type="BOT", name=name,
+            response_time=(time.perf_counter() - started) * 1000,
+            response_length=0, exception=exception, context={},
+        )
+
+    @task(3)
+    def scream(self):
+        """Post a scream."""
+        self._command("/scream", self._message(
+            f"/scream load test {random.randint(0, 10**9)}"
+        ))
+
+    @task(8)
+    def react(self):
+        """Click a reaction button under a recent scream."""
+        posts = self.fake.get(f"{FAKE_URL}/_posts").json()
+        if not posts:
+            return
+        post_id, message_id, chat_id = random.choice(posts[-50:])
+        emoji = random.choice(["💀", "🔥", "🤡"])
+        callback_id = str(next(_callback_ids))
+        update = {"callback_query": {
+            "id": callback_id,
+            "from": self._user(),
+            "chat_instance": "load",
+            "data": f"react_{emoji}_{post_id}",
+            "message": {"message_id": message_id, "date": int(time.time()),
+                        "chat": {"id": chat_id or CHANNEL_ID,
+                                 "type": "channel"}},
+        }}
+        self._command("reaction", update, key=f"cb:{callback_id}")
+
+    @task(2)
+    def stats(self):
+        """Ask for personal stats (chart)."""
+        self._command("/stats", self._message("/stats"))
+
+    @task(2)
+    def top(self):
+        """Ask for today's top scream."""
+        self._command("/top", self._message("/top"))
+
+    @task(1)
+    def help(self):
+        """Open the help text."""
+        self._command("/help", self._message("/help"))
+
+    @task(1)
+    def meme(self):
+        """Post a meme (only when an admin id is configured)."""
+        if not ADMIN_ID:
+            return
+        update = self._message("/meme when the load test starts")
+        update["message"]["from"]["id"] = ADMIN_ID
+        update["message"]["chat"]["id"] = ADMIN_ID
+        self._command("/meme", update, key=str(ADMIN_ID))
+
+    @task(2)
+    def api_top_day(self):
+        """Read a past day's top post."""
+        day = date.today() - timedelta(days=random.randint(1, 30))
+        with self.client.get(f"/api/v1/top/{day}", name="/api/v1/top/[day]",
+                             catch_response=True) as resp:
+            if resp.status_code == 404:
+                resp.success()
+
+    @task(2)
+    def api_top_range(self):
+        """Read a month of leaderboards."""
+        end = date.today()
+        self.client.get("/api/v1/top", name="/api/v1/top?from&to", params={
+            "from": str(end - timedelta(days=30)), "to": str(end),
+            "limit": 5,
+        })
+
+    @task(1)
+    def api_posts(self):
+        """Page through recent posts."""
+        body = self.client.get("/api/v1/posts", params={"limit": 50}).json()
+        if body.get("next"):
+            self.client.get("/api/v1/posts", name="/api/v1/posts?before",
+                            params={"limit": 50, "before": body["next"]})
@@ -1,5 +1,6 @@
 from unittest.mock import MagicMock, patch
 import pytest
+import pytest_asyncio
 
 @pytest.fixture(autouse=True)
 def mock_settings():
@@ -11,4 +12,23 @@ def mock_settings():
             imgflip_user="test_user",
             imgflip_pass="test_pass"
         )
-        yield
\ No newline at end of file
+        yield
+
+@pytest_asyncio.fixture
+async def repo_db(tmp_path, monkeypatch):
+    """Point the DAO at a fresh, fully migrated database."""
+    from innoscream.db import dao, scream_repo
+    from innoscream.db.migrations import migrate
+    from innoscream.db.pool import ConnectionPool
+
+    pool = ConnectionPool(tmp_path / "screams.db", size=2)
+    async with pool.connection() as db:
+        await migrate(db)
+    monkeypatch.setattr(dao, "_pool", pool)
+    monkeypatch.setattr(dao, "_writer", None)
+    monkeypatch.setattr(scream_repo, "_reaction_cache", None)
+    monkeypatch.setattr(scream_repo, "_post_ids", None)
+    scream_repo._top_cache.clear()
+    scream_repo._stats_cache.clear()
+    yield pool
+    await pool.close()
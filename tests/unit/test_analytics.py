@@ -2,7 +2,15 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 import datetime as dt
+from innoscream.services import analytics
 from innoscream.services.analytics import weekly_counts, chart_url
+from innoscream.services.chart_cache import ChartCache
+
+
+@pytest.fixture(autouse=True)
+def memory_chart_cache(monkeypatch):
+    """Give every test its own, non-persistent chart cache."""
+    monkeypatch.setattr(analytics, "_chart_cache", ChartCache(persist=False))
 
 @pytest.mark.asyncio
 async def test_weekly_counts_empty():
@@ -47,4 +55,57 @@ async def test_chart_url_failure():
     
     with patch('httpx.AsyncClient.post', new=AsyncMock(return_value=mock_response)):
         result = await chart_url(test_labels, test_data)
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+async def _insert_posts(pool, *stamps):
+    async with pool.connection() as db:
+        await db.executemany(
+            "INSERT INTO posts (user_hash, text, message_id, chat_id, created_at) "
+            "VALUES ('h', 't', ?, 1, ?)",
+            list(enumerate(stamps)),
+        )
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_weekly_counts_from_rollup(repo_db):
+    """Counts come from the rollup, including Sunday, minus deleted posts."""
+    await _insert_posts(
+        repo_db,
+        "2024-01-01 09:00:00", "2024-01-01 23:59:59",  # Mon
+        "2024-01-07 10:00:00",                         # Sun
+        "2024-01-08 00:00:00",                         # next Mon
+    )
+    async with repo_db.connection() as db:
+        await db.execute("UPDATE posts SET is_deleted=1 WHERE message_id=0")
+        await db.commit()
+
+    assert await weekly_counts(dt.date(2024, 1, 1)) == [1, 0, 0, 0, 0, 0, 1]
+
+
+@pytest.mark.asyncio
+async def test_range_and_monthly_counts(repo_db):
+    """Arbitrary ranges and whole months are served per day."""
+    from innoscream.services.analytics import monthly_counts, range_counts
+
+    await _insert_posts(repo_db, "2024-02-28 12:00:00", "2024-02-29 01:00:00",
+                        "2024-02-29 02:00:00", "2024-03-01 00:00:00")
+
+    assert await range_counts(dt.date(2024, 2, 28), dt.date(2024, 3, 1)) == [1, 2, 1]
+    feb = await monthly_counts(2024, 2)
+    assert len(feb) == 29 and sum(feb) == 3
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rollup_matches_triggers(repo_db):
+    """A batch rebuild from posts gives the same table as the triggers."""
+    from innoscream.services.analytics import rebuild_rollup
+
+    await _insert_posts(repo_db, "2024-05-05 05:00:00", "2024-05-05 05:30:00")
+    query = "SELECT day, hour, count FROM post_counts_rollup ORDER BY 1, 2"
+    async with repo_db.connection() as db:
+        before = await db.execute_fetchall(query)
+    await rebuild_rollup()
+    async with repo_db.connection() as db:
+        after = await db.execute_fetchall(query)
+    assert before == after == [("2024-05-05", 5, 2)]
@@ -0,0 +1,76 @@
+# tests/unit/test_chart_cache.py
+import asyncio
+import pytest
+from innoscream.services.chart_cache import ChartCache, chart_key
+
+
+def test_chart_key_ignores_dict_order():
+    """Equal configs hash equally regardless of key order."""
+    assert chart_key({"a": 1, "b": [1, 2]}) == chart_key({"b": [1, 2], "a": 1})
+    assert chart_key({"a": 1}) != chart_key({"a": 2})
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_render_once():
+    """Many simultaneous requests for one chart share a single render."""
+    calls = 0
+
+    async def render():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "https://chart/1"
+
+    cache = ChartCache(persist=False)
+    results = await asyncio.gather(
+        *(cache.get_or_render({"x": 1}, render) for _ in range(50))
+    )
+    assert set(results) == {"https://chart/1"}
+    assert calls == 1
+    assert await cache.get_or_render({"x": 1}, render) == "https://chart/1"
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_render_is_not_cached():
+    """A None result is returned but retried next time."""
+    cache = ChartCache(persist=False)
+    results = iter([None, "https://chart/2"])
+
+    async def render():
+        return next(results)
+
+    assert await cache.get_or_render({"y": 1}, render) is None
+    assert await cache.get_or_render({"y": 1}, render) == "https://chart/2"
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_rendered_again():
+    """Entries older than the TTL are dropped."""
+    cache = ChartCache(ttl=0, persist=False)
+    calls = 0
+
+    async def render():
+        nonlocal calls
+        calls += 1
+        return "u"
+
+    await cache.get_or_render({"z": 1}, render)
+    await cache.get_or_render({"z": 1}, render)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_persisted_entries_survive_restart(repo_db):
+    """A new cache instance (a restart) finds charts stored in SQLite."""
+    async def render():
+        return "https://chart/3"
+
+    await ChartCache().get_or_render({"w": 1}, render)
+
+    async def must_not_render():
+        raise AssertionError("should come from SQLite")
+
+    restarted = ChartCache()
+    url = await restarted.get_or_render({"w": 1}, must_not_render)
+    assert url == "https://chart/3"
@@ -0,0 +1,46 @@
+# tests/unit/test_chart_render.py
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from innoscream.services import analytics, chart_render
+from innoscream.services.chart_cache import ChartCache
+
+LABELS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+DATA = [1, 4, 2, 0, 7, 3, 5]
+
+
+@pytest.fixture(autouse=True)
+def local_backend(monkeypatch):
+    monkeypatch.setattr(analytics, "_chart_cache", ChartCache(persist=False))
+    settings = MagicMock(chart_backend="local")
+    monkeypatch.setattr(analytics, "get_settings", lambda: settings)
+
+
+def test_render_line_png():
+    """The local renderer produces a PNG entirely offline."""
+    pytest.importorskip("matplotlib")
+    png = chart_render.render_line_png(LABELS, DATA)
+    assert png.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+@pytest.mark.asyncio
+async def test_chart_photo_local_upload():
+    """With CHART_BACKEND=local the chart is sent as an in-memory file."""
+    pytest.importorskip("matplotlib")
+    from aiogram.types import BufferedInputFile
+
+    with patch("httpx.AsyncClient.post", new=AsyncMock()) as remote:
+        photo = await analytics.chart_photo(LABELS, DATA)
+    assert isinstance(photo, BufferedInputFile)
+    assert photo.data.startswith(b"\x89PNG")
+    remote.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_chart_photo_falls_back_to_quickchart(monkeypatch):
+    """If the local backend is unavailable QuickChart is used instead."""
+    monkeypatch.setattr(chart_render, "AVAILABLE", False)
+    response = MagicMock()
+    response.json.return_value = {"success": True, "url": "https://qc/1"}
+
+    with patch("httpx.AsyncClient.post", new=AsyncMock(return_value=response)):
+        assert await analytics.chart_photo(LABELS, DATA) == "https://qc/1"
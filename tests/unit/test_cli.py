@@ -0,0 +1,138 @@
+# tests/unit/test_cli.py
+import io
+import json
+import sqlite3
+
+import pytest
+from innoscream import cli
+
+POSTS = [
+    (1, "a", "first", 1, 1, 0, 11, -100, "2025-05-01 10:00:00", 0),
+    (2, "b", "second", 1, 0, 0, 12, -100, "2025-05-01 11:00:00", 0),
+    (3, "a", "gone", 0, 0, 0, 13, -100, "2025-05-02 09:00:00", 1),
+]
+REACTIONS = [(1, "x", "💀"), (1, "y", "🔥"), (2, "x", "💀")]
+
+
+@pytest.fixture
+def source(tmp_path):
+    """A migrated database holding a few posts and reactions."""
+    path = str(tmp_path / "src.db")
+    db = cli.connect(path)
+    cli.import_rows(db, "posts", POSTS)
+    cli.import_rows(db, "reactions", REACTIONS)
+    cli.import_rows(db, "user_stats", [("a", 1), ("b", 1)])
+    db.close()
+    return path
+
+
+def _objects(db, kind):
+    return {r[0] for r in db.execute(
+        "SELECT name FROM sqlite_master WHERE type = ? AND sql IS NOT NULL",
+        (kind,),
+    )}
+
+
+@pytest.mark.parametrize("fmt", cli.FORMATS)
+def test_round_trip(source, tmp_path, fmt, capsys):
+    """Exported tables load back into a fresh DB with derived data."""
+    files = []
+    for table in ("posts", "reactions"):
+        out = str(tmp_path / f"{table}.{fmt}")
+        cli.main(["--db", source, "export", table, "-o", out,
+                  "--format", fmt])
+        files.append(f"{table}={out}")
+    target = str(tmp_path / "dst.db")
+    fresh = cli.connect(target)
+    indexes, triggers = _objects(fresh, "index"), _objects(fresh, "trigger")
+    fresh.close()
+
+    cli.main(["--db", target, "import", *files, "--format", fmt,
+              "--batch", "2"])
+
+    db = sqlite3.connect(target)
+    assert db.execute(
+        "SELECT post_id, skull, fire, clown FROM posts ORDER BY post_id"
+    ).fetchall() == [(1, 1, 1, 0), (2, 1, 0, 0), (3, 0, 0, 0)]
+    assert db.execute(
+        "SELECT user_hash, post_count FROM user_stats ORDER BY user_hash"
+    ).fetchall() == [("a", 1), ("b", 1)]
+    assert db.execute(
+        "SELECT day, post_id, votes FROM daily_top ORDER BY post_id"
+    ).fetchall() == [("2025-05-01", 1, 2), ("2025-05-01", 2, 1)]
+    assert _objects(db, "index") == indexes
+    assert _objects(db, "trigger") == triggers
+    assert "imported 3 posts rows" in capsys.readouterr().err
+
+
+def test_export_ndjson_streams_records(source, capsys):
+    """NDJSON export writes one object per row to stdout."""
+    cli.main(["--db", source, "export", "posts"])
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)["text"] for line in lines] == \
+        ["first", "second", "gone"]
+
+
+def test_failed_import_keeps_schema(source, tmp_path):
+    """A conflicting load is rolled back and indexes are restored."""
+    db = sqlite3.connect(source)
+    before = _objects(db, "index") | _objects(db, "trigger")
+    db.close()
+    dump = tmp_path / "posts.ndjson"
+    dump.write_text(json.dumps(dict(zip(cli.COLUMNS["posts"], POSTS[0]))))
+
+    with pytest.raises(sqlite3.IntegrityError):
+        cli.main(["--db", source, "import", f"posts={dump}"])
+    cli.main(["--db", source, "import", f"posts={dump}",
+              "--on-conflict", "ignore"])
+
+    db = sqlite3.connect(source)
+    assert _objects(db, "index") | _objects(db, "trigger") == before
+    assert db.execute("SELECT COUNT(*) FROM posts").fetchone() == (3,)
+
+
+def test_posts_only_import_keeps_counters(source, tmp_path):
+    """Counters are only recounted when reactions are loaded or asked for."""
+    dump = tmp_path / "posts.ndjson"
+    cli.main(["--db", source, "export", "posts", "-o", str(dump)])
+    target = str(tmp_path / "dst.db")
+    cli.connect(target).close()
+
+    cli.main(["--db", target, "import", f"posts={dump}"])
+    db = sqlite3.connect(target)
+    counters = "SELECT skull, fire, clown FROM posts ORDER BY post_id"
+    assert db.execute(counters).fetchall() == [
+        (1, 1, 0), (1, 0, 0), (0, 0, 0)
+    ]
+    assert db.execute("SELECT COUNT(*) FROM user_stats").fetchone() == (2,)
+
+    cli.main(["--db", target, "import", f"posts={dump}",
+              "--on-conflict", "ignore", "--recount"])
+    assert db.execute(counters).fetchall() == [(0, 0, 0)] * 3
+
+
+def test_bad_table_spec_is_rejected(capsys):
+    """``TABLE=FILE`` must name a known table."""
+    with pytest.raises(SystemExit):
+        cli.main(["import", "nope=x.csv"])
+
+
+def test_missing_column_is_reported_with_its_line(source, tmp_path):
+    """A record without a required column fails before it is inserted."""
+    record = dict(zip(cli.COLUMNS["posts"], POSTS[0]))
+    del record["text"]
+    dump = tmp_path / "posts.ndjson"
+    dump.write_text(f"\n{json.dumps(record)}\n")
+
+    with pytest.raises(SystemExit, match="posts.ndjson: line 2: missing text"):
+        cli.main(["--db", source, "import", f"posts={dump}"])
+
+
+def test_empty_csv_cells_of_nullable_columns_are_null():
+    """CSV cannot spell NULL, so nullable columns read empty as None."""
+    src = io.StringIO("post_id,user_hash,text,skull,fire,clown,message_id,"
+                      "chat_id,created_at,is_deleted\n"
+                      ",h,hi,0,0,0,1,-100,,0\n")
+    rows = list(cli.read_rows(src, cli.COLUMNS["posts"], "csv",
+                              cli.NULLABLE["posts"]))
+    assert rows == [(None, "h", "hi", "0", "0", "0", "1", "-100", None, "0")]
@@ -0,0 +1,66 @@
+# tests/unit/test_coalescer.py
+import asyncio
+import pytest
+from unittest.mock import AsyncMock
+from aiogram.exceptions import TelegramRetryAfter
+from innoscream.bot.coalescer import KeyboardCoalescer
+
+
+@pytest.mark.asyncio
+async def test_first_update_is_sent_without_blocking_the_caller():
+    """A quiet message is edited right away, but not by the submitter."""
+    release = asyncio.Event()
+
+    async def blocked(markup):
+        await release.wait()
+
+    edit = AsyncMock(side_effect=blocked)
+    coalescer = KeyboardCoalescer(interval=10)
+    await asyncio.wait_for(coalescer.submit("m", edit, "v1"), 1)
+
+    await asyncio.sleep(0)
+    edit.assert_awaited_once_with("v1")
+    release.set()
+
+
+@pytest.mark.asyncio
+async def test_burst_is_coalesced_to_latest_state():
+    """Clicks inside the interval collapse into one trailing edit."""
+    edit = AsyncMock()
+    coalescer = KeyboardCoalescer(interval=0.05)
+    await coalescer.submit("m", edit, "v1")
+    await asyncio.sleep(0)
+    for version in range(2, 11):
+        await coalescer.submit("m", edit, f"v{version}")
+    assert edit.await_count == 1
+
+    await asyncio.sleep(0.1)
+    assert [c.args[0] for c in edit.await_args_list] == ["v1", "v10"]
+    assert coalescer.coalesced == 8
+
+
+@pytest.mark.asyncio
+async def test_messages_are_independent():
+    """Each message has its own interval."""
+    edit = AsyncMock()
+    coalescer = KeyboardCoalescer(interval=10)
+    await coalescer.submit("a", edit, "a1")
+    await coalescer.submit("b", edit, "b1")
+    await asyncio.sleep(0)
+    assert edit.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_rate_limited_flush_is_retried_with_newest_state():
+    """After a 429 the next attempt sends the newest keyboard."""
+    edit = AsyncMock(side_effect=[
+        TelegramRetryAfter(method=None, message="429", retry_after=0),
+        None,
+    ])
+    coalescer = KeyboardCoalescer(interval=0.02)
+    await coalescer.submit("m", edit, "v1")
+    await asyncio.sleep(0)
+    await coalescer.submit("m", edit, "v2")
+
+    await asyncio.sleep(0.08)
+    assert [c.args[0] for c in edit.await_args_list] == ["v1", "v2"]
@@ -0,0 +1,34 @@
+# tests/unit/test_dao.py
+from types import SimpleNamespace
+
+import pytest
+from innoscream.db import dao
+
+
+@pytest.mark.asyncio
+async def test_init_close_cycles_get_fresh_writer(tmp_path, monkeypatch):
+    """A second init_db after close_db starts a new group-commit writer."""
+    monkeypatch.setattr(dao, "get_settings", lambda: SimpleNamespace(
+        db_path=str(tmp_path / "sub" / "t.db"), db_pool_size=1,
+        write_batch_size=8, write_batch_latency_ms=1, db_slow_query_ms=0,
+    ))
+    monkeypatch.setattr(dao, "_pool", None)
+    monkeypatch.setattr(dao, "_writer", None)
+    monkeypatch.setattr(dao, "_tracer", None)
+
+    async def op(db):
+        cur = await db.execute("INSERT INTO user_stats VALUES ('h', 1) "
+                               "ON CONFLICT DO UPDATE SET post_count = "
+                               "post_count + 1 RETURNING post_count")
+        return (await cur.fetchone())[0]
+
+    results, writers = [], []
+    for _ in range(2):
+        await dao.init_db()
+        writers.append(dao.get_writer())
+        assert writers[-1].running
+        results.append(await dao.write(op))
+        await dao.close_db()
+        assert dao._writer is None
+    assert writers[0] is not writers[1]
+    assert results == [1, 2]
@@ -1,4 +1,5 @@
 # tests/unit/test_handlers.py
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from aiogram import types, Router
@@ -17,6 +18,19 @@ def mock_settings():
         yield
         
 
+@pytest.fixture(autouse=True)
+def bot_singletons(monkeypatch):
+    """Fresh coalescer and dispatcher, independent of the patched settings.
+
+    Built lazily from ``get_settings``, they would otherwise capture the
+    MagicMock settings of whichever test created them first.
+    """
+    from innoscream.bot import coalescer, outbound
+    monkeypatch.setattr(coalescer, "_coalescer",
+                        coalescer.KeyboardCoalescer(interval=1.0))
+    monkeypatch.setattr(outbound, "_outbound", outbound.OutboundDispatcher())
+
+
 @pytest.fixture
 def mock_message():
     """Fixture providing a properly mocked message."""
@@ -41,10 +55,36 @@ async def test_handle_scream_success(mock_message):
     from innoscream.bot.handlers import handle_scream
     
     mock_message.text = "/scream test message"
-    with patch('innoscream.services.scream.save_scream', new=AsyncMock(return_value=1)):
+    with patch('innoscream.services.scream.reserve_post_id', new=AsyncMock(return_value=7)), \
+         patch('innoscream.services.scream.save_scream', new=AsyncMock(return_value=7)) as save:
         await handle_scream(mock_message)
+        # the channel post goes out in the background
+        from innoscream.bot.outbound import get_outbound
+        await asyncio.wait(set(get_outbound()._spawned), timeout=1)
         mock_message.bot.send_message.assert_called_once()
 
+    # posted once, already carrying the final post_id
+    markup = mock_message.bot.send_message.call_args.kwargs["reply_markup"]
+    assert markup.inline_keyboard[0][0].callback_data.endswith("_7")
+    mock_message.bot.send_message.return_value.edit_reply_markup.assert_not_called()
+    assert save.call_args.kwargs["post_id"] == 7
+
+
+@pytest.mark.asyncio
+async def test_handle_scream_reports_failed_post(mock_message):
+    """The user is told when the background channel post fails."""
+    from innoscream.bot.handlers import handle_scream
+    from innoscream.bot.outbound import get_outbound
+
+    mock_message.text = "/scream test message"
+    mock_message.bot.send_message = AsyncMock(side_effect=RuntimeError)
+    with patch('innoscream.services.scream.reserve_post_id', new=AsyncMock(return_value=7)), \
+         patch('innoscream.services.scream.save_scream', new=AsyncMock()) as save:
+        await handle_scream(mock_message)
+        await asyncio.wait(set(get_outbound()._spawned), timeout=1)
+    save.assert_not_called()
+    assert "could not be posted" in mock_message.answer.call_args[0][0]
+
 @pytest.mark.asyncio
 async def test_handle_reaction():
     """Test reaction handling."""
@@ -59,6 +99,7 @@ async def test_handle_reaction():
     with patch('innoscream.services.scream.add_reaction', new=AsyncMock(return_value=(1, 2, 3))):
         from innoscream.bot.handlers import handle_reaction
         await handle_reaction(mock_callback)
+        await asyncio.sleep(0)  # the keyboard edit runs in the background
         mock_callback.message.edit_reply_markup.assert_called_once()
 
 
@@ -93,7 +134,7 @@ async def test_handle_delete_unauthorized():
     mock_message.from_user.id = 123
     mock_message.answer = AsyncMock()
     
-    with patch('innoscream.core.config.get_settings') as mock_settings:
+    with patch('innoscream.bot.handlers.get_settings') as mock_settings:
         mock_settings.return_value.admin_ids = {456}
         from innoscream.bot.handlers import handle_delete
         await handle_delete(mock_message)
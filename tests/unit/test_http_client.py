@@ -0,0 +1,18 @@
+# tests/unit/test_http_client.py
+import pytest
+from innoscream.services import http_client
+
+
+@pytest.mark.asyncio
+async def test_clients_are_shared_and_closed():
+    """One keep-alive client per upstream, recreated after shutdown."""
+    await http_client.init_clients()
+    imgflip = http_client.get_client("imgflip")
+    assert http_client.get_client("imgflip") is imgflip
+    assert http_client.get_client("quickchart") is not imgflip
+    assert imgflip.timeout.read == 10.0
+
+    await http_client.close_clients()
+    assert imgflip.is_closed
+    assert http_client.get_client("imgflip") is not imgflip
+    await http_client.close_clients()
@@ -0,0 +1,52 @@
+# tests/unit/test_main.py
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+from innoscream import main
+from innoscream.core.startup import StartupProfile
+
+
+def test_import_defers_heavy_dependencies():
+    """Importing the app loads neither the bot, scheduler nor httpx."""
+    code = (
+        "import sys, innoscream.main\n"
+        "print(sorted(m for m in ('aiogram', 'apscheduler', 'httpx') "
+        "if m in sys.modules))"
+    )
+    env = {**os.environ, "BOT_TOKEN": "1:x", "CHANNEL_ID": "-1",
+           "PYTHONPATH": os.pathsep.join(sys.path)}
+    out = subprocess.run([sys.executable, "-c", code], env=env,  # nosec
+                         capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+@pytest.mark.asyncio
+async def test_startup_skips_disabled_subsystems(monkeypatch, caplog):
+    """API-only mode starts the DB alone and reports its phases."""
+    monkeypatch.setattr(main, "get_settings", lambda: SimpleNamespace(
+        bot_mode="off", scheduler_enabled=False,
+    ))
+    monkeypatch.setattr(main, "init_db", AsyncMock())
+    monkeypatch.setattr(main, "close_db", AsyncMock())
+    monkeypatch.setattr(main, "profile", StartupProfile())
+
+    with caplog.at_level("INFO", logger="innoscream.core.startup"):
+        await main.startup_event()
+    await main.shutdown_event()
+
+    assert list(main.profile.phases) == ["db"]
+    assert "Startup: db " in caplog.text
+    assert 'innoscream_startup_phase_seconds{phase="db"}' in \
+        main.metrics.render()
+    main.close_db.assert_awaited_once()
+
+
+def test_profile_summary():
+    """Phases are listed in order with a total."""
+    profile = StartupProfile()
+    profile.phases.update(db=0.012, bot=0.0805)
+    assert profile.summary() == "db 12.0 ms, bot 80.5 ms (total 92.5 ms)"
@@ -74,4 +74,41 @@ async def test_generate_meme_api_error():
         mock_settings.return_value.imgflip_pass = "pass"
         from innoscream.services.meme import generate_meme
         result = await generate_meme("test")
-        assert result is None
\ No newline at end of file
+        assert result is None
+
+
+@pytest.mark.asyncio
+async def test_generate_meme_is_cached(monkeypatch):
+    """The same caption is rendered by ImgFlip only once."""
+    from innoscream.services import meme
+    from innoscream.core.cache import LRUCache
+    monkeypatch.setattr(meme, "_meme_cache", LRUCache())
+
+    mock_response = MagicMock()
+    mock_response.json.return_value = {"success": True, "data": {"url": "http://img/1"}}
+
+    with patch('httpx.AsyncClient.post', new=AsyncMock(return_value=mock_response)) as post:
+        first = await meme.generate_meme("the same scream text again",
+                                         stable=True)
+        second = await meme.generate_meme("the same scream text again",
+                                          stable=True)
+
+    assert first == second == "http://img/1"
+    post.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_choose_template_is_stable_per_text():
+    """With ``stable`` the template depends only on the text."""
+    text = "why are nine am lectures a thing"
+    picks = {(await _choose_template(text, stable=True))[0]
+             for _ in range(10)}
+    assert len(picks) == 1
+
+
+@pytest.mark.asyncio
+async def test_choose_template_is_random_per_call():
+    """By default the same text gets different templates over time."""
+    text = "why are nine am lectures a thing"
+    picks = {(await _choose_template(text))[0] for _ in range(50)}
+    assert len(picks) > 1
@@ -0,0 +1,161 @@
+# tests/unit/test_metrics.py
+import httpx
+import pytest
+from unittest.mock import MagicMock
+from innoscream.bot.instrumentation import ApiCallMeter, HandlerTimer
+from innoscream.core import metrics
+from innoscream.services.http_client import MeteredTransport
+
+
+def _sample(name, **labels):
+    """Current value of one sample line in the exposition output."""
+    text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    prefix = f"{name}{{{text}}} " if text else f"{name} "
+    for line in metrics.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def test_histogram_exposition():
+    """Buckets are cumulative and end with +Inf, _sum and _count."""
+    hist = metrics.Histogram("t_hist_seconds", "Test.", ["op"],
+                             buckets=(0.1, 1.0))
+    child = hist.labels('say "hi"')
+    for value in (0.05, 0.5, 5):
+        child.observe(value)
+
+    lines = hist.render().splitlines()
+    assert lines[:2] == ["# HELP t_hist_seconds Test.",
+                         "# TYPE t_hist_seconds histogram"]
+    assert lines[2:] == [
+        't_hist_seconds_bucket{op="say \\"hi\\"",le="0.1"} 1',
+        't_hist_seconds_bucket{op="say \\"hi\\"",le="1.0"} 2',
+        't_hist_seconds_bucket{op="say \\"hi\\"",le="+Inf"} 3',
+        't_hist_seconds_sum{op="say \\"hi\\""} 5.55',
+        't_hist_seconds_count{op="say \\"hi\\""} 3',
+    ]
+
+
+def test_counter_and_gauge():
+    """Counters accumulate per label set; gauges are read on render."""
+    counter = metrics.Counter("t_calls_total", "Test.", ["status"])
+    counter.labels("ok").inc()
+    counter.labels("ok").inc(2)
+    metrics.Gauge("t_depth", "Test.", lambda: 7)
+
+    assert _sample("t_calls_total", status="ok") == 3
+    assert _sample("t_depth") == 7
+    with pytest.raises(ValueError):
+        counter.labels("ok", "extra")
+
+
+def test_metric_base_is_abstract():
+    """A metric must say how it renders its samples."""
+    with pytest.raises(TypeError):
+        metrics._Metric("t_abstract", "Test.")
+
+
+def test_outbound_queue_depth_is_exported(monkeypatch):
+    """Lane depths of the shared dispatcher are scraped as a gauge."""
+    from innoscream.bot import outbound
+    dispatcher = outbound.OutboundDispatcher()
+    monkeypatch.setattr(outbound, "_outbound", dispatcher)
+    dispatcher._lanes[outbound.Priority.EDIT].append(MagicMock())
+
+    assert _sample("innoscream_outbound_queue_depth", lane="edit") == 1
+    assert _sample("innoscream_outbound_queue_depth", lane="reply") == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_records_failures():
+    """``timed`` observes the duration even when the call raises."""
+    hist = metrics.Histogram("t_timed_seconds", "Test.", ["function"])
+
+    @metrics.timed(hist)
+    async def boom():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        await boom()
+    assert boom.__name__ == "boom"
+    assert _sample("t_timed_seconds_count", function="boom") == 1
+
+
+@pytest.mark.asyncio
+async def test_handler_timer_labels_by_callback():
+    """Handler latency is labelled with the handler function name."""
+    async def handle_probe():
+        pass
+
+    async def call_next(event, data):
+        return "done"
+
+    before = _sample("innoscream_handler_duration_seconds_count",
+                     handler="handle_probe")
+    result = await HandlerTimer()(call_next, MagicMock(), {
+        "handler": MagicMock(callback=handle_probe),
+    })
+    assert result == "done"
+    assert _sample("innoscream_handler_duration_seconds_count",
+                   handler="handle_probe") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_api_call_meter_counts_errors():
+    """Bot API failures are counted under their exception class."""
+    class TelegramRetryAfter(Exception):
+        pass
+
+    async def make_request(bot, method):
+        raise TelegramRetryAfter
+
+    before = _sample("innoscream_upstream_requests_total",
+                     upstream="telegram", status="TelegramRetryAfter")
+    with pytest.raises(TelegramRetryAfter):
+        await ApiCallMeter()(make_request, MagicMock(), MagicMock())
+    assert _sample("innoscream_upstream_requests_total", upstream="telegram",
+                   status="TelegramRetryAfter") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_metered_transport_counts_status():
+    """Upstream HTTP calls are counted by status code."""
+    inner = httpx.MockTransport(lambda request: httpx.Response(502))
+    before = _sample("innoscream_upstream_requests_total",
+                     upstream="quickchart", status="502")
+    async with httpx.AsyncClient(
+        transport=MeteredTransport("quickchart", inner)
+    ) as client:
+        await client.post("http://qc.test/chart/create")
+    assert _sample("innoscream_upstream_requests_total",
+                   upstream="quickchart", status="502") == before + 1
+
+
+@pytest.mark.asyncio
+async def test_repo_and_writer_are_instrumented(repo_db):
+    """Repo calls and group-commit transactions show up in /metrics."""
+    from innoscream.db import scream_repo
+
+    calls = _sample("innoscream_repo_duration_seconds_count",
+                    function="create_post")
+    commits = _sample("innoscream_db_transactions_total", outcome="commit")
+    await scream_repo.create_post(1, "hi", 10, -100)
+    assert _sample("innoscream_repo_duration_seconds_count",
+                   function="create_post") == calls + 1
+    assert _sample("innoscream_db_transactions_total",
+                   outcome="commit") == commits + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(monkeypatch):
+    """The app serves the registry as Prometheus text."""
+    from innoscream.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport,
+                                 base_url="http://test") as client:
+        resp = await client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE innoscream_job_duration_seconds histogram" in resp.text
@@ -0,0 +1,79 @@
+# tests/unit/test_migrations.py
+import aiosqlite
+import pytest
+from innoscream.db.migrations import MIGRATIONS, migrate
+
+
+@pytest.mark.asyncio
+async def test_migrate_fresh_db(tmp_path):
+    """All migrations are applied in order and recorded."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        version = await migrate(db)
+        rows = await db.execute_fetchall(
+            "SELECT version FROM schema_version ORDER BY version"
+        )
+    assert version == MIGRATIONS[-1][0]
+    assert [r[0] for r in rows] == [m[0] for m in MIGRATIONS]
+
+
+@pytest.mark.asyncio
+async def test_migrate_is_idempotent(tmp_path):
+    """Re-running migrate on an up-to-date DB changes nothing."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        first = await migrate(db)
+        second = await migrate(db)
+        rows = await db.execute_fetchall("SELECT COUNT(*) FROM schema_version")
+    assert first == second
+    assert rows[0][0] == len(MIGRATIONS)
+
+
+@pytest.mark.asyncio
+async def test_migrate_legacy_db(tmp_path):
+    """A pre-migration database with data is upgraded in place."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await db.executescript(MIGRATIONS[0][2])
+        await db.execute(
+            "INSERT INTO posts (user_hash, text, message_id, chat_id) "
+            "VALUES ('h', 'old', 1, 1)"
+        )
+        await db.commit()
+        await migrate(db)
+        rows = await db.execute_fetchall("SELECT text FROM posts")
+    assert rows == [("old",)]
+
+
+@pytest.mark.asyncio
+async def test_day_filter_uses_index(tmp_path):
+    """The created_at range predicate is served by an index, not a scan."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await migrate(db)
+        plan = await db.execute_fetchall(
+            "EXPLAIN QUERY PLAN SELECT COUNT(*) FROM posts "
+            "WHERE is_deleted = 0 AND created_at >= ? AND created_at < ?",
+            ("2024-01-01", "2024-01-08"),
+        )
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_posts_created_at" in details
+
+
+@pytest.mark.asyncio
+async def test_migrate_up_to_target(tmp_path):
+    """A target version leaves later migrations pending."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        assert await migrate(db, target=1) == 1
+        assert await migrate(db) == MIGRATIONS[-1][0]
+
+
+@pytest.mark.asyncio
+async def test_restored_post_returns_to_daily_top(tmp_path):
+    """Undoing a soft delete puts the post back on the leaderboard."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await migrate(db)
+        await db.execute(
+            "INSERT INTO posts (user_hash, text, message_id, chat_id, fire) "
+            "VALUES ('h', 'back', 1, 1, 2)"
+        )
+        await db.execute("UPDATE posts SET is_deleted = 1")
+        await db.execute("UPDATE posts SET is_deleted = 0")
+        rows = await db.execute_fetchall("SELECT votes FROM daily_top")
+    assert rows == [(2,)]
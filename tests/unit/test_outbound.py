@@ -0,0 +1,178 @@
+# tests/unit/test_outbound.py
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from aiogram.exceptions import TelegramRetryAfter
+from innoscream.bot.outbound import OutboundDispatcher, Priority, TokenBucket
+
+
+def _retry_after(seconds=0):
+    return TelegramRetryAfter(method=None, message="429", retry_after=seconds)
+
+
+def test_token_bucket_refills_over_time():
+    """An empty bucket reports the time until the next token."""
+    bucket = TokenBucket(rate=2.0, capacity=1.0)
+    now = time.monotonic()
+    assert bucket.delay(now) == 0
+    bucket.take()
+    assert bucket.delay(now) == pytest.approx(0.5, abs=0.01)
+    assert bucket.delay(now + 0.5) == 0
+
+
+@pytest.mark.asyncio
+async def test_direct_mode_calls_through():
+    """A stopped dispatcher sends immediately."""
+    method = AsyncMock(return_value="ok")
+    dispatcher = OutboundDispatcher()
+    assert await dispatcher.send(Priority.REPLY, 1, method, "hi",
+                                 chat_id=5) == "ok"
+    method.assert_awaited_once_with("hi", chat_id=5)
+    assert dispatcher.sent == 1
+
+
+@pytest.mark.asyncio
+async def test_replies_overtake_queued_edits():
+    """Higher-priority lanes drain first when the global bucket is dry."""
+    order = []
+
+    async def record(tag):
+        order.append(tag)
+
+    dispatcher = OutboundDispatcher(global_rate=20, chat_rate=100)
+    dispatcher.global_bucket.tokens = 0
+    dispatcher.start()
+    try:
+        await asyncio.gather(
+            dispatcher.send(Priority.EDIT, 1, record, "edit"),
+            dispatcher.send(Priority.CHANNEL, 2, record, "channel"),
+            dispatcher.send(Priority.REPLY, 3, record, "reply"),
+        )
+    finally:
+        await dispatcher.stop()
+    assert order == ["reply", "channel", "edit"]
+
+
+@pytest.mark.asyncio
+async def test_per_chat_rate_is_enforced():
+    """A busy chat does not block other chats."""
+    sent = []
+
+    async def record(tag):
+        sent.append(tag)
+
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=0.5)
+    dispatcher.start()
+    try:
+        await dispatcher.send(Priority.REPLY, 1, record, "a1")
+        throttled = asyncio.ensure_future(
+            dispatcher.send(Priority.REPLY, 1, record, "a2")
+        )
+        await dispatcher.send(Priority.REPLY, 2, record, "b1")
+        await asyncio.sleep(0.05)
+        assert sent == ["a1", "b1"]
+        assert not throttled.done()
+        assert dispatcher.depth["reply"] == 1
+    finally:
+        await dispatcher.stop(timeout=0)
+    with pytest.raises(RuntimeError):
+        await throttled
+
+
+@pytest.mark.asyncio
+async def test_edits_do_not_spend_the_channel_budget():
+    """Keyboard edits and channel posts are limited separately."""
+    sent = []
+
+    async def record(tag):
+        sent.append(tag)
+
+    dispatcher = OutboundDispatcher(global_rate=100, group_rate=0.01,
+                                    edit_rate=0.01)
+    dispatcher.start()
+    try:
+        await dispatcher.send(Priority.EDIT, -100, record, "edit")
+        await asyncio.wait_for(
+            dispatcher.send(Priority.CHANNEL, -100, record, "post"), 1
+        )
+    finally:
+        await dispatcher.stop(timeout=0)
+    assert sent == ["edit", "post"]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_requeues_the_call():
+    """A 429 pauses the chat and the call is retried."""
+    method = AsyncMock(side_effect=[_retry_after(0), "ok"])
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100)
+    dispatcher.start()
+    try:
+        assert await dispatcher.send(Priority.CHANNEL, -100, method) == "ok"
+    finally:
+        await dispatcher.stop()
+    assert method.await_count == 2
+    assert dispatcher.retried == 1
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts():
+    """Persistent 429s surface to the caller."""
+    method = AsyncMock(side_effect=_retry_after(0))
+    dispatcher = OutboundDispatcher(global_rate=100, chat_rate=100,
+                                    max_attempts=2)
+    dispatcher.start()
+    try:
+        with pytest.raises(TelegramRetryAfter):
+            await dispatcher.send(Priority.EDIT, 1, method)
+    finally:
+        await dispatcher.stop()
+    assert dispatcher.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_calls_that_were_in_flight():
+    """A call requeued by a 429 during shutdown does not hang its caller."""
+    started = asyncio.Event()
+
+    async def slow_then_limited():
+        started.set()
+        await asyncio.sleep(0.05)
+        raise _retry_after(0)
+
+    async def hangs():
+        await asyncio.sleep(60)
+
+    dispatcher = OutboundDispatcher(global_rate=100)
+    dispatcher.start()
+    limited = asyncio.ensure_future(
+        dispatcher.send(Priority.REPLY, 1, slow_then_limited)
+    )
+    stuck = asyncio.ensure_future(dispatcher.send(Priority.REPLY, 2, hangs))
+    await started.wait()
+    await dispatcher.stop(timeout=0.1)
+
+    for call in (limited, stuck):
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(call, 1)
+
+
+def test_full_buckets_are_forgotten():
+    """Idle per-chat buckets are pruned; busy ones are kept."""
+    dispatcher = OutboundDispatcher(chat_rate=1.0)
+    for chat_id in range(1, 1025):
+        dispatcher._bucket(chat_id)
+    dispatcher._bucket(7).take()
+    dispatcher._prune(time.monotonic())
+    assert list(dispatcher._chats) == [7]
+
+
+def test_groups_get_a_burst():
+    """A channel may take a few posts back to back."""
+    dispatcher = OutboundDispatcher(group_rate=20 / 60, group_burst=3)
+    bucket = dispatcher._bucket(-100)
+    now = time.monotonic()
+    for _ in range(3):
+        assert bucket.delay(now) == 0
+        bucket.take()
+    assert bucket.delay(now) > 0
@@ -0,0 +1,89 @@
+# tests/unit/test_pool.py
+import asyncio
+
+import pytest
+from innoscream.db.pool import ConnectionPool
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_connections(tmp_path):
+    """Connections are opened once and handed out again after checkin."""
+    pool = ConnectionPool(tmp_path / "t.db", size=2)
+    await pool.open()
+    assert pool.opened == 2 and pool.idle == 2
+
+    async with pool.connection() as first:
+        assert pool.idle == 1
+    async with pool.connection() as second:
+        assert second is first
+
+    await pool.close()
+    assert pool.opened == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_configures_wal(tmp_path):
+    """Pooled connections are set up with WAL journal mode."""
+    pool = ConnectionPool(tmp_path / "t.db", size=1)
+    async with pool.connection() as db:
+        rows = await db.execute_fetchall("PRAGMA journal_mode")
+    assert rows[0][0] == "wal"
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_rolls_back_on_release(tmp_path):
+    """An unfinished transaction does not leak to the next borrower."""
+    pool = ConnectionPool(tmp_path / "t.db", size=1)
+    async with pool.connection() as db:
+        await db.execute("CREATE TABLE t (x INTEGER)")
+        await db.commit()
+        await db.execute("INSERT INTO t VALUES (1)")
+    async with pool.connection() as db:
+        assert not db.in_transaction
+        rows = await db.execute_fetchall("SELECT COUNT(*) FROM t")
+    assert rows[0][0] == 0
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_replaces_broken_connection(tmp_path):
+    """A connection that fails its health check is swapped for a new one."""
+    pool = ConnectionPool(tmp_path / "t.db", size=1, health_check_after=0)
+    async with pool.connection() as db:
+        broken = db
+    await broken.close()
+    async with pool.connection() as db:
+        assert db is not broken
+        await db.execute("SELECT 1")
+    await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_closed_pool_refuses_checkout(tmp_path):
+    """Checkout after shutdown raises instead of reopening connections."""
+    pool = ConnectionPool(tmp_path / "t.db", size=1)
+    await pool.close()
+    with pytest.raises(RuntimeError):
+        await pool.acquire()
+
+
+@pytest.mark.asyncio
+async def test_close_wakes_waiting_checkouts(tmp_path):
+    """Callers blocked on an exhausted pool fail once it is closed."""
+    pool = ConnectionPool(tmp_path / "t.db", size=1)
+    held = await pool.acquire()
+    waiters = [asyncio.create_task(pool.acquire()) for _ in range(2)]
+    await asyncio.sleep(0)
+
+    await pool.close()
+    for waiter in waiters:
+        with pytest.raises(RuntimeError):
+            await asyncio.wait_for(waiter, 1)
+    await pool.release(held)
+    assert pool.opened == 0 and pool.idle == 0
+
+    await pool.open()
+    async with pool.connection() as db:
+        await db.execute("SELECT 1")
+    await pool.close()
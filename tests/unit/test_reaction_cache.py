@@ -0,0 +1,73 @@
+# tests/unit/test_reaction_cache.py
+import pytest
+from innoscream.db import scream_repo
+from innoscream.db.reaction_cache import ReactionCache
+
+
+def test_new_post_is_complete():
+    """Users missing from a freshly tracked post have not reacted."""
+    cache = ReactionCache()
+    cache.track_new_post(1)
+    assert cache.get_reaction(1, "u") == (True, None)
+    assert cache.get_counts(1) == (0, 0, 0)
+    assert cache.stats["hits"] == 2
+
+
+def test_unknown_post_misses():
+    """Posts loaded from before the cache existed go to the DB."""
+    cache = ReactionCache()
+    cache.set_counts(7, (1, 2, 3))
+    assert cache.get_reaction(7, "u") == (False, None)
+    assert cache.get_reaction(8, "u") == (False, None)
+    assert cache.stats["misses"] == 2
+
+
+def test_evicts_least_recently_touched_post():
+    """The oldest post goes first, together with its reactions."""
+    cache = ReactionCache(max_posts=2)
+    cache.track_new_post(1)
+    cache.track_new_post(2)
+    cache.set_reaction(1, "u", "💀")   # touch 1 → 2 is now the oldest
+    cache.track_new_post(3)
+    assert len(cache) == 2
+    assert cache.get_counts(2) is None
+    assert cache.get_reaction(1, "u") == (True, "💀")
+
+
+def test_reaction_bound_evicts_posts():
+    """The total number of cached reactions is bounded too."""
+    cache = ReactionCache(max_reactions=2)
+    cache.set_reaction(1, "a", "💀")
+    cache.set_reaction(1, "b", "💀")
+    cache.set_reaction(2, "c", "🔥")
+    assert cache.stats["reactions"] == 1
+    assert cache.get_reaction(1, "a") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_switch_reaction_keeps_cache_consistent(repo_db):
+    """Cached counts follow add / switch / toggle-off exactly."""
+    post_id = await scream_repo.create_post(1, "hi", 10, 20)
+
+    assert await scream_repo.switch_reaction(post_id, 2, "💀") == (1, 0, 0)
+    assert await scream_repo.switch_reaction(post_id, 3, "💀") == (2, 0, 0)
+    assert await scream_repo.switch_reaction(post_id, 2, "🔥") == (1, 1, 0)
+    assert await scream_repo.switch_reaction(post_id, 3, "💀") == (0, 1, 0)
+
+    async with repo_db.connection() as db:
+        rows = await db.execute_fetchall(
+            "SELECT skull, fire, clown FROM posts WHERE post_id=?", (post_id,)
+        )
+    assert rows == [(0, 1, 0)]
+    assert scream_repo.get_reaction_cache().stats["misses"] == 0
+
+
+@pytest.mark.asyncio
+async def test_switch_reaction_cold_cache(repo_db):
+    """With an empty cache the state is read from the DB once."""
+    post_id = await scream_repo.create_post(1, "hi", 10, 20)
+    await scream_repo.switch_reaction(post_id, 2, "🤡")
+    scream_repo.get_reaction_cache().clear()
+
+    assert await scream_repo.switch_reaction(post_id, 2, "🤡") == (0, 0, 0)
+    assert await scream_repo.switch_reaction(post_id, 2, "🤡") == (0, 0, 1)
@@ -0,0 +1,194 @@
+# tests/unit/test_routes.py
+import pytest
+import httpx
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI
+from innoscream.api import http_cache
+from innoscream.api.routes import router
+from innoscream.db import scream_repo
+
+
+@pytest.fixture(autouse=True)
+def response_cache(monkeypatch):
+    """Give each test its own response cache and day hooks."""
+    monkeypatch.setattr(scream_repo, "_day_hooks", [])
+    monkeypatch.setattr(http_cache, "_cache", None)
+    yield
+    http_cache._cache = None
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(router)
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                             base_url="http://test")
+
+
+async def _post_on(db, day, message_id, votes=0):
+    cur = await db.execute(
+        "INSERT INTO posts (user_hash, text, message_id, chat_id, "
+        "created_at, fire) VALUES ('h', ?, ?, 1, ?, ?)",
+        (f"post {message_id}", message_id, f"{day} 12:00:00", votes),
+    )
+    await db.commit()
+    return cur.lastrowid
+
+
+@pytest.mark.asyncio
+async def test_top_range_returns_each_day(repo_db):
+    """One request returns the top posts of every day in the range."""
+    async with repo_db.connection() as db:
+        await _post_on(db, "2024-03-01", 1, votes=1)
+        await _post_on(db, "2024-03-01", 2, votes=5)
+        await _post_on(db, "2024-03-01", 3, votes=3)
+        await _post_on(db, "2024-03-03", 4, votes=2)
+        await _post_on(db, "2024-04-01", 5, votes=9)
+
+    async with _client() as client:
+        resp = await client.get(
+            "/api/v1/top", params={"from": "2024-03-01", "to": "2024-03-31",
+                                   "limit": 2},
+        )
+    assert resp.status_code == 200
+    body = resp.json()
+    assert list(body) == ["2024-03-01", "2024-03-03"]
+    assert [p["id"] for p in body["2024-03-01"]] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_top_range_rejects_bad_ranges(repo_db):
+    """Reversed or oversized ranges are refused."""
+    async with _client() as client:
+        reversed_ = await client.get(
+            "/api/v1/top", params={"from": "2024-03-02", "to": "2024-03-01"}
+        )
+        huge = await client.get(
+            "/api/v1/top", params={"from": "2024-01-01", "to": "2024-12-31"}
+        )
+    assert reversed_.status_code == 422
+    assert huge.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_posts_keyset_pagination(repo_db):
+    """Following ``next`` walks every live post exactly once."""
+    for i in range(5):
+        await scream_repo.create_post(1, f"p{i}", 100 + i, 1)
+    await scream_repo.create_post(1, "gone", 200, 1)
+    ctx = MagicMock()
+    ctx.bot.delete_message = AsyncMock()
+    await scream_repo.soft_delete(200, ctx)
+
+    seen, cursor = [], None
+    async with _client() as client:
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["before"] = cursor
+            body = (await client.get("/api/v1/posts", params=params)).json()
+            seen += [p["text"] for p in body["items"]]
+            cursor = body["next"]
+            if cursor is None:
+                break
+    assert seen == ["p4", "p3", "p2", "p1", "p0"]
+
+
+@pytest.mark.asyncio
+async def test_past_day_is_cached_and_revalidated(repo_db):
+    """Finished days get validators, 304s and a cache entry."""
+    async with repo_db.connection() as db:
+        await _post_on(db, "2024-03-01", 7, votes=2)
+
+    async with _client() as client:
+        first = await client.get("/api/v1/top/2024-03-01")
+        assert first.status_code == 200
+        assert first.json()["id"] == 7
+        assert first.headers["cache-control"] == "public, no-cache"
+        assert "last-modified" in first.headers
+
+        again = await client.get(
+            "/api/v1/top/2024-03-01",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert again.status_code == 304
+        assert again.headers["etag"] == first.headers["etag"]
+
+        since = await client.get(
+            "/api/v1/top/2024-03-01",
+            headers={"If-Modified-Since": first.headers["last-modified"]},
+        )
+        assert since.status_code == 304
+    assert http_cache.get_response_cache().stats["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_invalidates_cached_day(repo_db):
+    """An admin delete drops responses covering that day."""
+    async with repo_db.connection() as db:
+        await _post_on(db, "2024-03-01", 7, votes=2)
+        await _post_on(db, "2024-03-01", 8, votes=1)
+
+    ctx = MagicMock()
+    ctx.bot.delete_message = AsyncMock()
+    range_params = {"from": "2024-02-20", "to": "2024-03-05"}
+    async with _client() as client:
+        first = await client.get("/api/v1/top/2024-03-01")
+        await client.get("/api/v1/top", params=range_params)
+        assert http_cache.get_response_cache().stats["entries"] == 2
+
+        await scream_repo.soft_delete(7, ctx)
+        assert http_cache.get_response_cache().stats["entries"] == 0
+
+        fresh = await client.get(
+            "/api/v1/top/2024-03-01",
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+    assert fresh.status_code == 200
+    assert fresh.json()["id"] == 8
+
+
+def test_response_cache_is_bounded_by_size():
+    """Old entries are evicted once the byte budget is exceeded."""
+    cache = http_cache.ResponseCache(max_bytes=10)
+    for key in "abc":
+        entry = http_cache.CachedResponse(b"x" * 4, ("2024-01-01",) * 2)
+        cache.put(key, entry, cache.generation(entry.span))
+    assert cache.stats["bytes"] == 8
+    assert cache.get("a") is None
+    assert cache.get("c") is not None
+
+
+def test_invalidation_only_touches_the_changed_day():
+    """Other days stay cached and keep their in-flight builds cacheable."""
+    cache = http_cache.ResponseCache()
+    march = ("2024-03-01", "2024-03-31")
+    first = http_cache.CachedResponse(b"1", ("2024-03-01",) * 2)
+    cache.put("first", first, cache.generation(first.span))
+    cache.put("march", http_cache.CachedResponse(b"m", march),
+              cache.generation(march))
+    started = cache.generation(("2024-04-01",) * 2)
+
+    cache.invalidate_day("2024-03-02")
+    assert cache.get("march") is None
+    assert cache.get("first") is first
+
+    april = http_cache.CachedResponse(b"4", ("2024-04-01",) * 2)
+    cache.put("april", april, started)
+    assert cache.get("april") is april
+
+    today = datetime.now(timezone.utc).date().isoformat()
+    generation = cache.generation((today, today))
+    cache.invalidate_day(today)
+    assert cache.generation((today, today)) == generation
+
+
+@pytest.mark.asyncio
+async def test_today_is_not_cached(repo_db):
+    """The running day is rebuilt on every request."""
+    await scream_repo.create_post(1, "now", 9, 1)
+    today = datetime.now(timezone.utc).date().isoformat()
+    async with _client() as client:
+        resp = await client.get(f"/api/v1/top/{today}")
+    assert resp.headers["cache-control"] == "no-cache"
+    assert http_cache.get_response_cache().stats["entries"] == 0
@@ -19,7 +19,7 @@ async def test_post_daily_top_photo(monkeypatch):
     async def fake_get_top(d):
         return {"text": "hello", "votes": 10} if d == yesterday else None
 
-    async def fake_generate(_):
+    async def fake_generate(_, stable=False):
         return "http://img"
 
     monkeypatch.setattr(sched_mod.scream, "get_top_daily", fake_get_top)
@@ -49,7 +49,7 @@ async def test_post_daily_top_text(monkeypatch):
     async def fake_get_top(_):
         return {"text": "hello", "votes": 10}
 
-    async def fake_generate(_):
+    async def fake_generate(_, stable=False):
         return None
 
     monkeypatch.setattr(sched_mod.scream, "get_top_daily", fake_get_top)
@@ -71,7 +71,7 @@ async def test_post_daily_top_text(monkeypatch):
 
 
 def test_start_scheduler_registers_job(monkeypatch):
-    """start_scheduler should register exactly one job."""
+    """start_scheduler should register the daily, prefetch and weekly jobs."""
     test_sched = sched_mod.AsyncIOScheduler()
     monkeypatch.setattr(sched_mod, "scheduler", test_sched)
     monkeypatch.setattr(test_sched, "start", lambda: None)
@@ -79,6 +79,27 @@ def test_start_scheduler_registers_job(monkeypatch):
     sched_mod.start_scheduler()
 
     jobs = test_sched.get_jobs()
-    assert len(jobs) == 2
+    assert len(jobs) == 3
     assert jobs[0].func == sched_mod.post_daily_top
+    assert jobs[1].func == sched_mod.prefetch_daily_top
 
+
+
+@pytest.mark.asyncio
+async def test_prefetch_daily_top_renders_leader(monkeypatch):
+    """The evening prefetch renders a meme for today's leader."""
+    async def fake_get_top(d):
+        return {"text": "leader", "votes": 3} if d == date.today() else None
+
+    rendered = []
+
+    async def fake_generate(text, stable=False):
+        rendered.append(text)
+        return "http://img"
+
+    monkeypatch.setattr(sched_mod.scream, "get_top_daily", fake_get_top)
+    monkeypatch.setattr(sched_mod.meme, "generate_meme", fake_generate)
+
+    await sched_mod.prefetch_daily_top()
+
+    assert rendered == ["leader"]
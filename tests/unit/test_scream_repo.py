@@ -1,7 +1,8 @@
 # tests/unit/test_scream_repo.py
 import pytest
+from contextlib import asynccontextmanager
 from unittest.mock import AsyncMock, MagicMock, patch
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
 from innoscream.db import scream_repo
 
 @pytest.mark.asyncio
@@ -20,6 +21,20 @@ async def test_soft_delete_success():
         await scream_repo.soft_delete(123, mock_ctx)
         mock_ctx.bot.delete_message.assert_called_once()
 
+
+@pytest.mark.asyncio
+async def test_soft_delete_goes_through_the_dispatcher(repo_db, monkeypatch):
+    """The channel delete is metered like any other channel call."""
+    from innoscream.bot import outbound
+
+    dispatcher = outbound.OutboundDispatcher()
+    monkeypatch.setattr(outbound, "_outbound", dispatcher)
+    ctx = MagicMock()
+    ctx.bot.delete_message = AsyncMock()
+    await scream_repo.soft_delete(5, ctx)
+    ctx.bot.delete_message.assert_awaited_once()
+    assert dispatcher.sent == 1
+
 # tests/unit/test_scream_repo.py
 @pytest.mark.asyncio
 async def test_create_post():
@@ -92,3 +107,196 @@ async def test_top_daily_no_posts():
     with patch('innoscream.db.dao.get_db', return_value=mock_context):
         result = await scream_repo.top_daily(date.today())
         assert result is None
+
+
+async def _post_on(pool, day, message_id):
+    """Insert a post dated ``day`` directly, bypassing the repo."""
+    async with pool.connection() as db:
+        cur = await db.execute(
+            "INSERT INTO posts (user_hash, text, message_id, chat_id, created_at) "
+            "VALUES ('h', ?, ?, 1, ?)",
+            (f"post {message_id}", message_id, f"{day.isoformat()} 12:00:00"),
+        )
+        await db.commit()
+        return cur.lastrowid
+
+
+@pytest.mark.asyncio
+async def test_top_daily_n_ranks_posts(repo_db):
+    """Leaderboard is ordered by votes and follows reactions and deletes."""
+    today = datetime.now(timezone.utc).date()
+    a = await scream_repo.create_post(1, "a", 10, 1)
+    b = await scream_repo.create_post(1, "b", 11, 1)
+    await scream_repo.create_post(1, "c", 12, 1)
+    await scream_repo.switch_reaction(b, 2, "🔥")
+    await scream_repo.switch_reaction(b, 3, "🔥")
+    await scream_repo.switch_reaction(a, 2, "💀")
+
+    top = await scream_repo.top_daily_n(today, 2)
+    assert [(t["id"], t["votes"]) for t in top] == [(11, 2), (10, 1)]
+
+    ctx = MagicMock()
+    ctx.bot.delete_message = AsyncMock()
+    await scream_repo.soft_delete(11, ctx)
+    assert (await scream_repo.top_daily(today))["id"] == 10
+
+
+@pytest.mark.asyncio
+async def test_top_daily_caches_past_days(repo_db):
+    """A finished day is served from memory until one of its posts changes."""
+    day = date(2024, 3, 1)
+    post_id = await _post_on(repo_db, day, 42)
+
+    first = await scream_repo.top_daily(day)
+    hits = scream_repo._top_cache.hits
+    assert await scream_repo.top_daily(day) == first
+    assert scream_repo._top_cache.hits == hits + 1
+
+    await scream_repo.switch_reaction(post_id, 7, "🤡")
+    assert (await scream_repo.top_daily(day))["votes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_top_cache_invalidates_only_the_changed_day(repo_db):
+    """Every cached limit of a day goes at once; other days stay cached."""
+    day, other = date(2024, 3, 1), date(2024, 3, 2)
+    post_id = await _post_on(repo_db, day, 42)
+    await _post_on(repo_db, other, 43)
+    for d in (day, other):
+        await scream_repo.top_daily_n(d, 1)
+        await scream_repo.top_daily_n(d, 5)
+    assert set(scream_repo._top_cache.get("2024-03-01")) == {1, 5}
+
+    await scream_repo.switch_reaction(post_id, 7, "🔥")
+    assert "2024-03-01" not in scream_repo._top_cache
+    assert "2024-03-02" in scream_repo._top_cache
+    assert (await scream_repo.top_daily_n(day, 5))[0]["votes"] == 1
+
+
+@pytest.mark.asyncio
+async def test_top_reads_are_not_tracked_after_they_finish(repo_db,
+                                                            monkeypatch):
+    """Lookups leave nothing behind; a write mid-read blocks caching."""
+    for offset in range(50):
+        await scream_repo.top_daily_n(date(2020, 1, 1) + timedelta(offset))
+    assert len(scream_repo._top_reads) == 0
+
+    get_db = scream_repo.dao.get_db
+
+    @asynccontextmanager
+    async def racing_get_db():
+        scream_repo._invalidate_top("2024-03-01")
+        async with get_db() as db:
+            yield db
+
+    scream_repo._top_cache.clear()
+    monkeypatch.setattr(scream_repo.dao, "get_db", racing_get_db)
+    await scream_repo.top_daily_n(date(2024, 3, 1))
+    assert "2024-03-01" not in scream_repo._top_cache
+    assert len(scream_repo._top_reads) == 0
+
+
+@pytest.mark.asyncio
+async def test_top_daily_is_timed_once(repo_db):
+    """A top_daily lookup is observed once, as top_daily_n."""
+    from innoscream.core import metrics
+
+    def observed(name):
+        return sum(metrics.REPO_SECONDS.labels(name).counts)
+
+    before = observed("top_daily_n"), observed("top_daily")
+    await scream_repo.top_daily(date(2024, 3, 1))
+    assert observed("top_daily_n") == before[0] + 1
+    assert observed("top_daily") == before[1]
+
+
+@pytest.mark.asyncio
+async def test_reserved_post_ids_are_not_reused(repo_db, monkeypatch):
+    """Reserved ids are unique and never handed out by plain inserts."""
+    from innoscream.db.sequence import PostIdAllocator
+    monkeypatch.setattr(scream_repo, "_post_ids", PostIdAllocator(block_size=3))
+
+    reserved = [await scream_repo.reserve_post_id() for _ in range(4)]
+    plain = await scream_repo.create_post(1, "plain", 1, 1)
+    used = await scream_repo.create_post(1, "reserved", 2, 1,
+                                         post_id=reserved[0])
+
+    assert len(set(reserved)) == 4
+    assert used == reserved[0]
+    assert plain not in reserved
+
+
+@pytest.mark.asyncio
+async def test_reaction_before_post_is_saved(repo_db):
+    """Clicking a reserved post that is not written yet changes nothing."""
+    post_id = await scream_repo.reserve_post_id()
+    with pytest.raises(LookupError):
+        await scream_repo.switch_reaction(post_id, 5, "🔥")
+
+    await scream_repo.create_post(1, "late", 3, 1, post_id=post_id)
+    assert await scream_repo.switch_reaction(post_id, 5, "🔥") == (0, 1, 0)
+
+
+@pytest.mark.asyncio
+async def test_user_stats_snapshot_follows_changes(repo_db):
+    """The cached snapshot is dropped on posts, reactions and deletes."""
+    assert await scream_repo.user_stats_snapshot(1) == (0, 0)
+
+    post_id = await scream_repo.create_post(1, "mine", 20, 1)
+    await scream_repo.create_post(1, "also mine", 21, 1)
+    assert await scream_repo.user_stats_snapshot(1) == (2, 0)
+
+    await scream_repo.switch_reaction(post_id, 2, "🔥")
+    await scream_repo.switch_reaction(post_id, 3, "💀")
+    snapshot = await scream_repo.user_stats_snapshot(1)
+    assert snapshot.post_count == 2
+    assert snapshot.reactions_received == 2
+
+    hits = scream_repo._stats_cache.hits
+    assert await scream_repo.user_stats_snapshot(1) == snapshot
+    assert scream_repo._stats_cache.hits == hits + 1
+
+    ctx = MagicMock()
+    ctx.bot.delete_message = AsyncMock()
+    await scream_repo.soft_delete(20, ctx)
+    assert await scream_repo.user_stats_snapshot(1) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_stats_cache_ignores_other_users_writes(repo_db, monkeypatch):
+    """A write by one user does not keep another user's read uncached."""
+    get_db = scream_repo.dao.get_db
+
+    @asynccontextmanager
+    async def racing_get_db():
+        scream_repo._invalidate_stats(scream_repo.hash_user_id(2))
+        scream_repo._invalidate_stats(scream_repo.hash_user_id(1))
+        async with get_db() as db:
+            yield db
+
+    monkeypatch.setattr(scream_repo.dao, "get_db", racing_get_db)
+    await scream_repo.user_stats_snapshot(1)
+    assert scream_repo.hash_user_id(1) not in scream_repo._stats_cache
+
+    monkeypatch.setattr(scream_repo.dao, "get_db", get_db)
+    await scream_repo.user_stats_snapshot(1)
+    assert scream_repo.hash_user_id(1) in scream_repo._stats_cache
+
+    @asynccontextmanager
+    async def other_user_writes():
+        scream_repo._invalidate_stats(scream_repo.hash_user_id(2))
+        async with get_db() as db:
+            yield db
+
+    scream_repo._stats_cache.clear()
+    monkeypatch.setattr(scream_repo.dao, "get_db", other_user_writes)
+    await scream_repo.user_stats_snapshot(1)
+    assert scream_repo.hash_user_id(1) in scream_repo._stats_cache
+
+
+@pytest.mark.asyncio
+async def test_stats_reads_are_not_tracked_after_they_finish(repo_db):
+    """Looking up many users leaves no per-user bookkeeping behind."""
+    for user_id in range(200):
+        await scream_repo.user_stats_snapshot(user_id)
+    assert len(scream_repo._stats_reads) == 0
@@ -0,0 +1,32 @@
+# tests/unit/test_security.py
+import hashlib
+import pytest
+from innoscream.core.config import get_settings
+from innoscream.services import security
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    security.hash_user_id.cache_clear()
+    security._salted_hasher.cache_clear()
+    yield
+    security.hash_user_id.cache_clear()
+    security._salted_hasher.cache_clear()
+
+
+@pytest.mark.parametrize("user_id", [0, 7, 123456789, 2**40])
+def test_hash_matches_stored_format(user_id):
+    """Hashes stay identical to the ones already stored in the DB."""
+    salt = get_settings().hash_salt
+    expected = hashlib.sha256(f"{salt}{user_id}".encode()).hexdigest()
+    assert security.hash_user_id(user_id) == expected
+
+
+def test_hash_is_memoized():
+    """Repeated lookups for the same user are served from the cache."""
+    first = security.hash_user_id(42)
+    second = security.hash_user_id(42)
+    security.hash_user_id(43)
+
+    assert first == second
+    assert security.hash_cache_stats() == {"hits": 1, "misses": 2, "size": 2}
@@ -0,0 +1,59 @@
+# tests/unit/test_tracing.py
+import logging
+
+import aiosqlite
+import pytest
+from innoscream.db import scream_repo, tracing
+from innoscream.db.migrations import migrate
+from innoscream.db.pool import ConnectionPool
+from innoscream.services import analytics  # noqa: F401  (registers SQL)
+
+
+@pytest.mark.asyncio
+async def test_registered_queries_do_not_scan_posts(tmp_path):
+    """Every registered query reaches posts through an index."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await migrate(db)
+        offenders = await tracing.full_scans(db)
+    assert "top_daily_n" in tracing.QUERIES
+    assert "weekly_counts" in tracing.QUERIES
+    assert offenders == {}
+
+
+@pytest.mark.asyncio
+async def test_full_scan_is_reported(tmp_path):
+    """A filter on an unindexed column is flagged, aliases included."""
+    async with aiosqlite.connect(tmp_path / "t.db") as db:
+        await migrate(db)
+        offenders = await tracing.full_scans(db, queries={
+            "by_text": "SELECT p.post_id FROM posts AS p WHERE p.text = ?",
+            "by_id": "SELECT text FROM posts WHERE post_id = :id",
+        })
+    assert list(offenders) == ["by_text"]
+    assert offenders["by_text"][0].startswith("SCAN p")
+
+
+@pytest.mark.asyncio
+async def test_tracer_records_and_logs_slow_queries(tmp_path, caplog):
+    """Pooled statements are timed by name; slow ones are logged."""
+    tracer = tracing.QueryTracer(slow_after=0)
+    pool = ConnectionPool(tmp_path / "t.db", size=1, tracer=tracer)
+    async with pool.connection() as db:
+        await migrate(db)
+        with caplog.at_level(logging.WARNING, logger=tracing.__name__):
+            await db.execute(scream_repo._USER_POST_COUNT, ("h",))
+            await db.execute_fetchall("SELECT  1\n  WHERE 1 = ?", (1,))
+    await pool.close()
+
+    stats = tracer.stats["user_post_count"]
+    assert stats.count == 1 and stats.shape == "(str)"
+    assert tracer.stats["SELECT 1 WHERE 1 = ?"].count == 1
+    assert "user_post_count params=(str)" in caplog.text
+    assert "'h'" not in caplog.text
+
+
+def test_param_shape_hides_values():
+    """Only parameter types are reported."""
+    assert tracing.param_shape(None) == "()"
+    assert tracing.param_shape((1, "secret", None)) == "(int, str, NoneType)"
+    assert tracing.param_shape({"h": "secret"}) == "{h: str}"
@@ -0,0 +1,99 @@
+# tests/unit/test_update_scheduler.py
+import asyncio
+import pytest
+from types import SimpleNamespace
+from innoscream.bot.update_scheduler import UpdateScheduler
+
+
+def _data(user_id):
+    return {"event_from_user": SimpleNamespace(id=user_id)}
+
+
+def _recorder(log, gate=None):
+    async def handler(event, data):
+        log.append(("start", event))
+        if gate is not None:
+            await gate.wait()
+        log.append(("end", event))
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_same_user_updates_run_in_order():
+    """A user's second update waits for the first one."""
+    log, gate = [], asyncio.Event()
+    scheduler = UpdateScheduler()
+    await scheduler(_recorder(log, gate), "a1", _data(1))
+    await scheduler(_recorder(log), "a2", _data(1))
+    await asyncio.sleep(0.01)
+    assert log == [("start", "a1")]
+
+    gate.set()
+    await scheduler.drain(timeout=1)
+    assert log == [("start", "a1"), ("end", "a1"),
+                   ("start", "a2"), ("end", "a2")]
+
+
+@pytest.mark.asyncio
+async def test_other_users_are_not_blocked():
+    """A slow update does not delay another user's update."""
+    log, gate = [], asyncio.Event()
+    scheduler = UpdateScheduler()
+    # reported as handled, so aiogram does not log "not handled"
+    assert await scheduler(_recorder(log, gate), "slow", _data(1)) is None
+    await scheduler(_recorder(log), "fast", _data(2))
+    await asyncio.sleep(0.01)
+    assert ("end", "fast") in log
+    assert ("end", "slow") not in log
+    gate.set()
+    await scheduler.drain(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_inflight_limit_applies_backpressure():
+    """Accepting beyond ``max_inflight`` waits for a free slot."""
+    log, gate = [], asyncio.Event()
+    scheduler = UpdateScheduler(max_inflight=1)
+    await scheduler(_recorder(log, gate), "first", _data(1))
+    second = asyncio.ensure_future(
+        scheduler(_recorder(log), "second", _data(2))
+    )
+    await asyncio.sleep(0.01)
+    assert not second.done()
+
+    gate.set()
+    await asyncio.wait_for(second, 1)
+    await scheduler.drain(timeout=1)
+    assert scheduler.stats["processed"] == 2
+
+
+@pytest.mark.asyncio
+async def test_named_limit_caps_concurrency():
+    """Only ``n`` holders of a limit run at once."""
+    scheduler = UpdateScheduler(limits={"chart": 2})
+    running = peak = 0
+
+    async def render():
+        nonlocal running, peak
+        async with scheduler.limit("chart"):
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+    await asyncio.gather(*(render() for _ in range(6)))
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_update_frees_its_slot():
+    """Handler errors are counted and do not leak slots."""
+    async def boom(event, data):
+        raise RuntimeError("boom")
+
+    scheduler = UpdateScheduler(max_inflight=1)
+    await scheduler(boom, "u1", _data(1))
+    await asyncio.wait_for(scheduler(boom, "u2", _data(1)), 1)
+    await scheduler.drain(timeout=1)
+    assert scheduler.failed == 2
+    assert scheduler.stats["inflight"] == 0
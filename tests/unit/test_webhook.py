@@ -0,0 +1,134 @@
+# tests/unit/test_webhook.py
+import asyncio
+import pytest
+import httpx
+from aiohttp import web
+from fastapi import FastAPI
+from unittest.mock import MagicMock
+import innoscream.bot.runner as runner
+import innoscream.bot.webhook as webhook
+
+UPDATE = {
+    "update_id": 1,
+    "message": {
+        "message_id": 7,
+        "date": 0,
+        "chat": {"id": 42, "type": "private"},
+        "from": {"id": 42, "is_bot": False, "first_name": "A"},
+        "text": "/start",
+    },
+}
+
+
+@pytest.fixture
+def settings(monkeypatch):
+    settings = MagicMock(
+        bot_token="1234567890:ABC-DEF1234ghIkl-zyx57W2v1u123ew11",
+        webhook_url="https://example.org/",
+        webhook_path="/telegram/webhook",
+        webhook_secret="s3cret",
+        bot_api_url=None,
+        update_max_inflight=64,
+    )
+    monkeypatch.setattr(webhook, "get_settings", lambda: settings)
+    monkeypatch.setattr(runner, "get_settings", lambda: settings)
+    monkeypatch.setattr(runner, "_bot", None)
+    return settings
+
+
+def _client():
+    app = FastAPI()
+    app.include_router(webhook.build_router("/telegram/webhook"))
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app),
+                             base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_rejects_wrong_secret(settings):
+    """Requests without Telegram's secret header are refused."""
+    async with _client() as client:
+        resp = await client.post("/telegram/webhook", json=UPDATE)
+    assert resp.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_rejects_everything_without_a_secret(settings):
+    """An unset secret fails closed, and webhook setup refuses to run."""
+    settings.webhook_secret = None
+    async with _client() as client:
+        resp = await client.post("/telegram/webhook", json=UPDATE,
+                                 headers={webhook.SECRET_HEADER: ""})
+    assert resp.status_code == 403
+    with pytest.raises(RuntimeError, match="WEBHOOK_SECRET"):
+        await runner.setup_webhook()
+
+
+@pytest.mark.asyncio
+async def test_backlog_is_refused_with_503(settings, monkeypatch):
+    """Beyond the in-flight cap Telegram is told to retry later."""
+    settings.update_max_inflight = 1
+    release = asyncio.Event()
+
+    async def feed_update(bot, update):
+        await release.wait()
+
+    monkeypatch.setattr(runner.get_dispatcher(), "feed_update", feed_update)
+    headers = {webhook.SECRET_HEADER: "s3cret"}
+    async with _client() as client:
+        first = await client.post("/telegram/webhook", json=UPDATE,
+                                  headers=headers)
+        second = await client.post("/telegram/webhook", json=UPDATE,
+                                   headers=headers)
+    assert (first.status_code, second.status_code) == (200, 503)
+
+    release.set()
+    await webhook.drain(timeout=1)
+
+
+@pytest.mark.asyncio
+async def test_update_is_processed_in_background(settings, monkeypatch):
+    """The response is sent before the handler finishes."""
+    release = asyncio.Event()
+    seen = []
+
+    async def feed_update(bot, update):
+        await release.wait()
+        seen.append(update.update_id)
+
+    monkeypatch.setattr(runner.get_dispatcher(), "feed_update", feed_update)
+    async with _client() as client:
+        resp = await client.post(
+            "/telegram/webhook", json=UPDATE,
+            headers={webhook.SECRET_HEADER: "s3cret"},
+        )
+    assert resp.status_code == 200
+    assert seen == []
+
+    release.set()
+    await webhook.drain(timeout=1)
+    assert seen == [1]
+
+
+@pytest.mark.asyncio
+async def test_setup_webhook_against_fake_bot_api(settings, unused_tcp_port):
+    """setWebhook goes to the configured Bot API server."""
+    calls = []
+
+    async def set_webhook(request):
+        calls.append(dict(await request.post()))
+        return web.json_response({"ok": True, "result": True})
+
+    app = web.Application()
+    app.router.add_post("/bot{token}/setWebhook", set_webhook)
+    server = web.AppRunner(app)
+    await server.setup()
+    await web.TCPSite(server, "127.0.0.1", unused_tcp_port).start()
+    settings.bot_api_url = f"http://127.0.0.1:{unused_tcp_port}"
+    try:
+        await runner.setup_webhook()
+        await runner.stop_bot()
+    finally:
+        await server.cleanup()
+
+    assert calls[0]["url"] == "https://example.org/telegram/webhook"
+    assert calls[0]["secret_token"] == "s3cret"
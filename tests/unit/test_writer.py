@@ -0,0 +1,85 @@
+# tests/unit/test_writer.py
+import asyncio
+import pytest
+import pytest_asyncio
+from innoscream.db.pool import ConnectionPool
+from innoscream.db.writer import WriteQueue
+
+
+@pytest_asyncio.fixture
+async def pool(tmp_path):
+    pool = ConnectionPool(tmp_path / "t.db", size=1)
+    async with pool.connection() as db:
+        await db.execute("CREATE TABLE t (x INTEGER)")
+        await db.commit()
+    yield pool
+    await pool.close()
+
+
+def _insert(value):
+    async def op(db):
+        cur = await db.execute("INSERT INTO t VALUES (?)", (value,))
+        return cur.lastrowid
+    return op
+
+
+@pytest.mark.asyncio
+async def test_submit_inline_when_stopped(pool):
+    """Without the writer task, ops run in their own transaction."""
+    writer = WriteQueue(pool.connection)
+    assert await writer.submit(_insert(1)) == 1
+    async with pool.connection() as db:
+        rows = await db.execute_fetchall("SELECT x FROM t")
+    assert rows == [(1,)]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_ops_share_one_commit(pool):
+    """Ops submitted together are committed as one batch."""
+    commits = []
+    writer = WriteQueue(pool.connection, max_batch=10, max_latency=0.05)
+
+    async with pool.connection() as db:
+        await db.set_trace_callback(commits.append)
+    writer.start()
+    ids = await asyncio.gather(*(writer.submit(_insert(i)) for i in range(5)))
+    await writer.stop()
+
+    assert sorted(ids) == [1, 2, 3, 4, 5]
+    assert commits.count("COMMIT") == 1
+
+
+@pytest.mark.asyncio
+async def test_failing_op_does_not_spoil_batch(pool):
+    """A failing op is rolled back alone; its neighbours still commit."""
+    async def bad(db):
+        await db.execute("INSERT INTO t VALUES (99)")
+        raise RuntimeError("boom")
+
+    writer = WriteQueue(pool.connection, max_latency=0.05)
+    writer.start()
+    results = await asyncio.gather(
+        writer.submit(_insert(1)),
+        writer.submit(bad),
+        writer.submit(_insert(2)),
+        return_exceptions=True,
+    )
+    await writer.stop()
+
+    assert isinstance(results[1], RuntimeError)
+    async with pool.connection() as db:
+        rows = await db.execute_fetchall("SELECT x FROM t ORDER BY x")
+    assert rows == [(1,), (2,)]
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending(pool):
+    """Stopping the writer drains what was already queued."""
+    writer = WriteQueue(pool.connection, max_latency=1.0)
+    writer.start()
+    pending = [asyncio.ensure_future(writer.submit(_insert(i)))
+               for i in range(3)]
+    await asyncio.sleep(0)
+    await writer.stop()
+    assert len(await asyncio.gather(*pending)) == 3
+    assert not writer.running